@@ -1,14 +1,28 @@
 import os
 import wave
 import json
+import queue
 import threading
+from contextlib import contextmanager
 from vosk import Model, KaldiRecognizer
 import pyaudio
+import metrics
+from sea_audio import SeaWriter, open_audio
+
+RECORD_JOIN_TIMEOUT = 1.0  # Seconds stop_recording waits for the read in progress (a chunk is 64 ms)
 
 
 class AudioRecorder:
-    def __init__(self, device_index=0, filename="output.wav"):
-        """Initialize the AudioRecorder."""
+    def __init__(self, device_index=0, filename="output.wav", stream_transcription=False, stream_to_disk=False):
+        """Initialize the AudioRecorder.
+
+        With stream_transcription=True every captured chunk is also decoded
+        while recording, and stop_recording leaves the text in self.transcription.
+        With stream_to_disk=True chunks are written to the file as they arrive
+        instead of being kept in self.frames, so memory stays flat and an
+        interrupted recording still leaves a playable file.
+        A filename ending in .sea is written in the compressed sea_audio format.
+        """
         self.device_index = device_index
         self.filename = filename
         self.chunk = 1024  # Buffer size
@@ -17,10 +31,28 @@ class AudioRecorder:
         self.rate = 16000  # Vosk requires 16 kHz
         self.frames = []  # Stores audio frames
         self.is_recording = False  # Tracks if recording is active
+        self.stream_transcription = stream_transcription
+        self.transcriber = None  # StreamingTranscriber for the current recording
+        self.transcription = None  # Text of the last streamed recording
+        self.on_partial = None  # Optional callback(text) for in-progress hypotheses
+        self.on_result = None  # Optional callback(text) for each finalized utterance
+        self.vad = None  # Optional vad.EnergyVAD used by the streaming transcriber
+        self.stream_to_disk = stream_to_disk
+        self.writer = None  # Open wave/.sea writer while streaming to disk
+        self._output = None  # File object underneath the writer
+        self._writer_lock = threading.Lock()  # Guards writer between record() and stop_recording()
+        self._record_thread = None  # Thread running record(), joined by stop_recording()
 
     def start_recording(self):
         """Start audio recording."""
         try:
+            self.transcription = None
+            if self.stream_transcription:
+                # Start the decoder first so a missing model fails before the microphone opens
+                self.transcriber = StreamingTranscriber(
+                    rate=self.rate, on_partial=self.on_partial, on_result=self.on_result, vad=self.vad
+                )
+                self.transcriber.start()
             self.p = pyaudio.PyAudio()
             self.stream = self.p.open(
                 format=self.format,
@@ -30,61 +62,290 @@ class AudioRecorder:
                 input_device_index=self.device_index,
                 frames_per_buffer=self.chunk
             )
-            self.is_recording = True
             self.frames = []
+            if self.stream_to_disk:
+                self._open_writer()
+            self.is_recording = True
             print(f"Recording started: {self.filename}")
         except Exception as e:
             print(f"Error starting recording: {e}")
+            if self.transcriber is not None:
+                self.transcriber.finish()
+                self.transcriber = None
             raise
 
-    def stop_recording(self):
-        """Stop audio recording and save to file."""
+    def stop_recording(self, finish_transcription=True):
+        """Stop audio recording and save to file.
+
+        With finish_transcription=False a streaming transcription is left to
+        drain in the background; collect it later with finish_transcription().
+        """
         try:
             if not self.is_recording:
                 print("Recording is not active.")
                 return
 
             self.is_recording = False
+            # Let record() finish its last read, so that chunk is saved and decoded before the end
+            thread = self._record_thread
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=RECORD_JOIN_TIMEOUT)
             self.stream.stop_stream()
             self.stream.close()
             self.p.terminate()
 
-            # Save the recorded audio to a .wav file
-            with wave.open(self.filename, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.p.get_sample_size(self.format))
-                wf.setframerate(self.rate)
-                wf.writeframes(b''.join(self.frames))
+            if self.stream_to_disk:
+                # Everything is already on disk; closing finalizes the header
+                with self._writer_lock:
+                    self.writer.close()
+                    self._output.close()
+                    self.writer = self._output = None
+            else:
+                # Save the recorded audio to a .wav or .sea file
+                with open_audio(self.filename, 'wb') as wf:
+                    wf.setnchannels(self.channels)
+                    wf.setsampwidth(self.p.get_sample_size(self.format))
+                    wf.setframerate(self.rate)
+                    wf.writeframes(b''.join(self.frames))
             print(f"Recording stopped and saved to {self.filename}")
+
+            # Only the audio still queued has to be decoded now
+            if finish_transcription:
+                self.finish_transcription()
         except Exception as e:
             print(f"Error stopping recording: {e}")
             raise
 
+    def finish_transcription(self):
+        """Wait for the streaming transcriber to drain and return the text (None if not streaming)."""
+        if self.transcriber is not None:
+            self.transcription = self.transcriber.finish()
+            self.transcriber = None
+        return self.transcription
+
     def record(self):
         """Capture audio data while recording."""
+        self._record_thread = threading.current_thread()
         try:
             while self.is_recording:
                 data = self.stream.read(self.chunk, exception_on_overflow=False)
-                self.frames.append(data)
+                if self.stream_to_disk:
+                    self._write_chunk(data)
+                else:
+                    self.frames.append(data)
+                if self.transcriber is not None:
+                    self.transcriber.feed(data)
         except Exception as e:
             print(f"Error during recording: {e}")
             self.is_recording = False
+        finally:
+            self._record_thread = None
+
+    def _open_writer(self):
+        """Create the output file so chunks can be appended while recording."""
+        self._output = open(self.filename, 'wb')
+        self.writer = SeaWriter(self._output) if self.filename.endswith('.sea') else wave.open(self._output, 'wb')
+        self.writer.setnchannels(self.channels)
+        self.writer.setsampwidth(self.p.get_sample_size(self.format))
+        self.writer.setframerate(self.rate)
+
+    def _write_chunk(self, data):
+        """Append one chunk to the output file and flush it."""
+        with self._writer_lock:
+            if self.writer is None:
+                return  # stop_recording already closed the file
+            # wave patches the header sizes on every writeframes call, so the
+            # file on disk is a valid WAV after each chunk, not just at close;
+            # .sea files are valid up to their last complete one-second chunk
+            self.writer.writeframes(data)
+            self._output.flush()
+
+
+MODEL_PATH = "./models/vosk-model-small-en-us-0.15"
+MAX_IDLE_RECOGNIZERS = 4  # Recognizers kept per pool for reuse
+
+_models = {}
+_pools = {}
+_grammars = {}
+_registry_lock = threading.Lock()
+
+
+def get_vosk_model(model_path=MODEL_PATH):
+    """Return the process-wide Vosk model for model_path, loading it on first use."""
+    model = _models.get(model_path)
+    if model is None:
+        with _registry_lock:
+            model = _models.get(model_path)
+            if model is None:
+                if not os.path.exists(model_path):
+                    raise FileNotFoundError(f"Model not found at {model_path}")
+                with metrics.span("audio.model_load"):
+                    model = Model(model_path)
+                _models[model_path] = model
+                print("Vosk model loaded successfully.")
+    return model
+
+
+class RecognizerPool:
+    """Hand out reusable KaldiRecognizer instances for one model, sample rate and grammar."""
+    def __init__(self, model, rate, grammar=None):
+        self.model = model
+        self.rate = rate
+        self.grammar = grammar  # JSON list of allowed phrases, or None for the full vocabulary
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def recognizer(self):
+        """Borrow a recognizer; it is reset and returned to the pool afterwards."""
+        with self._lock:
+            recognizer = self._idle.pop() if self._idle else None
+        if recognizer is None:
+            if self.grammar is None:
+                recognizer = KaldiRecognizer(self.model, self.rate)
+            else:
+                recognizer = KaldiRecognizer(self.model, self.rate, self.grammar)
+        try:
+            yield recognizer
+        finally:
+            recognizer.Reset()  # Drop any decoder state left by this use
+            with self._lock:
+                if len(self._idle) < MAX_IDLE_RECOGNIZERS:
+                    self._idle.append(recognizer)
+
+
+def get_recognizer_pool(model_path=MODEL_PATH, rate=16000, grammar=None):
+    """Return the shared recognizer pool for a model, sample rate and grammar."""
+    key = (model_path, rate, grammar)
+    pool = _pools.get(key)
+    if pool is None:
+        model = get_vosk_model(model_path)
+        with _registry_lock:
+            pool = _pools.setdefault(key, RecognizerPool(model, rate, grammar))
+    return pool
 
 
-def transcribe_audio(audio_file="output.wav"):
-    """Transcribe the given audio file using the Vosk model."""
-    model_path = "./models/vosk-model-small-en-us-0.15"
+def build_grammar(words, model_path=MODEL_PATH):
+    """Return a Vosk grammar allowing only the given words plus the [unk] filler.
 
+    Words the acoustic model's lexicon does not know are left out when the
+    model ships graph/words.txt; Vosk would otherwise warn and skip them.
+    """
+    words = sorted({word.lower() for word in words if word.strip()})
+    lexicon_path = os.path.join(model_path, "graph", "words.txt")
+    if os.path.exists(lexicon_path):
+        with open(lexicon_path, "r", encoding="utf-8") as f:
+            lexicon = {line.split()[0] for line in f if line.strip()}
+        words = [word for word in words if word in lexicon]
+    return json.dumps(words + ["[unk]"])
+
+
+def feature_grammar(model_path=MODEL_PATH):
+    """Return the grammar for the predictor's feature vocabulary (cached per model)."""
+    grammar = _grammars.get(model_path)
+    if grammar is None:
+        from predictor import load_features
+
+        grammar = _grammars.setdefault(model_path, build_grammar(load_features(), model_path))
+    return grammar
+
+
+class StreamingTranscriber:
+    """Decode audio chunks on a worker thread while they are still being recorded."""
+    def __init__(self, rate=16000, model_path=MODEL_PATH, on_partial=None, on_result=None, vad=None,
+                 grammar=None):
+        self.rate = rate
+        self.model_path = model_path
+        self.vad = vad  # Optional vad.EnergyVAD applied before decoding
+        self.grammar = grammar  # Optional grammar, e.g. feature_grammar()
+        self.on_partial = on_partial
+        self.on_result = on_result
+        self.results = []  # Finalized utterances, in order
+        self.partial = ""  # Latest in-progress hypothesis
+        self._queue = queue.Queue()
+        self._thread = None
+        self._error = None
+
+    def start(self):
+        """Load the model (cached after the first time) and start the worker thread."""
+        pool = get_recognizer_pool(self.model_path, self.rate, self.grammar)
+        self._thread = threading.Thread(target=self._run, args=(pool,), name="streaming-transcriber", daemon=True)
+        self._thread.start()
+
+    def feed(self, data):
+        """Queue a chunk of 16-bit mono PCM for decoding."""
+        self._queue.put(data)
+
+    def finish(self):
+        """Decode whatever is still queued and return the full transcription."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return " ".join(self.results)
+
+    def _run(self, pool):
+        try:
+            if self.vad is not None:
+                self.vad.reset()
+            with pool.recognizer() as recognizer:
+                while True:
+                    data = self._queue.get()
+                    if data is None:
+                        break
+                    # Decode whatever has piled up in one call instead of chunk by chunk
+                    chunks = [data]
+                    while not self._queue.empty():
+                        chunk = self._queue.get_nowait()
+                        if chunk is None:
+                            self._queue.put(None)
+                            break
+                        chunks.append(chunk)
+                    data = b''.join(chunks)
+                    if self.vad is not None:
+                        with metrics.span("audio.vad"):
+                            data = self.vad.process(data)
+                        if not data:
+                            continue  # Silence; nothing to decode
+                    with metrics.span("audio.stream_decode"):
+                        accepted = recognizer.AcceptWaveform(data)
+                    if accepted:
+                        self._add_result(json.loads(recognizer.Result()).get("text", ""))
+                    else:
+                        self.partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                        if self.on_partial:
+                            self.on_partial(self.partial)
+                if self.vad is not None:
+                    tail = self.vad.flush()
+                    if tail and recognizer.AcceptWaveform(tail):
+                        self._add_result(json.loads(recognizer.Result()).get("text", ""))
+                self._add_result(json.loads(recognizer.FinalResult()).get("text", ""))
+        except Exception as e:
+            print(f"Error during streaming transcription: {e}")
+            self._error = e
+
+    def _add_result(self, text):
+        self.results.append(text)
+        self.partial = ""
+        if self.on_result:
+            self.on_result(text)
+
+
+@metrics.timed("audio.transcribe")
+def transcribe_audio(audio_file="output.wav", model_path=MODEL_PATH, vad=None, grammar=None, progress=None):
+    """Transcribe the given audio file using the Vosk model.
+
+    vad is an optional vad.EnergyVAD; silence it rejects is never decoded.
+    grammar optionally restricts decoding to a word list (see feature_grammar).
+    progress is an optional callback(fraction) called after each block; an
+    exception raised from it aborts the transcription.
+    """
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model not found at {model_path}")
 
     try:
-        # Load the Vosk model
-        model = Model(model_path)
-        print("Vosk model loaded successfully.")
-
         # Open the audio file
-        with wave.open(audio_file, "rb") as wf:
+        with open_audio(audio_file, "rb") as wf:
             print(f"Processing audio file: {audio_file}")
             if wf.getnchannels() != 1:
                 raise ValueError("Audio file must be mono (1 channel)")
@@ -93,22 +354,35 @@ def transcribe_audio(audio_file="output.wav"):
             if wf.getframerate() != 16000:
                 raise ValueError("Audio file must have a sample rate of 16000 Hz")
 
-            recognizer = KaldiRecognizer(model, wf.getframerate())
-            transcription = []
-
-            # Process the audio frames
-            while True:
-                data = wf.readframes(4000)
-                if len(data) == 0:
-                    break
-                if recognizer.AcceptWaveform(data):
-                    result = json.loads(recognizer.Result())
-                    transcription.append(result.get("text", ""))
-
-            # Get the final result
-            final_result = json.loads(recognizer.FinalResult())
-            transcription.append(final_result.get("text", ""))
-            print(f"Final result: {final_result}")
+            # The model is loaded once per process; recognizers are reused between calls
+            pool = get_recognizer_pool(model_path, wf.getframerate(), grammar)
+            with pool.recognizer() as recognizer, metrics.span("audio.decode"):
+                transcription = []
+                if vad is not None:
+                    vad.reset()
+
+                # Process the audio frames
+                while True:
+                    data = wf.readframes(4000)
+                    if len(data) == 0:
+                        break
+                    if vad is not None:
+                        data = vad.process(data)
+                    if data and recognizer.AcceptWaveform(data):
+                        result = json.loads(recognizer.Result())
+                        transcription.append(result.get("text", ""))
+                    if progress is not None:
+                        progress(wf.tell() / max(wf.getnframes(), 1))
+
+                # Decode the detector's last partial frame, if it was speech
+                tail = vad.flush() if vad is not None else b''
+                if tail and recognizer.AcceptWaveform(tail):
+                    transcription.append(json.loads(recognizer.Result()).get("text", ""))
+
+                # Get the final result
+                final_result = json.loads(recognizer.FinalResult())
+                transcription.append(final_result.get("text", ""))
+                print(f"Final result: {final_result}")
 
             final_transcription = " ".join(transcription)
             print(f"Final transcription: {final_transcription}")
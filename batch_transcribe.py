@@ -0,0 +1,181 @@
+# batch_transcribe.py - Re-transcribe stored session recordings across a process pool
+#
+# Run with: python batch_transcribe.py [--pattern GLOB] [--workers N] [--manifest FILE] [--update-transcripts]
+#
+# Every finished file is appended to the manifest (JSON Lines) straight away, so an
+# interrupted run picks up where it stopped when started again with the same manifest.
+# Each record carries a fingerprint of the Vosk model, so after a model update the
+# files are transcribed again instead of being skipped.
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from audio_handler import MODEL_PATH, get_vosk_model, transcribe_audio
+from sea_audio import AUDIO_EXTENSIONS, open_audio
+
+DEFAULT_PATTERN = "./data/sessions/*/output*"  # .wav and .sea recordings
+DEFAULT_MANIFEST = "./data/batch_transcriptions.jsonl"
+ANALYSIS_MARKER = "\n\nAnalysis Result:"  # Written by DiseasesEaseApp.analyze
+
+
+def _init_worker(model_path):
+    """Load the Vosk model once per worker process."""
+    try:
+        get_vosk_model(model_path)
+    except Exception as e:
+        # Raising here would break the whole pool; each file reports the error instead
+        print(f"Error loading Vosk model in worker {os.getpid()}: {e}")
+
+
+def _transcribe_one(path, model_path):
+    """Transcribe a single file inside a worker process."""
+    with open_audio(path, "rb") as wf:
+        audio_seconds = wf.getnframes() / wf.getframerate()
+    start = time.perf_counter()
+    text = transcribe_audio(path, model_path)
+    return {
+        "path": path,
+        "text": text,
+        "audio_seconds": audio_seconds,
+        "decode_seconds": time.perf_counter() - start,
+    }
+
+
+def model_fingerprint(model_path=MODEL_PATH):
+    """Return a short digest of the model directory's path and the name, size and mtime of its files."""
+    digest = hashlib.sha256(os.path.abspath(model_path).encode("utf-8"))
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, model_path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def load_completed(manifest_path, model=None):
+    """Return the paths already transcribed successfully according to the manifest.
+
+    With model set, only records made with that model fingerprint count.
+    """
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by an interruption
+            if record.get("status") == "ok" and (model is None or record.get("model") == model):
+                completed.add(os.path.normpath(record["path"]))
+    return completed
+
+
+def _ends_with_newline(path):
+    """True if path is missing, empty or ends with a newline."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def transcribe_archive(paths, workers=None, model_path=MODEL_PATH, manifest_path=DEFAULT_MANIFEST):
+    """Transcribe paths in parallel, yielding one record per file as soon as it finishes.
+
+    Files already marked "ok" in the manifest by the same model are skipped.
+    At most a few files per worker are in flight, so huge archives do not
+    queue up in memory.
+    """
+    model = model_fingerprint(model_path)
+    completed = load_completed(manifest_path, model)
+    pending = iter([path for path in paths if os.path.normpath(path) not in completed])
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path,)) as pool, \
+            open(manifest_path, "a") as manifest:
+        if not _ends_with_newline(manifest_path):
+            manifest.write("\n")  # Keep the first new record off a line cut short by an earlier crash
+        in_flight = {}
+
+        def submit_next():
+            path = next(pending, None)
+            if path is not None:
+                in_flight[pool.submit(_transcribe_one, path, model_path)] = path
+
+        for _ in range(workers * 2):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                try:
+                    record = future.result()
+                    record["status"] = "ok"
+                except Exception as e:
+                    record = {"path": path, "status": "error", "error": str(e)}
+                record["model"] = model
+                manifest.write(json.dumps(record) + "\n")
+                manifest.flush()
+                submit_next()
+                yield record
+
+
+def update_transcript_file(audio_path, text):
+    """Replace the transcript in the matching transcription{n}.txt, keeping any analysis result."""
+    match = re.search(r"output(\d+)\.(?:wav|sea)$", audio_path)
+    if not match:
+        return None
+    transcript_path = os.path.join(os.path.dirname(audio_path), f"transcription{match.group(1)}.txt")
+    analysis = ""
+    if os.path.exists(transcript_path):
+        with open(transcript_path, "r") as f:
+            content = f.read()
+        if ANALYSIS_MARKER in content:
+            analysis = content[content.index(ANALYSIS_MARKER):]
+    with open(transcript_path, "w") as f:
+        f.write(text + analysis)
+    return transcript_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe stored session recordings in parallel.")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help="Glob of .wav/.sea files to transcribe")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--model", default=MODEL_PATH, help="Vosk model directory")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="Progress/results file (JSON Lines)")
+    parser.add_argument("--update-transcripts", action="store_true",
+                        help="Rewrite transcription{n}.txt next to each recording")
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    paths = sorted(path for path in glob.glob(args.pattern) if path.endswith(AUDIO_EXTENSIONS))
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    finished = failed = 0
+    for record in transcribe_archive(paths, workers, args.model, args.manifest):
+        if record["status"] != "ok":
+            failed += 1
+            print(f"FAILED {record['path']}: {record['error']}")
+            continue
+        finished += 1
+        audio_seconds += record["audio_seconds"]
+        if args.update_transcripts:
+            update_transcript_file(record["path"], record["text"])
+        print(f"[{finished + failed}] {record['path']} ({record['audio_seconds']:.1f}s audio)")
+
+    wall = time.perf_counter() - start
+    print(f"Transcribed {finished} files, {failed} failed, {len(paths) - finished - failed} already done")
+    if wall > 0 and finished:
+        print(f"Throughput: {audio_seconds / wall:.2f} audio-s per wall-s, "
+              f"{audio_seconds / wall / workers:.2f} per core ({workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# bench_batch_predict.py - Per-transcript predict_disease vs predict_disease_batch
+#
+# Run with: python -m benchmarks.bench_batch_predict
+
+import random
+import time
+from predictor import features, predict_disease, predict_disease_batch
+from benchmarks.common import print_table
+
+
+def synthetic_corpus(count, length=200, seed=0):
+    """Generate transcripts drawn from the feature vocabulary plus filler words."""
+    rng = random.Random(seed)
+    filler = ["the", "and", "doctor", "yesterday", "really", "um"]
+    return [
+        " ".join(rng.choice(features) if rng.random() < 0.3 else rng.choice(filler) for _ in range(length))
+        for _ in range(count)
+    ]
+
+
+def main():
+    rows = []
+    for count in (100, 1000):
+        corpus = synthetic_corpus(count)
+
+        start = time.perf_counter()
+        for transcription in corpus:
+            predict_disease(transcription)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in predict_disease_batch(corpus, k=2, batch_size=512):
+            pass
+        batched = time.perf_counter() - start
+
+        rows.append((count, count / single, count / batched, single / batched))
+    print_table(
+        "predict_disease vs predict_disease_batch (transcripts per second)",
+        ("transcripts", "single_tps", "batch_tps", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# bench_featurizer.py - Featurization cost versus transcript length and vocabulary size
+#
+# Run with: python -m benchmarks.bench_featurizer
+
+import random
+import numpy as np
+from predictor import Featurizer, features
+from benchmarks.common import measure, summarize, print_table
+
+
+def list_scan_vector(dialog, features):
+    """The original O(tokens x vocab) featurizer, kept as the reference point."""
+    vector = np.zeros(len(features))
+    for token in dialog.lower().split():
+        if token in features:
+            vector[features.index(token)] += 1
+    return vector
+
+
+def synthetic_transcript(vocabulary, length, rng):
+    """Build a transcript mixing vocabulary words with out-of-vocabulary filler."""
+    filler = ["the", "and", "doctor", "yesterday", "really", "um"]
+    return " ".join(rng.choice(vocabulary) if rng.random() < 0.3 else rng.choice(filler) for _ in range(length))
+
+
+def main():
+    rng = random.Random(0)
+    base = list(features)
+
+    rows = []
+    vocabulary = Featurizer(base)
+    for length in (100, 1000, 10000, 100000):
+        dialog = synthetic_transcript(base, length, rng)
+        stats = summarize(measure(vocabulary.transform, dialog, repeat=10))
+        rows.append((length, len(base), stats["p50_ms"], stats["p95_ms"]))
+    print_table("Featurizer: growing transcript length", ("tokens", "vocab", "p50_ms", "p95_ms"), rows)
+
+    rows = []
+    dialog = synthetic_transcript(base, 5000, rng)
+    for scale in (1, 10, 30):
+        # Pad the vocabulary with synthetic tokens so the real ones keep their hit rate
+        vocab = base + [f"token{i}" for i in range(len(base) * (scale - 1))]
+        featurizer = Featurizer(vocab)
+        fast = summarize(measure(featurizer.transform, dialog, repeat=10))
+        slow = summarize(measure(list_scan_vector, dialog, vocab, repeat=3))
+        rows.append((5000, len(vocab), fast["p50_ms"], slow["p50_ms"]))
+    print_table("Featurizer: growing vocabulary size", ("tokens", "vocab", "dict_p50_ms", "scan_p50_ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
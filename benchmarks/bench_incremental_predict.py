@@ -0,0 +1,43 @@
+# bench_incremental_predict.py - Live prediction cost per utterance: incremental vs re-scoring the transcript
+#
+# Run with: python -m benchmarks.bench_incremental_predict
+
+import time
+import predictor
+from benchmarks.bench_batch_predict import synthetic_corpus
+from benchmarks.common import print_table
+
+
+def main():
+    predictor.configure_cache(max_entries=0)  # Every update runs the model, as in a real consultation
+    utterances = synthetic_corpus(400, length=12, seed=1)  # About 40 minutes of speech
+    predictor.predict_disease(utterances[0])  # Loads the model
+
+    rows = []
+    for count in (50, 100, 200, 400):
+        start = time.perf_counter()
+        transcript = []
+        for utterance in utterances[:count]:
+            transcript.append(utterance)
+            predictor.predict_disease(" ".join(transcript))
+        full = (time.perf_counter() - start) / count
+
+        live = predictor.IncrementalPredictor(k=2, min_interval=0.0)
+        start = time.perf_counter()
+        for utterance in utterances[:count]:
+            live.update(utterance)
+        incremental = (time.perf_counter() - start) / count
+        rows.append((count, full * 1000, incremental * 1000, full / incremental))
+    print_table(f"Mean cost per utterance, {predictor._handle.backend} backend (ms)",
+                ("utterances", "full_ms", "incremental_ms", "speedup"), rows)
+
+    # With the default throttle most updates only add counts
+    live = predictor.IncrementalPredictor(k=2, min_interval=1.0)
+    start = time.perf_counter()
+    scored = sum(live.update(utterance) is not None for utterance in utterances)
+    print(f"min_interval=1.0: {len(utterances)} utterances, {scored} re-scores, "
+          f"{(time.perf_counter() - start) / len(utterances) * 1e6:.0f} us per utterance")
+
+
+if __name__ == "__main__":
+    main()
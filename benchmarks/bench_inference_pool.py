@@ -0,0 +1,71 @@
+# bench_inference_pool.py - InferencePool throughput and per-worker memory vs worker count
+#
+# Run with: python -m benchmarks.bench_inference_pool [--count 20000] [--workers 1 2 4]
+#
+# Worker memory is read from /proc, so the memory columns are only filled in on Linux.
+
+import argparse
+import multiprocessing
+import os
+import time
+from benchmarks.bench_batch_predict import synthetic_corpus
+from benchmarks.common import peak_rss_mb, print_table
+from inference_pool import InferencePool
+
+
+def process_memory_mb(pid):
+    """Return (resident MB, of which shared memory MB) of a process, or (nan, nan) off Linux."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            fields = dict(line.split(":", 1) for line in f)
+    except OSError:
+        return float("nan"), float("nan")
+    return tuple(int(fields.get(key, "0 kB").split()[0]) / 1024 for key in ("VmRSS", "RssShmem"))
+
+
+def standalone_predictor(backend):
+    """Load the model the way a separately started scoring process would; returns its peak RSS in MB."""
+    import predictor
+
+    predictor._handle = predictor.ModelHandle(backend=backend)
+    predictor.predict_disease("cough")
+    return peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared-memory inference pool.")
+    parser.add_argument("--count", type=int, default=20000, help="Synthetic transcripts to score")
+    parser.add_argument("--length", type=int, default=200, help="Words per transcript")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.count, args.length)
+    rows = []
+    for workers in args.workers:
+        with InferencePool(workers, args.batch_size) as pool:
+            list(pool.predict(corpus[:workers * args.batch_size]))  # Start and warm every worker
+            start = time.perf_counter()
+            for _ in pool.predict(corpus):
+                pass
+            elapsed = time.perf_counter() - start
+            memory = [process_memory_mb(pid) for pid in pool._pool._processes]
+        rss = sum(m[0] for m in memory) / len(memory)
+        shared = sum(m[1] for m in memory) / len(memory)
+        rows.append((workers, args.count / elapsed, rss, shared, pool.shared_bytes / 1e6))
+    print_table(f"InferencePool on {os.cpu_count()} cores, {args.count} transcripts",
+                ("workers", "transcripts_s", "worker_rss_mb", "of_it_shared", "model_block_mb"), rows)
+
+    # What each extra process costs when every worker loads its own model instead
+    for backend in ("keras", "numpy"):
+        with multiprocessing.get_context("spawn").Pool(1) as process:
+            try:
+                rss = process.apply(standalone_predictor, (backend,))
+            except Exception as e:
+                print(f"Separate {backend} predictor process: {e}")
+                continue
+        print(f"Separate process loading its own model ({backend} backend): peak RSS {rss:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
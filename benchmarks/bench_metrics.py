@@ -0,0 +1,49 @@
+# bench_metrics.py - Cost of metrics spans when disabled and enabled
+#
+# Run with: python -m benchmarks.bench_metrics
+
+import timeit
+import metrics
+import predictor
+from benchmarks.bench_batch_predict import synthetic_corpus
+from benchmarks.common import measure, print_table, summarize
+
+
+@metrics.timed("bench.decorated")
+def decorated():
+    pass
+
+
+def bare():
+    pass
+
+
+def with_span():
+    with metrics.span("bench.block"):
+        pass
+
+
+def main():
+    calls = 200000
+    rows = []
+    baseline = timeit.timeit(bare, number=calls) / calls
+    for enabled in (False, True):
+        metrics.enable(enabled)
+        span_cost = timeit.timeit(with_span, number=calls) / calls - baseline
+        decorator_cost = timeit.timeit(decorated, number=calls) / calls - baseline
+        rows.append(("enabled" if enabled else "disabled", span_cost * 1e9, decorator_cost * 1e9))
+    print_table("Overhead per instrumented call (nanoseconds)", ("metrics", "span_ns", "timed_ns"), rows)
+
+    transcription = synthetic_corpus(1, length=200)[0]
+    predictor.configure_cache(max_entries=0)
+    rows = []
+    for enabled in (False, True):
+        metrics.enable(enabled)
+        stats = summarize(measure(predictor.predict_disease, transcription, repeat=500, warmup=5))
+        rows.append(("enabled" if enabled else "disabled", stats["p50_ms"], stats["p95_ms"]))
+    metrics.enable(False)
+    print_table("predict_disease with metrics", ("metrics", "p50_ms", "p95_ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
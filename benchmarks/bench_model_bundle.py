@@ -0,0 +1,52 @@
+# bench_model_bundle.py - Cold model load time and memory: model bundle vs NumPy engine vs h5 + pickles
+#
+# Run with: python -m benchmarks.bench_model_bundle [--repeat 3]
+#
+# Builds models/model.bundle first if it is missing. Every load runs in a fresh
+# process, so nothing is cached in the interpreter between measurements.
+
+import argparse
+import multiprocessing
+import os
+import time
+from benchmarks.common import peak_rss_mb, print_table
+from model_bundle import BUNDLE_PATH, build_bundle
+
+
+def cold_load(backend):
+    """Import predictor, load one backend and score one transcript; returns (import_s, load_s, peak RSS MB)."""
+    start = time.perf_counter()
+    import predictor
+    imported = time.perf_counter()
+    handle = predictor.ModelHandle(backend=backend).load()
+    handle.predict_counts(handle.featurizer.transform_many(["cough and fever"]))
+    return imported - start, time.perf_counter() - imported, peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold model loading across model file formats.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh processes per backend")
+    args = parser.parse_args()
+    if not os.path.exists(BUNDLE_PATH):
+        build_bundle()
+
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for backend in ("bundle", "numpy", "keras"):
+        runs = []
+        for _ in range(args.repeat):
+            with context.Pool(1) as pool:
+                try:
+                    runs.append(pool.apply(cold_load, (backend,)))
+                except Exception as e:
+                    print(f"{backend}: {e}")
+                    break
+        if runs:
+            best = min(runs, key=lambda run: run[1])
+            rows.append((backend, best[0] * 1000, best[1] * 1000, best[2]))
+    print_table("Cold load and first prediction (best of runs)", ("backend", "import_ms", "load_ms", "peak_rss_mb"),
+                rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# bench_numpy_engine.py - Keras model.predict vs the exported NumpyEngine
+#
+# Run with: python -m benchmarks.bench_numpy_engine
+
+import os
+import tempfile
+import numpy as np
+from numpy_engine import NumpyEngine, export_engine
+from predictor import ModelHandle
+from benchmarks.common import measure, summarize, print_table
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "numpy_engine.npz")
+        export_engine(out_path=path)
+        engine = NumpyEngine.load(path)
+    keras_handle = ModelHandle(backend="keras").load()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for batch in (1, 32, 1024):
+        counts = rng.poisson(0.05, size=(batch, engine.input_size)).astype(float)
+        keras = summarize(measure(keras_handle.predict_counts, counts, repeat=20))
+        numpy = summarize(measure(engine.predict, counts, repeat=20))
+        max_error = float(np.abs(keras_handle.predict_counts(counts) - engine.predict(counts)).max())
+        rows.append((batch, keras["p50_ms"], numpy["p50_ms"], keras["p50_ms"] / numpy["p50_ms"], max_error))
+    print_table("Keras vs NumpyEngine latency (scaling included in both)",
+                ("rows", "keras_p50_ms", "numpy_p50_ms", "speedup", "max_abs_err"), rows)
+
+
+if __name__ == "__main__":
+    main()
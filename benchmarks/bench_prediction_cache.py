@@ -0,0 +1,35 @@
+# bench_prediction_cache.py - predict_disease latency with and without the prediction cache
+#
+# Run with: python -m benchmarks.bench_prediction_cache
+
+import predictor
+from benchmarks.bench_batch_predict import synthetic_corpus
+from benchmarks.common import measure, print_table, summarize
+
+
+def main():
+    rows = []
+    for length in (10, 200):
+        transcription = synthetic_corpus(1, length=length)[0]
+
+        predictor.configure_cache(max_entries=0)
+        uncached = summarize(measure(predictor.predict_disease, transcription, repeat=200))
+        predictor.configure_cache()
+        hit = summarize(measure(predictor.predict_disease, transcription, repeat=200))
+        rows.append((length, "no cache", uncached["p50_ms"] * 1000, uncached["p99_ms"] * 1000))
+        rows.append((length, "cache hit", hit["p50_ms"] * 1000, hit["p99_ms"] * 1000))
+    print_table("predict_disease latency (microseconds)", ("words", "mode", "p50_us", "p99_us"), rows)
+
+    # A follow-up heavy workload: 2000 requests drawn from 300 distinct transcripts
+    corpus = synthetic_corpus(300, length=30)
+    workload = [corpus[(i * 7919) % len(corpus)] for i in range(2000)]
+    rows = []
+    for max_entries in (0, 100, 4096):
+        predictor.configure_cache(max_entries=max_entries)
+        seconds = sum(measure(lambda: [predictor.predict_disease(t) for t in workload], repeat=1, warmup=0))
+        rows.append((max_entries, len(workload) / seconds, predictor.cache_stats()["hit_rate"]))
+    print_table("Repeated transcripts (2000 requests, 300 distinct)", ("max_entries", "requests_s", "hit_rate"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# bench_sea_audio.py - Storage size and decode overhead of .sea recordings vs WAV
+#
+# Run with: python -m benchmarks.bench_sea_audio [.wav files...]
+#
+# Without arguments a synthetic one-minute speech-like signal is used; pass the
+# stored data/sessions recordings to measure on real audio.
+
+import io
+import sys
+import wave
+import numpy as np
+from benchmarks.common import measure, print_table, summarize
+from sea_audio import SeaReader, SeaWriter
+
+
+def synthetic_minute(rate=16000):
+    """Voiced bursts with pauses and background noise, roughly like a consultation recording."""
+    rng = np.random.default_rng(0)
+    t = np.arange(60 * rate) / rate
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    voiced = np.sin(2 * np.pi * np.cumsum(pitch) / rate) + 0.4 * np.sin(4 * np.pi * np.cumsum(pitch) / rate)
+    envelope = (np.sin(2 * np.pi * 0.5 * t) > -0.3) * 6000
+    samples = voiced * envelope + rng.standard_normal(len(t)) * 150
+    return samples.astype(np.int16).tobytes(), rate
+
+
+def read_wav(path):
+    with wave.open(path, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit mono WAV files are supported here")
+        return wf.readframes(wf.getnframes()), wf.getframerate()
+
+
+def encode(pcm, rate, container):
+    buffer = io.BytesIO()
+    writer = SeaWriter(buffer) if container == "sea" else wave.open(buffer, "wb")
+    writer.setnchannels(1)
+    writer.setsampwidth(2)
+    writer.setframerate(rate)
+    writer.writeframes(pcm)
+    writer.close()
+    return buffer.getvalue()
+
+
+def read_all(data, container):
+    """Read the whole file in 4000-frame blocks, the way transcribe_audio does."""
+    buffer = io.BytesIO(data)
+    reader = SeaReader(buffer) if container == "sea" else wave.open(buffer, "rb")
+    while reader.readframes(4000):
+        pass
+
+
+def main():
+    sources = [(path, *read_wav(path)) for path in sys.argv[1:]] or [("synthetic", *synthetic_minute())]
+    rows = []
+    for name, pcm, rate in sources:
+        minutes = len(pcm) / 2 / rate / 60
+        wav = encode(pcm, rate, "wav")
+        for container in ("wav", "sea"):
+            data = wav if container == "wav" else encode(pcm, rate, "sea")
+            write_ms = summarize(measure(encode, pcm, rate, container, repeat=5))["p50_ms"]
+            read_ms = summarize(measure(read_all, data, container, repeat=5))["p50_ms"]
+            rows.append((name, container, len(data) / minutes / 1e6, len(data) / len(wav),
+                         write_ms / minutes, read_ms / minutes))
+    print_table("Recording storage and I/O cost", ("file", "format", "MB_per_min", "ratio", "write_ms_per_min",
+                                                   "read_ms_per_min"), rows)
+
+
+if __name__ == "__main__":
+    main()
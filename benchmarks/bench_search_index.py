@@ -0,0 +1,64 @@
+# bench_search_index.py - Build time, size and query latency of the transcript search index
+#
+# Run with: python -m benchmarks.bench_search_index [--sessions 100000] [--length 200]
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from benchmarks.common import measure, print_table, summarize
+from search_index import SearchIndex
+
+COMMON = ["the", "and", "i", "my", "have", "been", "it", "a", "to", "is", "since", "doctor", "yesterday", "really",
+          "um", "bit", "worse", "better", "after", "night"]
+MEDICAL = ["cough", "fever", "headache", "rash", "nausea", "fatigue", "dizziness", "wheezing", "chills", "vomiting",
+           "itching", "sneezing", "chest", "pain", "sore", "throat", "stomach", "breath", "joint", "swelling"]
+QUERIES = ["cough", "wheezing chills", '"chest pain"', "rash OR itching", "fever -cough", '"sore throat" night',
+           '"i have been"']
+
+
+def synthetic_corpus(count, length, seed=0):
+    """Transcripts with Zipf-distributed words: stop words everywhere, each medical term in a few percent."""
+    vocabulary = COMMON + [f"word{i}" for i in range(200)] + MEDICAL + [f"rare{i}" for i in range(5000)]
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    rng = np.random.default_rng(seed)
+    words = rng.choice(len(vocabulary), size=(count, length), p=weights / weights.sum())
+    return [" ".join(vocabulary[i] for i in row) for row in words.tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transcript search index.")
+    parser.add_argument("--sessions", type=int, default=100000, help="Synthetic transcripts to index")
+    parser.add_argument("--length", type=int, default=200, help="Words per transcript")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.sessions, args.length)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for i, transcript in enumerate(corpus):
+        index.add(f"Session_{i + 1}", "transcription1.txt", transcript)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.npz")
+        start = time.perf_counter()
+        index.save(path)
+        save = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        index = SearchIndex(path)
+        load = time.perf_counter() - start
+    print_table(f"Index of {args.sessions} transcripts x {args.length} words",
+                ("build_s", "save_s", "load_s", "file_mb"), [(build, save, load, size_mb)])
+
+    rows = []
+    for query in QUERIES:
+        hits = len(index.search(query, limit=args.sessions))
+        stats = summarize(measure(index.search, query, repeat=20))
+        rows.append((query, hits, stats["p50_ms"], stats["p99_ms"]))
+    print_table("Query latency (top 20 results)", ("query", "matches", "p50_ms", "p99_ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
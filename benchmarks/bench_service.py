@@ -0,0 +1,85 @@
+# bench_service.py - Load test for the HTTP inference service: throughput vs concurrency
+#
+# Run with: python -m benchmarks.bench_service [--requests 2000] [--max-batch-size 32]
+#
+# The service is started in-process on a free port, once with
+# micro-batching and once with --max-batch-size 1 for comparison.
+
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.bench_batch_predict import synthetic_corpus
+from benchmarks.common import print_table, summarize
+from service import InferenceService
+
+
+async def post_json(reader, writer, path, payload):
+    """Send one keep-alive request and return (status, JSON body)."""
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def load(host, port, corpus, concurrency, total):
+    """Run total /predict requests over concurrency keep-alive connections."""
+    latencies, rejected = [], 0
+    remaining = iter(range(total))
+
+    async def client():
+        nonlocal rejected
+        reader, writer = await asyncio.open_connection(host, port)
+        for i in remaining:
+            start = time.perf_counter()
+            status, _ = await post_json(reader, writer, "/predict", {"transcription": corpus[i % len(corpus)]})
+            if status == 429:
+                rejected += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return len(latencies) / (time.perf_counter() - start), latencies, rejected
+
+
+async def run(args):
+    corpus = synthetic_corpus(200)
+    configs = [("batched", args.max_batch_size), ("unbatched", 1)]
+    for label, max_batch_size in configs:
+        service = InferenceService(max_batch_size=max_batch_size, max_wait_ms=args.max_wait_ms)
+        host, port = await service.start("127.0.0.1", 0)
+        rows = []
+        for concurrency in (1, 4, 16, 64):
+            before = service.batcher.stats()
+            throughput, latencies, rejected = await load(host, port, corpus, concurrency, args.requests)
+            after = service.batcher.stats()
+            batches = after["batches"] - before["batches"]
+            mean_batch = (after["requests"] - before["requests"]) / batches if batches else 0.0
+            stats = summarize(latencies)
+            rows.append((concurrency, throughput, stats["p50_ms"], stats["p95_ms"], mean_batch, rejected))
+        await service.stop()
+        print_table(
+            f"/predict load test, {label} (max batch size {max_batch_size}, max wait {args.max_wait_ms} ms)",
+            ("concurrency", "requests_s", "p50_ms", "p95_ms", "mean_batch", "rejected_429"),
+            rows,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the HTTP inference service.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench_session_list.py - Sidebar startup cost versus archive size
+#
+# Run with: python -m benchmarks.bench_session_list
+#
+# Startup only reads the first page of the session store; the folder scan runs
+# in the background. Both are timed here without Tk for growing archives.
+
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from session_store import SessionStore
+from benchmarks.common import print_table
+
+PAGE_SIZE = 200  # Matches ui_main.SESSION_PAGE_SIZE
+
+
+def build_store(path, count):
+    """Create a store with count sessions in one bulk insert."""
+    store = SessionStore(path)
+    store.close()
+    with sqlite3.connect(path) as conn:
+        now = datetime.now().isoformat()
+        conn.executemany(
+            "INSERT INTO sessions (id, name, path, created_at) VALUES (?, ?, ?, ?)",
+            ((i, f"Session_{i}", f"./data/sessions/Session_{i}", now) for i in range(1, count + 1)),
+        )
+    return SessionStore(path)
+
+
+def main():
+    rows = []
+    for count in (10, 1000, 100000):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = build_store(os.path.join(tmp, "sessions.db"), count)
+
+            start = time.perf_counter()
+            first_page = store.list(limit=PAGE_SIZE)
+            startup_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            last_id = None
+            while True:
+                page = store.list(limit=1000, after_id=last_id)
+                if not page:
+                    break
+                for session in page:
+                    os.path.isdir(session["path"])
+                last_id = page[-1]["id"]
+            scan_ms = (time.perf_counter() - start) * 1000
+            store.close()
+        rows.append((count, len(first_page), startup_ms, scan_ms))
+    print_table("Session sidebar: first page (blocking) vs folder scan (background)",
+                ("sessions", "first_page", "startup_ms", "scan_ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# bench_startup.py - Import time and time-to-first-window with lazy model loading
+#
+# Run with: python -m benchmarks.bench_startup
+
+import subprocess
+import sys
+from benchmarks.common import print_table
+
+# Each probe runs in a fresh interpreter so nothing is already imported or cached
+PROBES = {
+    "import predictor": "import predictor",
+    "first prediction": "import predictor; predictor.predict_disease('cough fever')",
+    "first window": (
+        "import tkinter as tk, ui_main\n"
+        "root = tk.Tk()\n"
+        "app = ui_main.DiseasesEaseApp(root)\n"
+        "root.update()\n"
+        "root.destroy()"
+    ),
+}
+
+
+def run_probe(code):
+    """Return the wall-clock seconds a fresh interpreter needs to run code, or None on failure."""
+    timed = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - _start)"
+    )
+    result = subprocess.run([sys.executable, "-c", timed], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def import_time_breakdown(module, top=5):
+    """Return the slowest cumulative imports reported by python -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        entries.append((name, int(cumulative) / 1e6))
+    return sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]
+
+
+def main():
+    rows = []
+    for name, code in PROBES.items():
+        seconds = run_probe(code)
+        rows.append((name, seconds if seconds is not None else "unavailable"))
+    print_table("Startup (fresh interpreter, seconds)", ("probe", "seconds"), rows)
+
+    print_table("python -X importtime: slowest imports of predictor (seconds)",
+                ("module", "seconds"), import_time_breakdown("predictor"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# bench_transcribe.py - First (cold model) vs later (cached model) transcribe_audio calls
+#
+# Run with: python -m benchmarks.bench_transcribe [wav files...]
+
+import glob
+import sys
+import time
+import wave
+from audio_handler import transcribe_audio
+from benchmarks.common import print_table
+
+DEFAULT_FILES = "./data/sessions/*/output*.wav"
+
+
+def audio_seconds(path):
+    """Return the duration of a WAV file in seconds."""
+    with wave.open(path, "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def main():
+    files = sys.argv[1:] or sorted(glob.glob(DEFAULT_FILES))
+    if not files:
+        print(f"No WAV files found under {DEFAULT_FILES}")
+        return
+
+    rows = []
+    for call in range(3):
+        for path in files:
+            start = time.perf_counter()
+            transcribe_audio(path)
+            elapsed = time.perf_counter() - start
+            rows.append((call + 1, path.split("/")[-2], audio_seconds(path), elapsed, elapsed / audio_seconds(path)))
+    print_table("transcribe_audio: the first call loads the Vosk model, later calls reuse it",
+                ("pass", "session", "audio_s", "wall_s", "rtf"), rows)
+
+
+if __name__ == "__main__":
+    main()
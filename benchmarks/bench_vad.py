@@ -0,0 +1,43 @@
+# bench_vad.py - Decode time with and without voice-activity detection
+#
+# Run with: python -m benchmarks.bench_vad [wav files...]
+
+import glob
+import sys
+import time
+import wave
+from audio_handler import transcribe_audio
+from vad import EnergyVAD
+from benchmarks.common import print_table
+
+DEFAULT_FILES = "./data/sessions/*/output*.wav"
+
+
+def main():
+    files = sys.argv[1:] or sorted(glob.glob(DEFAULT_FILES))
+    rows = []
+    for path in files:
+        with wave.open(path, "rb") as wf:
+            audio = wf.readframes(wf.getnframes())
+            seconds = wf.getnframes() / wf.getframerate()
+
+        vad = EnergyVAD()
+        start = time.perf_counter()
+        vad.filter(audio)
+        vad_ms = (time.perf_counter() - start) * 1000
+
+        transcribe_audio(path)  # Load the model outside the timed calls
+        start = time.perf_counter()
+        transcribe_audio(path)
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        transcribe_audio(path, vad=EnergyVAD())
+        gated = time.perf_counter() - start
+
+        rows.append((path.split("/")[-2], seconds, 1 - vad.kept_ratio, vad_ms, full, gated, 1 - gated / full))
+    print_table("Decode time with VAD (silence share should track time saved)",
+                ("session", "audio_s", "silence", "vad_ms", "full_s", "vad_s", "saved"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# common.py - Shared timing helpers for the benchmark scripts
+
+import sys
+import time
+import numpy as np
+
+
+def measure(func, *args, repeat=20, warmup=1):
+    """Call func repeatedly and return the wall-clock duration of each call in seconds."""
+    for _ in range(warmup):
+        func(*args)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    """Return mean and p50/p95/p99 of a list of durations, in milliseconds."""
+    values = np.asarray(samples) * 1000.0
+    return {
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def print_table(title, header, rows):
+    """Print benchmark rows as a fixed-width table."""
+    print(title)
+    print("  ".join(f"{column:>14}" for column in header))
+    for row in rows:
+        print("  ".join(f"{value:>14.4f}" if isinstance(value, float) else f"{value:>14}" for value in row))
+    print()
+
+
+def peak_rss_mb():
+    """Return this process's peak resident set size in MB."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+                )
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
@@ -0,0 +1,62 @@
+# compare_grammar.py - Full-vocabulary vs feature-vocabulary constrained decoding
+#
+# Run with: python -m benchmarks.compare_grammar [.wav/.sea files...]
+#
+# The full-vocabulary transcript is the reference. Feature-token recall is the share
+# of its tokens found in features.pkl that the constrained decode also produced.
+
+import glob
+import sys
+import time
+from collections import Counter
+from audio_handler import feature_grammar, transcribe_audio
+from predictor import load_features
+from benchmarks.common import print_table
+from sea_audio import AUDIO_EXTENSIONS, open_audio
+
+DEFAULT_FILES = "./data/sessions/*/output*"  # .wav and .sea recordings
+
+
+def feature_counts(text, vocabulary):
+    """Count the feature tokens of a transcript, tokenized like predictor."""
+    return Counter(token for token in text.lower().split() if token in vocabulary)
+
+
+def timed_transcription(path, grammar=None):
+    start = time.perf_counter()
+    text = transcribe_audio(path, grammar=grammar)
+    return text, time.perf_counter() - start
+
+
+def main():
+    files = sys.argv[1:] or sorted(path for path in glob.glob(DEFAULT_FILES) if path.endswith(AUDIO_EXTENSIONS))
+    vocabulary = set(load_features())
+    grammar = feature_grammar()
+
+    # Load the model and build both recognizer pools before timing anything
+    transcribe_audio(files[0])
+    transcribe_audio(files[0], grammar=grammar)
+
+    rows = []
+    total_reference = total_found = 0
+    for path in files:
+        with open_audio(path, "rb") as wf:
+            seconds = wf.getnframes() / wf.getframerate()
+        full_text, full_time = timed_transcription(path)
+        constrained_text, constrained_time = timed_transcription(path, grammar)
+
+        reference = feature_counts(full_text, vocabulary)
+        found = sum((reference & feature_counts(constrained_text, vocabulary)).values())
+        total_reference += sum(reference.values())
+        total_found += found
+        recall = found / sum(reference.values()) if reference else 1.0
+        rows.append((path.split("/")[-2], seconds, full_time / seconds, constrained_time / seconds, recall))
+
+    print_table("Full vs constrained decoding (rtf = decode seconds per audio second)",
+                ("session", "audio_s", "full_rtf", "grammar_rtf", "recall"), rows)
+    if total_reference:
+        print(f"Overall feature-token recall: {total_found / total_reference:.2%} of {total_reference} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# suite.py - End-to-end benchmark suite with JSON results and baseline comparison
+#
+# Run with: python -m benchmarks.suite [--output FILE] [--baseline FILE] [--threshold 0.2] [--save-baseline]
+#
+# Stages (each in a fresh process, so its peak RSS is its own):
+#   transcribe     real Vosk decode of the stored data/sessions/*/output* recordings
+#   predict        predict_disease on a synthetic transcript corpus, one call per transcript
+#   predict_batch  predict_disease_batch over the same corpus
+#
+# Results are written as JSON. With --baseline, every metric is compared to the
+# stored run and the script exits with status 1 if any regressed by more than
+# --threshold (a fraction, 0.2 = 20%).
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from benchmarks.common import peak_rss_mb, summarize
+from sea_audio import AUDIO_EXTENSIONS, open_audio
+
+DEFAULT_FILES = "./data/sessions/*/output*"  # .wav and .sea recordings
+DEFAULT_OUTPUT = "./benchmarks/results/latest.json"
+DEFAULT_BASELINE = "./benchmarks/results/baseline.json"
+
+# Metrics compared against the baseline, and whether bigger values are better
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "rtf": False,
+    "throughput": True,
+    "peak_rss_mb": False,
+}
+
+
+def stage_transcribe(files):
+    """Decode each file with the real model; latency per file, RTF and audio-seconds per second."""
+    from audio_handler import MODEL_PATH, get_vosk_model, transcribe_audio
+
+    if not files:
+        return {"skipped": f"No recordings found under {DEFAULT_FILES}"}
+    if not os.path.exists(MODEL_PATH):
+        return {"skipped": f"Vosk model not found at {MODEL_PATH}"}
+
+    start = time.perf_counter()
+    try:
+        get_vosk_model(MODEL_PATH)
+    except Exception as e:  # Vosk raises a bare Exception for an incomplete model directory
+        return {"skipped": f"Vosk model at {MODEL_PATH} could not be loaded: {e}"}
+    load_seconds = time.perf_counter() - start
+
+    samples, audio_total = [], 0.0
+    for path in files:
+        with open_audio(path, "rb") as wf:
+            audio_total += wf.getnframes() / wf.getframerate()
+        start = time.perf_counter()
+        transcribe_audio(path)
+        samples.append(time.perf_counter() - start)
+
+    result = summarize(samples)
+    result.update(
+        count=len(samples),
+        model_load_s=load_seconds,
+        audio_s=audio_total,
+        rtf=sum(samples) / audio_total if audio_total else 0.0,
+        throughput=audio_total / sum(samples),
+        throughput_unit="audio-s/s",
+    )
+    return result
+
+
+@contextmanager
+def _prediction_cache_disabled():
+    """Turn the global prediction cache off, then put the previous one back."""
+    import predictor
+
+    previous = predictor._cache
+    predictor.configure_cache(max_entries=0)
+    try:
+        yield
+    finally:
+        predictor._cache = previous
+
+
+def stage_predict(count, length):
+    """Score the synthetic corpus one transcript at a time, with the prediction cache off."""
+    import predictor
+    from benchmarks.bench_batch_predict import synthetic_corpus
+
+    with _prediction_cache_disabled():
+        corpus = synthetic_corpus(count, length)
+        start = time.perf_counter()
+        predictor.predict_disease(corpus[0])  # Loads the model
+        load_seconds = time.perf_counter() - start
+
+        samples = []
+        for transcription in corpus:
+            start = time.perf_counter()
+            predictor.predict_disease(transcription)
+            samples.append(time.perf_counter() - start)
+
+        result = summarize(samples)
+        result.update(count=count, model_load_s=load_seconds, backend=predictor._handle.backend,
+                      throughput=count / sum(samples), throughput_unit="transcripts/s")
+    return result
+
+
+def stage_predict_batch(count, length, batch_size=256):
+    """Score the synthetic corpus in batches; latency is per batch."""
+    import predictor
+    from benchmarks.bench_batch_predict import synthetic_corpus
+
+    with _prediction_cache_disabled():
+        corpus = synthetic_corpus(count, length)
+        predictor.predict_disease(corpus[0])
+
+        samples = []
+        for start_index in range(0, count, batch_size):
+            chunk = corpus[start_index:start_index + batch_size]
+            start = time.perf_counter()
+            for _ in predictor.predict_disease_batch(chunk, k=2, batch_size=batch_size):
+                pass
+            samples.append(time.perf_counter() - start)
+
+        result = summarize(samples)
+        result.update(count=count, batch_size=batch_size, backend=predictor._handle.backend,
+                      throughput=count / sum(samples), throughput_unit="transcripts/s")
+    return result
+
+
+def _run_stage(stage, args):
+    result = stage(*args)
+    if "skipped" not in result:
+        result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_suite(files, corpus_size=1000, length=200, stages=None):
+    """Run the selected stages, each in its own process; returns the results document."""
+    all_stages = {
+        "transcribe": (stage_transcribe, (files,)),
+        "predict": (stage_predict, (corpus_size, length)),
+        "predict_batch": (stage_predict_batch, (corpus_size, length)),
+    }
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in stages or all_stages:
+        stage, args = all_stages[name]
+        print(f"Running {name}...", file=sys.stderr)
+        with context.Pool(1) as pool:
+            try:
+                results[name] = pool.apply(_run_stage, (stage, args))
+            except Exception as e:
+                results[name] = {"error": str(e)}
+    return {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stages": results,
+    }
+
+
+def compare(results, baseline, threshold=0.2):
+    """Return (stage, metric, baseline, current, change) for every metric that got worse than threshold."""
+    regressions = []
+    for name, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if not previous or "skipped" in current or "error" in current:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in current or not previous.get(metric):
+                continue
+            change = (current[metric] - previous[metric]) / previous[metric]
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append((name, metric, previous[metric], current[metric], change))
+    return regressions
+
+
+def print_results(results):
+    for name, stage in results["stages"].items():
+        if "skipped" in stage or "error" in stage:
+            print(f"{name:>14}: {stage.get('skipped') or 'error: ' + stage['error']}")
+            continue
+        rtf = f"  rtf {stage['rtf']:.3f}" if "rtf" in stage else ""
+        print(f"{name:>14}: p50 {stage['p50_ms']:.3f} ms  p95 {stage['p95_ms']:.3f} ms  p99 {stage['p99_ms']:.3f} ms"
+              f"  {stage['throughput']:.1f} {stage['throughput_unit']}{rtf}  peak RSS {stage['peak_rss_mb']:.0f} MB")
+
+
+def save_json(document, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcription and prediction and compare to a baseline.")
+    parser.add_argument("files", nargs="*", help=f".wav/.sea files to decode (default: {DEFAULT_FILES})")
+    parser.add_argument("--stages", nargs="+", choices=("transcribe", "predict", "predict_batch"))
+    parser.add_argument("--corpus-size", type=int, default=1000, help="Synthetic transcripts to score")
+    parser.add_argument("--length", type=int, default=200, help="Words per synthetic transcript")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store this run as the new baseline")
+    args = parser.parse_args()
+
+    files = args.files or sorted(path for path in glob.glob(DEFAULT_FILES) if path.endswith(AUDIO_EXTENSIONS))
+    results = run_suite(files, args.corpus_size, args.length, args.stages)
+    print_results(results)
+    save_json(results, args.output)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        save_json(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, metric, previous, current, change in regressions:
+            print(f"REGRESSION {name}.{metric}: {previous:.3f} -> {current:.3f} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# inference_pool.py - Score transcripts on several cores with one shared copy of the model
+#
+# Usage:
+#     with InferencePool(workers=4) as pool:
+#         for predictions in pool.predict(transcriptions, k=2):
+#             ...
+#
+# Run with: python inference_pool.py FILE [--workers N] [--batch-size 256]   # One transcript per line
+#
+# The parent process puts the NumpyEngine weights (scaler already folded in)
+# and the feature vocabulary into a single multiprocessing.shared_memory
+# block. Worker processes map that block and build their engine and
+# vocabulary as views over it, so the weights exist once in RAM however many
+# workers there are, and no worker imports TensorFlow or unpickles anything.
+# The vocabulary is stored as a sorted fixed-width byte array with the column
+# of each word, so a worker featurizes a batch with one np.searchsorted call
+# instead of building its own token dictionary.
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+import numpy as np
+from numpy_engine import NumpyEngine, export_engine
+from predictor import (ENGINE_PATH, FEATURES_PATH, MODEL_PATH, SCALER_PATH, ModelHandle, load_features, tokenize,
+                       top_k_predictions)
+
+ALIGNMENT = 64  # Byte alignment of each array in the shared block
+
+_worker = None  # (shared memory, engine, vocabulary, columns, feature count) inside a worker process
+
+
+def pack_model(engine, features):
+    """Copy the engine and vocabulary into a new shared memory block; returns (block, layout).
+
+    layout describes every array as (name, dtype, shape, offset) plus the
+    activations, and is all a worker needs besides the block's name.
+    """
+    # Same token -> column mapping as predictor.Featurizer (the last occurrence wins)
+    index = {token: i for i, token in enumerate(features)}
+    words = sorted(token.encode("utf-8") for token in index)
+    vocabulary = np.array(words, dtype=f"S{max((len(w) for w in words), default=1)}")
+    columns = np.array([index[w.decode("utf-8")] for w in words], dtype=np.int32)
+
+    arrays = [("vocabulary", vocabulary), ("columns", columns)]
+    for i, (weight, bias) in enumerate(zip(engine.weights, engine.biases)):
+        arrays += [(f"weight_{i}", weight), (f"bias_{i}", bias)]
+    entries, offset = [], 0
+    for name, array in arrays:
+        entries.append((name, array.dtype.str, array.shape, offset))
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (name, dtype, shape, start), (_, array) in zip(entries, arrays):
+        np.ndarray(shape, dtype, buffer=block.buf, offset=start)[...] = array
+    layout = {"arrays": entries, "activations": engine.activations, "features": len(features)}
+    return block, layout
+
+
+def attach_model(name, layout):
+    """Map a block made by pack_model; returns (block, engine, vocabulary, columns, feature count)."""
+    block = shared_memory.SharedMemory(name=name)
+    views = {}
+    for array_name, dtype, shape, offset in layout["arrays"]:
+        view = np.ndarray(shape, dtype, buffer=block.buf, offset=offset)
+        view.flags.writeable = False  # Shared by every worker
+        views[array_name] = view
+    layers = len(layout["activations"])
+    engine = NumpyEngine(
+        [views[f"weight_{i}"] for i in range(layers)], [views[f"bias_{i}"] for i in range(layers)],
+        layout["activations"]
+    )
+    return block, engine, views["vocabulary"], views["columns"], layout["features"]
+
+
+def count_matrix(transcriptions, vocabulary, columns, size):
+    """Return the float32 count matrix of a batch, looking words up in the sorted vocabulary."""
+    width = vocabulary.dtype.itemsize
+    tokens, lengths = [], []
+    for transcription in transcriptions:
+        # Longer words cannot be in the vocabulary, and would be truncated by the fixed-width dtype
+        words = [word for word in (token.encode("utf-8") for token in tokenize(transcription)) if len(word) <= width]
+        tokens.extend(words)
+        lengths.append(len(words))
+    tokens = np.array(tokens, dtype=vocabulary.dtype)
+    positions = np.minimum(np.searchsorted(vocabulary, tokens), len(vocabulary) - 1)
+    found = vocabulary[positions] == tokens
+    rows = np.repeat(np.arange(len(transcriptions)), lengths)[found]
+    cells = rows * size + columns[positions[found]]
+    counts = np.bincount(cells, minlength=len(transcriptions) * size)
+    return counts.reshape(len(transcriptions), size).astype(np.float32)
+
+
+def _init_worker(name, layout):
+    global _worker
+    _worker = attach_model(name, layout)
+
+
+def _score_batch(transcriptions, k):
+    """Return the top-k predictions of each transcription (runs in a worker process)."""
+    _, engine, vocabulary, columns, size = _worker
+    probabilities = engine.predict(count_matrix(transcriptions, vocabulary, columns, size))
+    return [[(disease, float(p)) for disease, p in top_k_predictions(row, k)] for row in probabilities]
+
+
+def load_engine(model_path=MODEL_PATH, scaler_path=SCALER_PATH, engine_path=ENGINE_PATH):
+    """Return the current NumpyEngine, exporting it from the Keras model first if it is missing or stale."""
+    handle = ModelHandle(model_path, FEATURES_PATH, scaler_path, engine_path)
+    engine = handle._load_engine()
+    if engine is None:
+        print(f"Exporting {engine_path} so the workers do not need TensorFlow")
+        engine = export_engine(model_path, scaler_path, engine_path)
+    return engine
+
+
+class InferencePool:
+    """A pool of worker processes running predict_disease_batch over one shared copy of the model.
+
+    Transcriptions are sent to the workers in batches of batch_size, with at
+    most two batches per worker in flight, and results come back in input
+    order. Call close() (or use it as a context manager) to stop the workers
+    and free the shared memory.
+    """
+    def __init__(self, workers=None, batch_size=256, features_path=FEATURES_PATH, model_path=MODEL_PATH,
+                 scaler_path=SCALER_PATH, engine_path=ENGINE_PATH):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        engine = load_engine(model_path, scaler_path, engine_path)
+        self._block, layout = pack_model(engine, load_features(features_path))
+        self.shared_bytes = self._block.size
+        # Spawned workers start clean, without whatever the parent imported (such as TensorFlow)
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                                         initargs=(self._block.name, layout))
+
+    def predict(self, transcriptions, k=2):
+        """Yield the top-k (disease, probability) pairs of each transcription, in input order."""
+        in_flight = deque()
+        batch = []
+        for transcription in transcriptions:
+            batch.append(transcription)
+            if len(batch) == self.batch_size:
+                in_flight.append(self._pool.submit(_score_batch, batch, k))
+                batch = []
+                if len(in_flight) >= 2 * self.workers:
+                    yield from in_flight.popleft().result()
+        if batch:
+            in_flight.append(self._pool.submit(_score_batch, batch, k))
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+    def close(self):
+        if self._pool is None:
+            return
+        self._pool.shutdown(cancel_futures=True)
+        self._pool = None
+        self._block.close()
+        self._block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score transcripts (one per line) with a pool of processes.")
+    parser.add_argument("file", help="Text file with one transcript per line, or - for stdin")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--batch-size", type=int, default=256, help="Transcripts per batch sent to a worker")
+    parser.add_argument("--top-k", type=int, default=2, help="Predictions per transcript")
+    args = parser.parse_args()
+
+    f = sys.stdin if args.file == "-" else open(args.file, "r")
+    with f, InferencePool(args.workers, args.batch_size) as pool:
+        start = time.perf_counter()
+        count = 0
+        for predictions in pool.predict((line.rstrip("\n") for line in f), args.top_k):
+            print("\t".join(f"{disease}: {probability:.2%}" for disease, probability in predictions))
+            count += 1
+        elapsed = time.perf_counter() - start
+    print(f"Scored {count} transcripts in {elapsed:.2f}s with {args.workers} workers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# jobs.py - Background job executor that reports back on the Tk thread
+#
+# Worker threads never touch Tk widgets. Completion, error and progress callbacks
+# are queued and run by a root.after poll on the Tk thread.
+
+import itertools
+import queue
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """Raised inside a job that noticed it was cancelled."""
+
+
+class Job:
+    """A unit of background work: a future plus cancellation and progress reporting."""
+    def __init__(self, executor, job_id, name, on_done, on_error, on_progress):
+        self.executor = executor
+        self.id = job_id
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future = None
+        self.started = False
+        self.progress = 0.0
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Cancel the job; a pending job never runs, a running one stops at its next progress report."""
+        self._cancel_event.set()
+        return self.future.cancel()
+
+    def report_progress(self, fraction, message=None):
+        """Called from the job: publish progress (0..1) and stop here if cancelled."""
+        if self.cancelled:
+            raise JobCancelled(self.name)
+        self.progress = fraction
+        if self.on_progress:
+            self.executor.post(self.on_progress, self, fraction, message)
+
+
+class JobExecutor:
+    """Run callables on a worker pool and deliver their callbacks on the Tk thread."""
+    def __init__(self, root, max_workers=2, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._callbacks = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.jobs = {}  # Pending and running jobs by id
+        self.root.after(self.poll_ms, self._drain)
+
+    def submit(self, func, *args, name=None, on_done=None, on_error=None, on_progress=None, **kwargs):
+        """Queue func(job, *args, **kwargs) and return its Job.
+
+        on_done(job, result), on_error(job, exception) and
+        on_progress(job, fraction, message) run on the Tk thread. A cancelled
+        job reports a JobCancelled error.
+        """
+        job = Job(self, next(self._ids), name or getattr(func, "__name__", "job"), on_done, on_error, on_progress)
+
+        def run():
+            if job.cancelled:
+                raise JobCancelled(job.name)
+            job.started = True
+            return func(job, *args, **kwargs)
+
+        with self._lock:
+            self.jobs[job.id] = job
+            job.future = self._pool.submit(run)
+        job.future.add_done_callback(lambda _: self.post(self._finish, job))
+        return job
+
+    def pending(self):
+        """Jobs that are queued but have not started yet."""
+        with self._lock:
+            return [job for job in self.jobs.values() if not job.started]
+
+    def running(self):
+        with self._lock:
+            return [job for job in self.jobs.values() if job.started and not job.future.done()]
+
+    def post(self, callback, *args):
+        """Schedule callback(*args) on the Tk thread (safe to call from any thread)."""
+        self._callbacks.put((callback, args))
+
+    def shutdown(self, cancel_pending=True):
+        """Stop accepting jobs; optionally drop the ones that have not started."""
+        if cancel_pending:
+            for job in self.pending():
+                job.cancel()
+        self._pool.shutdown(wait=False)
+
+    def _finish(self, job):
+        with self._lock:
+            self.jobs.pop(job.id, None)
+        try:
+            result = job.future.result()
+        except CancelledError:
+            error = JobCancelled(job.name)
+        except Exception as e:
+            error = e
+        else:
+            if job.on_done:
+                job.on_done(job, result)
+            return
+        if job.on_error:
+            job.on_error(job, error)
+        else:
+            print(f"Error in background job {job.name}: {error}")
+
+    def _drain(self):
+        """Run queued callbacks on the Tk thread, then poll again."""
+        try:
+            while True:
+                callback, args = self._callbacks.get_nowait()
+                try:
+                    callback(*args)
+                except Exception as e:
+                    print(f"Error in job callback: {e}")
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_ms, self._drain)
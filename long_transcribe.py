@@ -0,0 +1,158 @@
+# long_transcribe.py - Split long recordings at pauses and decode the pieces in parallel
+#
+# Run with: python long_transcribe.py RECORDING.wav [--workers N] [--segment-seconds 60] [--compare]
+#
+# A single recognizer decodes a file strictly in order, so a one-hour consultation
+# takes an hour of decode time on one core. Here the file is cut near every
+# segment_seconds at the longest pause close by, each segment (plus a little
+# overlap on both sides for context) is decoded in a worker process, and the
+# words are stitched back by their timestamps: every word belongs to the
+# segment whose own span contains the word's midpoint.
+
+import argparse
+import difflib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from audio_handler import MODEL_PATH, get_recognizer_pool, transcribe_audio
+from sea_audio import open_audio
+from batch_transcribe import _init_worker
+from vad import EnergyVAD
+
+SEGMENT_SECONDS = 60.0  # Target length of one parallel segment
+SEARCH_SECONDS = 10.0  # How far from the target point to look for a pause
+OVERLAP_SECONDS = 1.0  # Extra audio decoded on each side of a segment
+
+
+def find_split_points(audio_file, segment_seconds=SEGMENT_SECONDS, search_seconds=SEARCH_SECONDS, vad=None):
+    """Return WAV frame (sample) offsets to cut at: the middle of the longest pause near every segment_seconds."""
+    vad = vad or EnergyVAD()
+    with open_audio(audio_file, "rb") as wf:
+        rate = wf.getframerate()
+        frame_length = vad.frame_length
+        # Classify 20 ms frames block by block instead of holding the whole file in memory
+        speech = []
+        while True:
+            data = wf.readframes(frame_length * 500)
+            n = len(data) // (2 * frame_length)
+            if n == 0:
+                break
+            frames = np.frombuffer(data[:n * 2 * frame_length], dtype="<i2").reshape(n, frame_length)
+            speech.append(vad.is_speech(frames))
+    speech = np.concatenate(speech) if speech else np.zeros(0, dtype=bool)
+
+    # Work in frame units from here on
+    segment_frames = segment_seconds * rate / frame_length
+    search_frames = search_seconds * rate / frame_length
+    points, previous = [], 0
+    target = segment_frames
+    while target + segment_frames / 2 < len(speech):
+        low = max(int(target - search_frames), previous + 1)
+        high = min(int(target + search_frames), len(speech))
+        split = _middle_of_longest_pause(speech[low:high])
+        previous = low + split if split is not None else int(target)
+        points.append(previous * frame_length)
+        target = previous + segment_frames
+    return points
+
+
+def _middle_of_longest_pause(speech):
+    """Return the index in the middle of the longest non-speech run, or None if it is all speech."""
+    silence = np.concatenate(([False], ~speech, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(silence))
+    if len(edges) == 0:
+        return None
+    starts, ends = edges[0::2], edges[1::2]  # Silence runs are [start, end)
+    longest = int(np.argmax(ends - starts))
+    return int((starts[longest] + ends[longest]) // 2)
+
+
+def _decode_segment(audio_file, start, end, model_path=MODEL_PATH):
+    """Decode frames [start, end) in a worker; returns words with absolute times in seconds."""
+    with open_audio(audio_file, "rb") as wf:
+        rate = wf.getframerate()
+        wf.setpos(start)
+        pool = get_recognizer_pool(model_path, rate)
+        words = []
+        with pool.recognizer() as recognizer:
+            recognizer.SetWords(True)
+            try:
+                remaining = end - start
+                while remaining > 0:
+                    data = wf.readframes(min(4000, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data) // 2
+                    if recognizer.AcceptWaveform(data):
+                        words.extend(json.loads(recognizer.Result()).get("result", []))
+                words.extend(json.loads(recognizer.FinalResult()).get("result", []))
+            finally:
+                recognizer.SetWords(False)  # The pool may hand this recognizer to transcribe_audio next
+    offset = start / rate
+    return [(w["word"], w["start"] + offset, w["end"] + offset) for w in words]
+
+
+def stitch(segments):
+    """Join per-segment words given as (core_start_s, core_end_s, words), keeping each word exactly once."""
+    text = []
+    for core_start, core_end, words in segments:
+        text.extend(word for word, start, end in words if core_start <= (start + end) / 2 < core_end)
+    return " ".join(text)
+
+
+def transcribe_long(audio_file, model_path=MODEL_PATH, workers=None, segment_seconds=SEGMENT_SECONDS,
+                    overlap_seconds=OVERLAP_SECONDS):
+    """Transcribe a long recording (.wav or .sea) by decoding pause-delimited segments in parallel processes.
+
+    Recordings shorter than two segments are decoded serially with transcribe_audio.
+    """
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model not found at {model_path}")
+    with open_audio(audio_file, "rb") as wf:
+        rate, total = wf.getframerate(), wf.getnframes()
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or rate != 16000:
+            raise ValueError("Audio file must be 16 kHz mono with 16-bit samples")
+    if total < 2 * segment_seconds * rate:
+        return transcribe_audio(audio_file, model_path)
+
+    bounds = [0] + find_split_points(audio_file, segment_seconds) + [total]
+    overlap = int(overlap_seconds * rate)
+    workers = min(workers or os.cpu_count() or 1, len(bounds) - 1)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        futures = [
+            pool.submit(_decode_segment, audio_file, max(0, start - overlap), min(total, end + overlap), model_path)
+            for start, end in zip(bounds, bounds[1:])
+        ]
+        segments = [
+            (start / rate, end / rate if end < total else float("inf"), future.result())
+            for start, end, future in zip(bounds, bounds[1:], futures)
+        ]
+    return stitch(segments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a long recording in parallel segments.")
+    parser.add_argument("audio_file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--segment-seconds", type=float, default=SEGMENT_SECONDS, help="Target segment length")
+    parser.add_argument("--model", default=MODEL_PATH, help="Vosk model directory")
+    parser.add_argument("--compare", action="store_true", help="Also decode serially and compare the words")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    text = transcribe_long(args.audio_file, args.model, args.workers, args.segment_seconds)
+    parallel = time.perf_counter() - start
+    print(text)
+    print(f"Parallel decode: {parallel:.1f}s with {args.workers} workers")
+    if args.compare:
+        start = time.perf_counter()
+        serial_words = transcribe_audio(args.audio_file, args.model).split()
+        serial = time.perf_counter() - start
+        similarity = difflib.SequenceMatcher(None, text.split(), serial_words, autojunk=False).ratio()
+        print(f"Serial decode: {serial:.1f}s ({serial / parallel:.1f}x slower); word sequence similarity {similarity:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# metrics.py - Per-stage latency spans with in-process histograms
+#
+# Usage:
+#     with metrics.span("predictor.inference"):
+#         ...
+#
+#     @metrics.timed("ui.session_select")
+#     def on_session_select(self, event): ...
+#
+# Everything is off until enable() is called; a disabled span is a shared
+# no-op context manager and a disabled timed() function calls straight
+# through, so instrumented code costs under a microsecond per call.
+# Histograms are exported as Prometheus text (export_prometheus) or appended
+# to a JSON Lines log (export_json).
+
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+METRIC_NAME = "symptomsease_stage_seconds"
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = False
+_histograms = {}  # stage -> Histogram
+_lock = threading.Lock()
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    """Bucketed latency distribution of one stage, in seconds."""
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (self.max,), self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def is_enabled():
+    return _enabled
+
+
+def span(stage):
+    """Context manager timing the enclosed block as one observation of stage."""
+    if not _enabled:
+        return _NOOP
+    return _Span(stage)
+
+
+def timed(stage=None):
+    """Decorator timing every call of the function (stage defaults to module.qualname)."""
+    def decorator(func):
+        name = stage or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def observe(stage, seconds):
+    """Record one duration for stage."""
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def snapshot():
+    """Return {stage: {count, sum_s, mean_s, p50_s, p95_s, p99_s, max_s}} for every stage seen so far."""
+    with _lock:
+        return {
+            stage: {
+                "count": h.count,
+                "sum_s": h.sum,
+                "mean_s": h.sum / h.count,
+                "p50_s": h.quantile(0.50),
+                "p95_s": h.quantile(0.95),
+                "p99_s": h.quantile(0.99),
+                "max_s": h.max,
+            }
+            for stage, h in sorted(_histograms.items())
+        }
+
+
+def to_prometheus():
+    """Render every histogram in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent per pipeline stage.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    with _lock:
+        for stage, h in sorted(_histograms.items()):
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{label}"}} {h.sum!r}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{label}"}} {h.count}')
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(path):
+    """Write the Prometheus text to path atomically (safe for a node_exporter textfile collector)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(to_prometheus())
+    os.replace(tmp_path, path)
+
+
+def export_json(path):
+    """Append the current snapshot as one JSON line to path."""
+    with open(path, "a") as f:
+        f.write(json.dumps({"time": time.time(), "stages": snapshot()}) + "\n")
+
+
+def export(path):
+    """Export to path as JSON Lines if it ends in .json/.jsonl, otherwise as Prometheus text."""
+    if path.endswith((".json", ".jsonl")):
+        export_json(path)
+    else:
+        export_prometheus(path)
@@ -0,0 +1,169 @@
+# model_bundle.py - One memory-mapped file holding the vocabulary, scaler and network weights
+#
+# Build once (needs TensorFlow):  python model_bundle.py
+# Load anywhere (NumPy only):     ModelBundle.load(BUNDLE_PATH).predict(count_matrix)
+#
+# Layout (little-endian):
+#     header    magic b"SEMODEL\0", format version (u32), manifest length (u32),
+#               manifest CRC-32 (u32), reserved (u32)
+#     manifest  UTF-8 JSON: the name, dtype, shape, offset and CRC-32 of every
+#               array, plus the layer activations and the digest of the source
+#               files the bundle was built from
+#     arrays    raw array data, each starting on a 64-byte boundary
+#
+# Loading maps the file and wraps each array as a read-only NumPy view of the
+# mapping, so nothing is unpickled or copied, and every process that loads the
+# same bundle shares its pages through the OS page cache. The CRC-32 checks
+# read each page once; pass verify=False to skip them.
+
+import argparse
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+import zlib
+import numpy as np
+from numpy_engine import NumpyEngine, artifacts_digest, dense_layers, scaler_affine
+
+MODEL_PATH = './models/trained_model.h5'
+FEATURES_PATH = './models/features.pkl'
+SCALER_PATH = './models/scaler.pkl'
+BUNDLE_PATH = './models/model.bundle'
+
+MAGIC = b"SEMODEL\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")  # magic, version, manifest bytes, manifest CRC-32, reserved
+ALIGNMENT = 64
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_bundle(path, features, scale, offset, weights, biases, activations, source_digest=""):
+    """Write a bundle: features in column order, the scaler as x * scale + offset, then the dense layers."""
+    encoded = [token.encode("utf-8") for token in features]
+    arrays = [
+        ("features", np.array(encoded, dtype=f"S{max((len(t) for t in encoded), default=1)}")),
+        ("scaler_scale", np.asarray(scale, dtype="<f8")),
+        ("scaler_offset", np.asarray(offset, dtype="<f8")),
+    ]
+    for i, (weight, bias) in enumerate(zip(weights, biases)):
+        arrays += [(f"weight_{i}", np.asarray(weight, dtype="<f4")), (f"bias_{i}", np.asarray(bias, dtype="<f4"))]
+
+    # Offsets are relative to the end of the manifest, which is itself padded to the alignment
+    entries, position = {}, 0
+    for name, array in arrays:
+        array = np.ascontiguousarray(array)
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position,
+                         "crc32": zlib.crc32(array.tobytes())}
+        position = _align(position + array.nbytes)
+    manifest = json.dumps({
+        "arrays": entries,
+        "activations": list(activations),
+        "source_digest": source_digest,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }).encode("utf-8")
+    manifest += b" " * (_align(HEADER.size + len(manifest)) - HEADER.size - len(manifest))
+
+    # Write to a temporary file first so a crash never leaves a truncated bundle
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(manifest), zlib.crc32(manifest), 0))
+        f.write(manifest)
+        start = f.tell()
+        for name, array in arrays:
+            f.write(b"\0" * (start + entries[name]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_bundle(model_path=MODEL_PATH, features_path=FEATURES_PATH, scaler_path=SCALER_PATH, out_path=BUNDLE_PATH):
+    """Pack the Keras model, feature list and scaler into a bundle (the only step that needs TensorFlow)."""
+    from tensorflow.keras.models import load_model
+
+    with open(features_path, 'rb') as f:
+        features = pickle.load(f)
+    with open(scaler_path, 'rb') as f:
+        scale, offset = scaler_affine(pickle.load(f))
+    weights, biases, activations = dense_layers(load_model(model_path))
+    return write_bundle(out_path, features, scale, offset, weights, biases, activations,
+                        artifacts_digest(model_path, features_path, scaler_path))
+
+
+class ModelBundle:
+    """A loaded bundle: the feature list, the scaler and a NumpyEngine, all backed by one mmap."""
+    def __init__(self, mapping, manifest, arrays):
+        self._mapping = mapping  # Keeps the views valid
+        self.version = VERSION
+        self.source_digest = manifest["source_digest"]
+        self.created_at = manifest.get("created_at")
+        self.features = [token.decode("utf-8") for token in arrays["features"].tolist()]
+        self.scale = arrays["scaler_scale"]
+        self.offset = arrays["scaler_offset"]
+        layers = len(manifest["activations"])
+        self.engine = NumpyEngine(
+            [arrays[f"weight_{i}"] for i in range(layers)], [arrays[f"bias_{i}"] for i in range(layers)],
+            manifest["activations"], self.source_digest
+        )
+
+    @classmethod
+    def load(cls, path=BUNDLE_PATH, verify=True):
+        """Map a bundle file; raises ValueError if it is not a bundle, has another version or fails a checksum."""
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(mapping) < HEADER.size:
+                raise ValueError(f"{path} is too short to be a model bundle")
+            magic, version, manifest_size, manifest_crc, _ = HEADER.unpack_from(mapping, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a model bundle")
+            if version != VERSION:
+                raise ValueError(f"{path} has bundle version {version}; this code reads version {VERSION}")
+            manifest_bytes = mapping[HEADER.size:HEADER.size + manifest_size]
+            if zlib.crc32(manifest_bytes) != manifest_crc:
+                raise ValueError(f"{path}: manifest checksum mismatch")
+            manifest = json.loads(manifest_bytes)
+
+            start = HEADER.size + manifest_size
+            arrays = {}
+            for name, entry in manifest["arrays"].items():
+                dtype = np.dtype(entry["dtype"])
+                count = int(np.prod(entry["shape"], dtype=np.int64))
+                if start + entry["offset"] + count * dtype.itemsize > len(mapping):
+                    raise ValueError(f"{path} is truncated")
+                view = np.frombuffer(mapping, dtype=dtype, count=count, offset=start + entry["offset"])
+                if verify and zlib.crc32(view) != entry["crc32"]:
+                    raise ValueError(f"{path}: checksum mismatch in {name}")
+                arrays[name] = view.reshape(entry["shape"])
+        except Exception:
+            arrays = view = None  # Release the views so the mapping can be closed
+            mapping.close()
+            raise
+        return cls(mapping, manifest, arrays)
+
+    def predict(self, counts):
+        """Return class probabilities for a matrix of raw count vectors."""
+        scaled = np.asarray(counts, dtype=np.float64) * self.scale + self.offset
+        return self.engine.predict(scaled)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the classifier files into one memory-mapped model bundle.")
+    parser.add_argument("--model", default=MODEL_PATH, help="Keras .h5 model")
+    parser.add_argument("--features", default=FEATURES_PATH, help="Pickled feature list")
+    parser.add_argument("--scaler", default=SCALER_PATH, help="Pickled scaler")
+    parser.add_argument("--out", default=BUNDLE_PATH, help="Output bundle file")
+    args = parser.parse_args()
+
+    path = build_bundle(args.model, args.features, args.scaler, args.out)
+    bundle = ModelBundle.load(path)
+    layers = " -> ".join(f"{w.shape[1]}({a})" for w, a in zip(bundle.engine.weights, bundle.engine.activations))
+    print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB): {len(bundle.features)} features -> {layers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# numpy_engine.py - TensorFlow-free inference for the dense disease classifier
+#
+# Export once (needs TensorFlow):  python numpy_engine.py
+# Serve anywhere (NumPy only):     NumpyEngine.load(ENGINE_PATH).predict(count_matrix)
+
+import argparse
+import hashlib
+import pickle
+import numpy as np
+
+MODEL_PATH = './models/trained_model.h5'
+SCALER_PATH = './models/scaler.pkl'
+ENGINE_PATH = './models/numpy_engine.npz'
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': _relu,
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+
+class NumpyEngine:
+    """A stack of dense layers evaluated with plain NumPy matrix products."""
+    def __init__(self, weights, biases, activations, source_digest=""):
+        unknown = [name for name in activations if name not in ACTIVATIONS]
+        if unknown:
+            raise ValueError(f"Unsupported activations: {unknown}")
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self.source_digest = source_digest
+
+    @property
+    def input_size(self):
+        return self.weights[0].shape[0]
+
+    def predict(self, counts):
+        """Return class probabilities for a matrix of raw (unscaled) count vectors."""
+        x = np.atleast_2d(np.asarray(counts, dtype=np.float32))
+        for weight, bias, activation in zip(self.weights, self.biases, self.activations):
+            x = x @ weight
+            x += bias
+            x = ACTIVATIONS[activation](x)
+        return x
+
+    def save(self, path):
+        """Write the engine to an .npz file."""
+        arrays = {}
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"weight_{i}"] = weight
+            arrays[f"bias_{i}"] = bias
+        np.savez(path, activations=np.array(self.activations), source_digest=np.array(self.source_digest), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Read an engine written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(name) for name in data["activations"]]
+            weights = [data[f"weight_{i}"] for i in range(len(activations))]
+            biases = [data[f"bias_{i}"] for i in range(len(activations))]
+            source_digest = str(data["source_digest"])
+        return cls(weights, biases, activations, source_digest)
+
+
+def artifacts_digest(*paths):
+    """Return a SHA-256 over the contents of the given files."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def scaler_affine(scaler):
+    """Express a fitted MinMaxScaler or StandardScaler as x * a + c per feature."""
+    if hasattr(scaler, "min_"):
+        if getattr(scaler, "clip", False):
+            raise ValueError("A clipping MinMaxScaler cannot be folded into a linear layer")
+        return np.asarray(scaler.scale_, dtype=np.float64), np.asarray(scaler.min_, dtype=np.float64)
+    if hasattr(scaler, "n_features_in_") and hasattr(scaler, "with_mean"):
+        size = scaler.n_features_in_
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(size)
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(size)
+        return 1.0 / np.asarray(scale, dtype=np.float64), -np.asarray(mean, dtype=np.float64) / scale
+    raise ValueError(f"Unsupported scaler type: {type(scaler).__name__}")
+
+
+def fold_scaler(weight, bias, scaler):
+    """Fold the scaler into the first dense layer: (x*a + c) @ W + b == x @ (a*W) + (c @ W + b)."""
+    a, c = scaler_affine(scaler)
+    weight = np.asarray(weight, dtype=np.float64)
+    return a[:, None] * weight, c @ weight + np.asarray(bias, dtype=np.float64)
+
+
+def dense_layers(model):
+    """Return the (weights, biases, activations) lists of a Keras model made of Dense layers."""
+    weights, biases, activations = [], [], []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in ("InputLayer", "Dropout"):
+            continue  # Dropout is the identity at inference time
+        if kind != "Dense":
+            raise ValueError(f"Cannot export layer {layer.name} of type {kind}")
+        weight, bias = layer.get_weights()
+        weights.append(weight)
+        biases.append(bias)
+        activations.append(layer.get_config()["activation"])
+    return weights, biases, activations
+
+
+def export_engine(model_path=MODEL_PATH, scaler_path=SCALER_PATH, out_path=ENGINE_PATH):
+    """Convert the Keras model and scaler into a NumpyEngine file and return the engine."""
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path)
+    with open(scaler_path, 'rb') as f:
+        scaler = pickle.load(f)
+
+    weights, biases, activations = dense_layers(model)
+    weights[0], biases[0] = fold_scaler(weights[0], biases[0], scaler)
+    engine = NumpyEngine(weights, biases, activations, artifacts_digest(model_path, scaler_path))
+    engine.save(out_path)
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Keras classifier to a NumPy inference engine.")
+    parser.add_argument("--model", default=MODEL_PATH, help="Keras .h5 model")
+    parser.add_argument("--scaler", default=SCALER_PATH, help="Pickled scaler to fold into the first layer")
+    parser.add_argument("--out", default=ENGINE_PATH, help="Output .npz file")
+    args = parser.parse_args()
+
+    engine = export_engine(args.model, args.scaler, args.out)
+    layers = " -> ".join(f"{w.shape[1]}({a})" for w, a in zip(engine.weights, engine.activations))
+    print(f"Exported {engine.input_size} -> {layers} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
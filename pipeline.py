@@ -0,0 +1,176 @@
+# pipeline.py - Headless audio -> transcript -> prediction pipeline writing JSON Lines
+#
+# Run with: python pipeline.py DIR_OR_GLOB [...] [--output FILE] [--workers N] [--vad] [--grammar] [--metrics FILE]
+#
+# Stages are threads joined by bounded queues: decoder workers transcribe files
+# while the scorer predicts diseases for the transcripts that are already done,
+# so decoding file N+1 overlaps scoring file N. One record is written per file
+# as soon as it finishes, in completion order.
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import metrics
+from audio_handler import MODEL_PATH, feature_grammar, transcribe_audio
+from predictor import predict_disease_batch
+from sea_audio import AUDIO_EXTENSIONS, open_audio
+from vad import EnergyVAD
+
+_DONE = object()  # End-of-stream marker passed down the queues
+
+
+def expand_inputs(inputs):
+    """Turn directories (searched recursively for .wav/.sea files), globs and files into a sorted path list."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for extension in AUDIO_EXTENSIONS:
+                paths.extend(glob.glob(os.path.join(item, "**", "*" + extension), recursive=True))
+        elif glob.has_magic(item):
+            paths.extend(glob.glob(item, recursive=True))
+        else:
+            paths.append(item)
+    return sorted(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+
+def run_pipeline(paths, workers=1, queue_size=8, batch_size=32, k=2, model_path=MODEL_PATH,
+                 use_vad=False, grammar=None):
+    """Transcribe and score paths, yielding one record per file as soon as it is scored.
+
+    workers decoder threads pull paths; a single scorer thread takes whatever
+    transcripts are waiting (up to batch_size) and scores them in one batched
+    call. Every queue holds at most queue_size items, so a slow stage holds the
+    others back instead of letting work pile up in memory.
+    """
+    path_queue = queue.Queue(queue_size)
+    transcript_queue = queue.Queue(queue_size)
+    record_queue = queue.Queue(queue_size)
+    stop = threading.Event()
+
+    def put(q, item):
+        # Give up if the consumer went away, rather than blocking on a full queue forever
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def feed():
+        for path in paths:
+            put(path_queue, path)
+        for _ in range(workers):
+            put(path_queue, _DONE)
+
+    def decode():
+        vad = EnergyVAD() if use_vad else None  # Stateful, so one per thread
+        while not stop.is_set():
+            path = path_queue.get()
+            if path is _DONE:
+                break
+            record = {"path": path}
+            try:
+                with open_audio(path, "rb") as wf:
+                    record["audio_seconds"] = wf.getnframes() / wf.getframerate()
+                start = time.perf_counter()
+                record["transcription"] = transcribe_audio(path, model_path, vad=vad, grammar=grammar)
+                record["decode_seconds"] = time.perf_counter() - start
+            except Exception as e:
+                record.update(status="error", error=str(e))
+            put(transcript_queue, record)
+        put(transcript_queue, _DONE)
+
+    def score():
+        finished_workers = 0
+        while finished_workers < workers and not stop.is_set():
+            # Block for one transcript, then take any others that are already waiting
+            batch = [transcript_queue.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(transcript_queue.get_nowait())
+                except queue.Empty:
+                    break
+            finished_workers += sum(1 for record in batch if record is _DONE)
+            records = [record for record in batch if record is not _DONE]
+            scorable = [record for record in records if "error" not in record]
+            try:
+                start = time.perf_counter()
+                predictions = list(predict_disease_batch([r["transcription"] for r in scorable], k, batch_size))
+                elapsed = time.perf_counter() - start
+                for record, top in zip(scorable, predictions):
+                    record["status"] = "ok"
+                    record["predictions"] = [
+                        {"disease": disease, "probability": float(probability)} for disease, probability in top
+                    ]
+                    record["score_seconds"] = elapsed / len(scorable)
+            except Exception as e:
+                for record in scorable:
+                    record.update(status="error", error=str(e))
+            for record in records:
+                put(record_queue, record)
+        put(record_queue, _DONE)
+
+    threads = [threading.Thread(target=feed, daemon=True), threading.Thread(target=score, daemon=True)]
+    threads += [threading.Thread(target=decode, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            record = record_queue.get()
+            if record is _DONE:
+                break
+            yield record
+    finally:
+        stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe recordings and predict diseases without the UI.")
+    parser.add_argument("inputs", nargs="+", help=".wav/.sea files, directories or glob patterns")
+    parser.add_argument("--output", default="-", help="JSON Lines output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=2, help="Decoder threads")
+    parser.add_argument("--queue-size", type=int, default=8, help="Capacity of each queue between stages")
+    parser.add_argument("--batch-size", type=int, default=32, help="Most transcripts scored in one call")
+    parser.add_argument("--top-k", type=int, default=2, help="Predictions per file")
+    parser.add_argument("--model", default=MODEL_PATH, help="Vosk model directory")
+    parser.add_argument("--vad", action="store_true", help="Skip silence with the energy VAD")
+    parser.add_argument("--grammar", action="store_true", help="Restrict decoding to the predictor vocabulary")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Export per-stage latency histograms to FILE (.json/.jsonl or Prometheus text)")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+
+    paths = expand_inputs(args.inputs)
+    grammar = feature_grammar(args.model) if args.grammar else None
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    start = time.perf_counter()
+    finished = failed = 0
+    try:
+        # Keep the decoder's progress prints out of the JSON Lines stream
+        with contextlib.redirect_stdout(sys.stderr):
+            for record in run_pipeline(paths, args.workers, args.queue_size, args.batch_size, args.top_k,
+                                       args.model, args.vad, grammar):
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                if record["status"] == "ok":
+                    finished += 1
+                else:
+                    failed += 1
+                    print(f"FAILED {record['path']}: {record['error']}")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if args.metrics:
+            metrics.export(args.metrics)
+    print(f"Processed {finished} files, {failed} failed in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# prediction_cache.py - LRU memo of model outputs keyed on the sparse count vector
+#
+# Transcripts that featurize to the same counts (short follow-ups, retries of
+# the same audio) get the same probabilities, so they only go through the
+# scaler and the model once. Entries belong to one model fingerprint: a cache
+# built for other model files is emptied instead of being reused.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of probability rows.
+
+    max_entries=0 disables caching. When path is set, save() writes the cache
+    there and the first use_fingerprint() call reads it back if it was saved
+    for the same model.
+    """
+    def __init__(self, max_entries=4096, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> read-only probability row
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(indices, counts):
+        """Hash a sparse count vector given as sorted (indices, counts) arrays."""
+        digest = hashlib.blake2b(np.asarray(indices, dtype=np.int64).tobytes(), digest_size=16)
+        digest.update(np.asarray(counts, dtype=np.int64).tobytes())
+        return digest.digest()
+
+    def use_fingerprint(self, fingerprint):
+        """Tie the cache to a model version, dropping entries made for any other one."""
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            self._entries.clear()
+            self.fingerprint = fingerprint
+            if self.path and os.path.exists(self.path):
+                self._load(self.path)
+
+    def get(self, key):
+        """Return the cached probability row, or None."""
+        with self._lock:
+            row = self._entries.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return row
+
+    def put(self, key, probabilities):
+        if self.max_entries <= 0:
+            return
+        row = np.array(probabilities, dtype=np.float32)
+        row.flags.writeable = False  # Shared between callers
+        with self._lock:
+            self._entries[key] = row
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "fingerprint": self.fingerprint,
+            }
+
+    def save(self, path=None):
+        """Write the cache to path (default self.path) as .npz; returns the path or None."""
+        path = path or self.path
+        if not path or self.fingerprint is None:
+            return None
+        with self._lock:
+            keys = np.frombuffer(b"".join(self._entries), dtype=np.uint8).reshape(-1, 16)
+            rows = np.stack(list(self._entries.values())) if self._entries else np.empty((0, 0), np.float32)
+        # Write to a temporary file first so a crash never leaves a truncated cache
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=keys, rows=rows, fingerprint=np.array(self.fingerprint))
+        os.replace(tmp_path, path)
+        return path
+
+    def _load(self, path):
+        """Read a saved cache if it matches the current fingerprint (caller holds the lock)."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != self.fingerprint:
+                    print(f"Ignoring {path}: it was saved for different model files")
+                    return
+                keys, rows = data["keys"], data["rows"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading prediction cache {path}: {e}")
+            return
+        # Keep the most recently used entries, which were saved last
+        start = max(0, len(keys) - self.max_entries)
+        for key, row in zip(keys[start:], rows[start:]):
+            row.flags.writeable = False
+            self._entries[key.tobytes()] = row
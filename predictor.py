@@ -1,36 +1,398 @@
+import os
 import numpy as np
 import pickle
-from tensorflow.keras.models import load_model
+import threading
+import time
+import zipfile
+import metrics
+from prediction_cache import PredictionCache
+
+MODEL_PATH = './models/trained_model.h5'
+FEATURES_PATH = './models/features.pkl'
+SCALER_PATH = './models/scaler.pkl'
+ENGINE_PATH = './models/numpy_engine.npz'
+BUNDLE_PATH = './models/model.bundle'
+
+
+def tokenize(dialog):
+    """Split a transcript into the lowercase tokens the model and the search index see."""
+    return dialog.lower().split()
+
+
+class Featurizer:
+    """Turn transcripts into bag-of-words count vectors over a fixed vocabulary."""
+    def __init__(self, features):
+        self.features = list(features)
+        self.size = len(self.features)
+        # Token -> column lookup, built once instead of list.index per token
+        self.index = {token: i for i, token in enumerate(self.features)}
+
+    def token_ids(self, dialog):
+        """Return the column ids of the in-vocabulary tokens of a transcript."""
+        ids = [i for i in map(self.index.get, tokenize(dialog)) if i is not None]
+        return np.array(ids, dtype=np.intp)
+
+    def transform(self, dialog):
+        """Return the dense count vector for a transcript."""
+        return np.bincount(self.token_ids(dialog), minlength=self.size).astype(np.float64)
+
+    def transform_sparse(self, dialog):
+        """Return the count vector as sorted (indices, counts) arrays of its non-zero entries."""
+        return np.unique(self.token_ids(dialog), return_counts=True)
+
+    def transform_many(self, dialogs):
+        """Return a dense count matrix with one row per transcript."""
+        rows, columns = [], []
+        for row, dialog in enumerate(dialogs):
+            ids = self.token_ids(dialog)
+            rows.append(np.full(len(ids), row, dtype=np.intp))
+            columns.append(ids)
+        # One bincount over flattened (row, column) cells fills the whole matrix
+        cells = np.concatenate(rows + [np.empty(0, dtype=np.intp)]) * self.size
+        cells += np.concatenate(columns + [np.empty(0, dtype=np.intp)])
+        counts = np.bincount(cells, minlength=len(dialogs) * self.size)
+        return counts.reshape(len(dialogs), self.size).astype(np.float64)
+
+
+def load_features(path=FEATURES_PATH):
+    """Return the feature vocabulary (column order of the count vectors)."""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class ModelHandle:
+    """Load the model and preprocessing tools on first use instead of at import time.
+
+    backend is "keras", "numpy" (the exported NumpyEngine, no TensorFlow),
+    "bundle" (the memory-mapped model_bundle file, no TensorFlow or pickles)
+    or "auto", which uses the bundle, else the engine, when it exists and was
+    built from the current model files.
+    """
+    def __init__(self, model_path=MODEL_PATH, features_path=FEATURES_PATH, scaler_path=SCALER_PATH,
+                 engine_path=ENGINE_PATH, backend="auto", bundle_path=BUNDLE_PATH):
+        if backend not in ("auto", "keras", "numpy", "bundle"):
+            raise ValueError(f"Unknown backend: {backend}")
+        self.model_path = model_path
+        self.features_path = features_path
+        self.scaler_path = scaler_path
+        self.engine_path = engine_path
+        self.bundle_path = bundle_path
+        self.backend = backend
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load everything once; later calls return immediately."""
+        if self.loaded:
+            return self
+        with self._lock, metrics.span("predictor.model_load"):
+            if not self.loaded:
+                bundle = self._load_bundle()
+                engine = self._load_engine() if bundle is None else None
+                if bundle is not None:
+                    # Vocabulary, scaler and weights are all views of the one mapped file
+                    self.model = bundle
+                    self.scaler = None
+                    self.backend = "bundle"
+                elif engine is not None:
+                    # The scaler is folded into the engine's first layer
+                    self.model = engine
+                    self.scaler = None
+                    self.backend = "numpy"
+                else:
+                    # Imported here because initializing TensorFlow takes seconds
+                    from tensorflow.keras.models import load_model
+
+                    self.model = load_model(self.model_path)
+                    with open(self.scaler_path, 'rb') as f:
+                        self.scaler = pickle.load(f)
+                    self.backend = "keras"
+                self.features = bundle.features if bundle is not None else load_features(self.features_path)
+                self.featurizer = Featurizer(self.features)
+                self.fingerprint = self._fingerprint()
+                self.loaded = True
+        return self
+
+    def _load_bundle(self):
+        """Return the ModelBundle to serve with, or None to fall back to the separate files."""
+        if self.backend in ("keras", "numpy") or (self.backend == "auto" and not os.path.exists(self.bundle_path)):
+            return None
+        from model_bundle import ModelBundle
+        from numpy_engine import artifacts_digest
+
+        try:
+            bundle = ModelBundle.load(self.bundle_path)
+        except (OSError, ValueError, KeyError) as e:
+            if self.backend == "bundle":
+                raise
+            print(f"Ignoring {self.bundle_path}: {e}")
+            return None
+        if self.backend == "auto":
+            try:
+                current = artifacts_digest(self.model_path, self.features_path, self.scaler_path)
+            except OSError:
+                return bundle  # Deployed with the bundle only
+            if current != bundle.source_digest:
+                print(f"Ignoring stale {self.bundle_path}; rebuild it with model_bundle.py")
+                return None
+        return bundle
+
+    def _load_engine(self):
+        """Return the NumpyEngine to serve with, or None to fall back to Keras."""
+        if self.backend == "keras" or (self.backend == "auto" and not os.path.exists(self.engine_path)):
+            return None
+        from numpy_engine import NumpyEngine, artifacts_digest
+
+        try:
+            engine = NumpyEngine.load(self.engine_path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            if self.backend == "numpy":
+                raise
+            print(f"Ignoring {self.engine_path}: {e}")
+            return None
+        if self.backend == "auto":
+            try:
+                current = artifacts_digest(self.model_path, self.scaler_path)
+            except OSError:
+                return engine  # Deployed without the Keras files; the engine is all there is
+            if current != engine.source_digest:
+                print(f"Ignoring stale {self.engine_path}; re-export it with numpy_engine.py")
+                return None
+        return engine
+
+    def _fingerprint(self):
+        """Identify the loaded model by the contents of the files it came from."""
+        from numpy_engine import artifacts_digest
+
+        if self.backend == "bundle":
+            return self.model.source_digest  # The digest of the files it was built from
+        paths = [self.model_path, self.features_path, self.scaler_path]
+        if not all(os.path.exists(path) for path in paths):
+            paths = [self.engine_path, self.features_path]  # Deployed with the exported engine only
+        return artifacts_digest(*paths)
+
+    def predict_counts(self, counts, batch_size=None):
+        """Return class probabilities for a matrix of raw count vectors."""
+        self.load()
+        if self.scaler is None:
+            with metrics.span("predictor.inference"):
+                return self.model.predict(counts)
+        with metrics.span("predictor.scale"):
+            scaled = self.scaler.transform(counts)
+        with metrics.span("predictor.inference"):
+            return self.model.predict(scaled, batch_size=batch_size, verbose=0)
+
+    def warm_up(self):
+        """Load in a background daemon thread and return the thread."""
+        thread = threading.Thread(target=self.load, name="predictor-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+
+_handle = ModelHandle()
+_cache = PredictionCache()
+
+
+def configure_cache(max_entries=4096, path=None):
+    """Resize the prediction cache (0 disables it) and optionally persist it to path.
+
+    A persisted cache is read back on first use if it was saved for the same
+    model files; call save_cache() to write it.
+    """
+    global _cache
+    _cache = PredictionCache(max_entries, path)
+    return _cache
+
+
+def save_cache():
+    return _cache.save()
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def warm_up():
+    """Start loading the default model in the background."""
+    return _handle.warm_up()
+
+
+def __getattr__(name):
+    # Keep predictor.model, predictor.features etc. working, loading them on first access
+    if name in ('model', 'features', 'scaler', 'featurizer'):
+        return getattr(_handle.load(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+DISEASE_DICT = {
+    1: 'Upper Respiratory Tract Infection',
+    2: 'Dermatitis',
+    3: 'Gastritis',
+    4: 'Rhinitis',
+    5: 'Viral Hepatitis',
+    6: 'Enteritis',
+    7: 'Pneumonia'
+}
+
+
+def top_k_predictions(probabilities, k=2):
+    """Return the k most likely (disease, probability) pairs of one probability row."""
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    k = min(k, len(probabilities))
+    # argpartition finds the top k in O(n); only those k are then sorted
+    top_indices = np.argpartition(probabilities, -k)[-k:]
+    top_indices = top_indices[np.argsort(probabilities[top_indices])[::-1]]
+    return [(DISEASE_DICT.get(i + 1, "Unknown"), probabilities[i]) for i in top_indices]
 
-# Load model and preprocessing tools
-model = load_model('./models/trained_model.h5')
-with open('./models/features.pkl', 'rb') as f:
-    features = pickle.load(f)
-with open('./models/scaler.pkl', 'rb') as f:
-    scaler = pickle.load(f)
 
 def predict_disease(transcription):
-    def dialog_to_count_vector(dialog, features):
-        vector = np.zeros(len(features))
-        tokens = dialog.lower().split()
-        for token in tokens:
-            if token in features:
-                index = features.index(token)
-                vector[index] += 1
-        return vector
-
-    vector = dialog_to_count_vector(transcription, features)
-    vector_scaled = scaler.transform([vector])
-    probabilities = model.predict(vector_scaled)[0]
-    disease_dict = {
-        1: 'Upper Respiratory Tract Infection',
-        2: 'Dermatitis',
-        3: 'Gastritis',
-        4: 'Rhinitis',
-        5: 'Viral Hepatitis',
-        6: 'Enteritis',
-        7: 'Pneumonia'
-    }
-    top_indices = np.argsort(probabilities)[-2:][::-1]
-    predictions = [(disease_dict.get(i + 1, "Unknown"), probabilities[i]) for i in top_indices]
-    return predictions
+    probabilities = _cached_probabilities([transcription])[0]
+    return top_k_predictions(probabilities, k=2)
+
+
+def predict_disease_batch(transcriptions, k=2, batch_size=256):
+    """Yield the top-k predictions for each transcription, in input order.
+
+    The input is consumed in chunks of batch_size, so any iterable (including
+    a generator over an archive) can be scored with bounded memory.
+    """
+    chunk = []
+    for transcription in transcriptions:
+        chunk.append(transcription)
+        if len(chunk) == batch_size:
+            yield from _predict_chunk(chunk, k, batch_size)
+            chunk = []
+    if chunk:
+        yield from _predict_chunk(chunk, k, batch_size)
+
+
+def _predict_chunk(transcriptions, k, batch_size):
+    """Score one chunk, running only the cache misses through the model in one call."""
+    for row in _cached_probabilities(transcriptions, batch_size):
+        yield top_k_predictions(row, k)
+
+
+def _cached_probabilities(transcriptions, batch_size=None):
+    """Return one probability row per transcription, reusing cached rows for repeated count vectors."""
+    handle = _handle.load()
+    cache = _cache
+    cache.use_fingerprint(handle.fingerprint)
+    results = [None] * len(transcriptions)
+    missed = {}  # key -> (sparse counts, positions in transcriptions)
+    with metrics.span("predictor.featurize"):
+        for position, transcription in enumerate(transcriptions):
+            indices, counts = handle.featurizer.transform_sparse(transcription)
+            key = cache.key(indices, counts)
+            if key in missed:
+                missed[key][1].append(position)  # Same counts again within this batch
+                continue
+            results[position] = cache.get(key)
+            if results[position] is None:
+                missed[key] = ((indices, counts), [position])
+
+    if missed:
+        matrix = np.zeros((len(missed), handle.featurizer.size))
+        for row, ((indices, counts), _) in enumerate(missed.values()):
+            matrix[row, indices] = counts
+        probabilities = handle.predict_counts(matrix, batch_size)
+        for (key, (_, positions)), row in zip(missed.items(), probabilities):
+            cache.put(key, row)
+            for position in positions:
+                results[position] = row
+    return results
+
+
+class IncrementalPredictor:
+    """Live top-k predictions for a transcript that grows one utterance at a time.
+
+    add_text() folds only the new words into a running count vector, so each
+    update costs O(new words) instead of re-featurizing the whole transcript;
+    it never loads the model itself, so it is safe as StreamingTranscriber's
+    on_result callback (text that arrives first is kept until refresh() loads
+    it). refresh() re-scores only when that vector changed, and at most once
+    every min_interval seconds; changes made in between are picked up by a
+    later call. update() does both.
+    """
+    def __init__(self, k=2, min_interval=1.0):
+        self.k = k
+        self.min_interval = min_interval
+        self.counts = None  # Running count vector, created once the model is loaded
+        self.predictions = []  # Latest top-k (disease, probability) pairs
+        self.version = 0  # Incremented every time predictions is replaced
+        self._changed = False
+        self._unfolded = []  # Utterances added before the model was loaded
+        self._last_scored = float("-inf")
+        self._scored = 0  # Sequence numbers, so an older score never overwrites a newer one
+        self._published = 0
+        self._lock = threading.Lock()
+
+    def add_text(self, text):
+        """Add a finalized utterance to the running counts (only queued while the model is not loaded)."""
+        if not _handle.loaded:
+            with self._lock:
+                self._unfolded.append(text)
+                self._changed = True
+            return
+        self._fold([text], _handle.featurizer)
+
+    def _fold(self, texts, featurizer):
+        ids = np.concatenate([featurizer.token_ids(text) for text in texts]).astype(np.intp)
+        with self._lock:
+            if self.counts is None:
+                self.counts = np.zeros(featurizer.size)
+            if len(ids):
+                np.add.at(self.counts, ids, 1)
+                self._changed = True
+
+    def due(self, force=False):
+        """True when refresh(force) would re-score; cheap enough to poll from the UI thread."""
+        with self._lock:
+            return self._changed and (force or time.monotonic() - self._last_scored >= self.min_interval)
+
+    def refresh(self, force=False):
+        """Re-score if the counts changed and min_interval has passed (force skips the wait).
+
+        Returns the new top-k list, or None if nothing was re-scored.
+        """
+        if self._unfolded:
+            featurizer = _handle.load().featurizer
+            with self._lock:
+                texts, self._unfolded = self._unfolded, []
+            self._fold(texts, featurizer)
+        with self._lock:
+            now = time.monotonic()
+            if not self._changed or (not force and now - self._last_scored < self.min_interval):
+                return None
+            counts = self.counts.copy()
+            self._changed = False
+            self._last_scored = now
+            self._scored += 1
+            sequence = self._scored
+        predictions = top_k_predictions(_count_probabilities(counts), self.k)
+        with self._lock:
+            if sequence > self._published:
+                self._published = sequence
+                self.predictions = predictions
+                self.version += 1
+        return predictions
+
+    def update(self, text):
+        """add_text() then refresh(); returns the new top-k list or None."""
+        self.add_text(text)
+        return self.refresh()
+
+
+def _count_probabilities(counts):
+    """Return the probability row of one dense count vector, through the prediction cache."""
+    handle = _handle.load()
+    cache = _cache
+    cache.use_fingerprint(handle.fingerprint)
+    indices = np.flatnonzero(counts)
+    # Same key as transform_sparse gives for the same words, so live and final predictions share entries
+    key = cache.key(indices, counts[indices])
+    row = cache.get(key)
+    if row is None:
+        row = handle.predict_counts(counts[np.newaxis])[0]
+        cache.put(key, row)
+    return row
@@ -0,0 +1,311 @@
+# sea_audio.py - Lossless chunked compression for session recordings (.sea files)
+#
+# Run with:
+#     python sea_audio.py migrate [--pattern GLOB] [--delete-wav]   # Convert stored output{n}.wav files
+#     python sea_audio.py encode IN.wav OUT.sea
+#     python sea_audio.py decode IN.sea OUT.wav                     # For playback in a normal player
+#
+# Layout (little-endian): an 18-byte header (magic b"SEA1", version, channels,
+# sample width, frame rate, frames per chunk) followed by independent chunks.
+# Each chunk is a 12-byte header (frames, payload bytes, CRC-32 of the PCM) and
+# a zlib payload. Before compression, samples are turned into first differences
+# (wrapping in 16 bits), zigzag-mapped so small negative steps become small
+# numbers, and split into a plane of low bytes and a plane of high bytes.
+# Speech differences are small, so the high-byte plane is mostly zeros.
+#
+# Chunks are written whole and flushed, so a recording interrupted mid-way is
+# still readable up to its last complete chunk. SeaReader and SeaWriter mirror
+# the wave module's reader and writer, and open_audio() picks the right one by
+# extension.
+
+import argparse
+import glob
+import os
+import struct
+import sys
+import wave
+import zlib
+import numpy as np
+
+MAGIC = b"SEA1"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHHII")  # magic, version, channels, sample width, rate, frames per chunk
+CHUNK_HEADER = struct.Struct("<III")  # frames, payload bytes, CRC-32 of the decoded PCM
+CHUNK_FRAMES = 16000  # One second at 16 kHz
+COMPRESSION_LEVEL = 6
+AUDIO_EXTENSIONS = (".wav", ".sea")
+
+
+def encode_chunk(pcm, channels=1):
+    """Compress 16-bit interleaved PCM bytes into a chunk payload."""
+    samples = np.frombuffer(pcm, dtype="<i2").reshape(-1, channels)
+    # First differences per channel; numpy int16 arithmetic wraps, so this is exactly invertible
+    delta = np.diff(samples, axis=0, prepend=np.zeros((1, channels), dtype=np.int16)).reshape(-1)
+    zigzag = ((delta << 1) ^ (delta >> 15)).view(np.uint16)
+    planes = np.concatenate(((zigzag & 0xFF).astype(np.uint8), (zigzag >> 8).astype(np.uint8)))
+    return zlib.compress(planes.tobytes(), COMPRESSION_LEVEL)
+
+
+def decode_chunk(payload, frames, channels=1):
+    """Inverse of encode_chunk; returns 16-bit interleaved PCM bytes."""
+    planes = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+    count = frames * channels
+    zigzag = planes[:count].astype(np.uint16) | (planes[count:].astype(np.uint16) << 8)
+    delta = ((zigzag >> 1) ^ (0 - (zigzag & 1))).view(np.int16).reshape(-1, channels)
+    return np.cumsum(delta, axis=0, dtype=np.int16).astype("<i2").tobytes()
+
+
+class SeaWriter:
+    """Write a .sea file incrementally, with the same interface as wave's writer."""
+    def __init__(self, f, chunk_frames=CHUNK_FRAMES):
+        self._file = open(f, "wb") if isinstance(f, str) else f
+        self._owns_file = isinstance(f, str)
+        self.chunk_frames = chunk_frames
+        self.channels = 1
+        self.sampwidth = 2
+        self.rate = 16000
+        self.nframes = 0
+        self._pending = bytearray()
+        self._header_written = False
+
+    def setnchannels(self, channels):
+        self.channels = channels
+
+    def setsampwidth(self, sampwidth):
+        if sampwidth != 2:
+            raise ValueError(".sea files only hold 16-bit samples")
+        self.sampwidth = sampwidth
+
+    def setframerate(self, rate):
+        self.rate = int(rate)
+
+    def writeframes(self, data):
+        """Buffer PCM and write out every complete chunk (flushed, so it survives a crash)."""
+        self._write_header()
+        self._pending += data
+        chunk_bytes = self.chunk_frames * self.channels * 2
+        written = 0
+        while len(self._pending) - written >= chunk_bytes:
+            self._write_chunk(bytes(self._pending[written:written + chunk_bytes]))
+            written += chunk_bytes
+        if written:
+            del self._pending[:written]
+            self._file.flush()
+
+    def close(self):
+        """Write the last partial chunk and close the file."""
+        if self._file is None:
+            return
+        self._write_header()
+        if self._pending:
+            self._write_chunk(bytes(self._pending))
+            self._pending.clear()
+        self._file.flush()
+        if self._owns_file:
+            self._file.close()
+        self._file = None
+
+    def _write_header(self):
+        if not self._header_written:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION, self.channels, self.sampwidth, self.rate,
+                                              self.chunk_frames))
+            self._header_written = True
+
+    def _write_chunk(self, pcm):
+        frames = len(pcm) // (2 * self.channels)
+        payload = encode_chunk(pcm, self.channels)
+        self._file.write(CHUNK_HEADER.pack(frames, len(payload), zlib.crc32(pcm)) + payload)
+        self.nframes += frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SeaReader:
+    """Stream PCM out of a .sea file, with the same interface as wave's reader.
+
+    Only the chunk headers are read when opening; chunks are decompressed one at
+    a time as readframes() reaches them.
+    """
+    def __init__(self, f):
+        self._file = open(f, "rb") if isinstance(f, str) else f
+        self._owns_file = isinstance(f, str)
+        header = self._file.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size or header[:4] != MAGIC:
+            raise ValueError("Not a .sea file")
+        _, version, self.channels, self.sampwidth, self.rate, _ = FILE_HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"Unsupported .sea version {version}")
+
+        # Index the chunks: (file offset, first frame, frames, payload bytes, crc)
+        end = self._file.seek(0, os.SEEK_END)
+        offset = FILE_HEADER.size
+        self._chunks = []
+        frame = 0
+        while offset + CHUNK_HEADER.size <= end:
+            self._file.seek(offset)
+            frames, size, crc = CHUNK_HEADER.unpack(self._file.read(CHUNK_HEADER.size))
+            if offset + CHUNK_HEADER.size + size > end:
+                break  # A chunk cut short by a crash is left out
+            self._chunks.append((offset, frame, frames, size, crc))
+            frame += frames
+            offset += CHUNK_HEADER.size + size
+        self.nframes = frame
+        self.rewind()
+
+    def getnchannels(self):
+        return self.channels
+
+    def getsampwidth(self):
+        return self.sampwidth
+
+    def getframerate(self):
+        return self.rate
+
+    def getnframes(self):
+        return self.nframes
+
+    def tell(self):
+        return self._position
+
+    def rewind(self):
+        self.setpos(0)
+
+    def setpos(self, position):
+        if not 0 <= position <= self.nframes:
+            raise ValueError("position not in range")
+        self._position = position
+        self._chunk_index = 0
+        while self._chunk_index < len(self._chunks) and \
+                self._chunks[self._chunk_index][1] + self._chunks[self._chunk_index][2] <= position:
+            self._chunk_index += 1
+        self._buffer = b""
+        if self._chunk_index < len(self._chunks):
+            skip = position - self._chunks[self._chunk_index][1]
+            self._buffer = self._decode(self._chunk_index)[skip * 2 * self.channels:]
+            self._chunk_index += 1
+
+    def readframes(self, n):
+        """Return up to n frames of PCM, decoding further chunks as needed."""
+        wanted = n * 2 * self.channels
+        parts, have = [self._buffer], len(self._buffer)
+        while have < wanted and self._chunk_index < len(self._chunks):
+            pcm = self._decode(self._chunk_index)
+            self._chunk_index += 1
+            parts.append(pcm)
+            have += len(pcm)
+        data = b"".join(parts)
+        self._buffer = data[wanted:]
+        data = data[:wanted]
+        self._position += len(data) // (2 * self.channels)
+        return data
+
+    def close(self):
+        if self._owns_file and self._file is not None:
+            self._file.close()
+        self._file = None
+
+    def _decode(self, index):
+        offset, _, frames, size, crc = self._chunks[index]
+        self._file.seek(offset + CHUNK_HEADER.size)
+        pcm = decode_chunk(self._file.read(size), frames, self.channels)
+        if zlib.crc32(pcm) != crc:
+            raise ValueError(f"Corrupted chunk {index} in .sea file")
+        return pcm
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_audio(path, mode="rb"):
+    """Open a .sea or .wav file for reading ("rb") or writing ("wb") with the wave module's interface."""
+    if str(path).endswith(".sea"):
+        return SeaReader(path) if mode == "rb" else SeaWriter(path)
+    return wave.open(path, mode)
+
+
+def convert(source, destination):
+    """Copy the audio of one file into another, converting between .wav and .sea by extension."""
+    with open_audio(source, "rb") as reader, open_audio(destination, "wb") as writer:
+        writer.setnchannels(reader.getnchannels())
+        writer.setsampwidth(reader.getsampwidth())
+        writer.setframerate(reader.getframerate())
+        while True:
+            data = reader.readframes(CHUNK_FRAMES)
+            if not data:
+                break
+            writer.writeframes(data)
+
+
+def same_audio(first, second):
+    """Check two audio files hold the same parameters and samples."""
+    with open_audio(first, "rb") as a, open_audio(second, "rb") as b:
+        if (a.getnchannels(), a.getsampwidth(), a.getframerate(), a.getnframes()) != \
+                (b.getnchannels(), b.getsampwidth(), b.getframerate(), b.getnframes()):
+            return False
+        while True:
+            block = a.readframes(CHUNK_FRAMES)
+            if block != b.readframes(CHUNK_FRAMES):
+                return False
+            if not block:
+                return True
+
+
+def migrate(pattern, delete_wav=False):
+    """Convert every WAV matching pattern to .sea next to it; returns (files, wav bytes, sea bytes)."""
+    files = wav_bytes = sea_bytes = 0
+    for wav_path in sorted(glob.glob(pattern)):
+        if not wav_path.endswith(".wav"):
+            continue
+        sea_path = wav_path[:-4] + ".sea"
+        try:
+            convert(wav_path, sea_path)
+            if not same_audio(wav_path, sea_path):
+                raise ValueError("decoded audio differs from the original")
+        except Exception as e:
+            print(f"FAILED {wav_path}: {e}")
+            if os.path.exists(sea_path):
+                os.remove(sea_path)
+            continue
+        files += 1
+        wav_bytes += os.path.getsize(wav_path)
+        sea_bytes += os.path.getsize(sea_path)
+        print(f"{wav_path} -> {sea_path} ({os.path.getsize(sea_path) / os.path.getsize(wav_path):.0%} of the size)")
+        if delete_wav:
+            os.remove(wav_path)
+    return files, wav_bytes, sea_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert session recordings to and from the .sea format.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="Convert stored WAV recordings to .sea")
+    migrate_parser.add_argument("--pattern", default="./data/sessions/*/output*.wav", help="Glob of WAV files")
+    migrate_parser.add_argument("--delete-wav", action="store_true",
+                                help="Remove each WAV once its .sea copy is verified")
+    for name in ("encode", "decode"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} one file")
+        command.add_argument("source")
+        command.add_argument("destination")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        files, wav_bytes, sea_bytes = migrate(args.pattern, args.delete_wav)
+        if files:
+            print(f"Converted {files} files: {wav_bytes / 1e6:.1f} MB -> {sea_bytes / 1e6:.1f} MB "
+                  f"({sea_bytes / wav_bytes:.0%})")
+        else:
+            print(f"No WAV files converted from {args.pattern}")
+            sys.exit(1)
+    else:
+        convert(args.source, args.destination)
+
+
+if __name__ == "__main__":
+    main()
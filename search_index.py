@@ -0,0 +1,398 @@
+# search_index.py - Inverted index for full-text search over session transcripts
+#
+# Usage:
+#     index = SearchIndex("./search_index.npz")
+#     index.sync("./data/sessions/")        # Index new and changed transcription files
+#     for hit in index.search('cough OR "chest pain" -fever'):
+#         print(hit.session, hit.filename, hit.score, hit.snippet)
+#
+# Run with: python search_index.py QUERY [--sessions-dir DIR] [--index FILE] [--limit N]
+#
+# Transcripts are split with predictor.tokenize, the same way the classifier
+# sees them. Every indexed file keeps its token ids, and every term keeps a
+# posting list of (file id, count) in ascending file id order, so a query is a
+# few numpy set operations over posting lists instead of a scan of the files.
+# Phrases are matched against the stored token ids of the files that contain
+# all of their words. Results are ranked with BM25.
+#
+# Query syntax: words are ANDed, OR separates alternatives, "quoted words" must
+# appear next to each other, and -word / NOT word excludes files containing it.
+
+import argparse
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from collections import namedtuple
+import numpy as np
+from predictor import tokenize
+from session_cache import ANALYSIS_MARKER
+
+SEARCH_INDEX_FILE = "./search_index.npz"
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_WORDS = 12
+
+SearchHit = namedtuple("SearchHit", "session filename score snippet")
+
+_QUERY_TOKEN = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+
+
+def parse_query(query):
+    """Parse a query into OR'ed clauses of (required, excluded) phrases, each phrase a tuple of tokens.
+
+    A clause with nothing required matches nothing and is dropped.
+    """
+    clauses = [([], [])]
+    negate = False
+    for match in _QUERY_TOKEN.finditer(query):
+        sign, phrase, word = match.groups()
+        if word == "OR":
+            clauses.append(([], []))
+            continue
+        if word == "AND":
+            continue
+        if word == "NOT":
+            negate = True
+            continue
+        if word is not None and word.startswith("-") and len(word) > 1:
+            sign, word = "-", word[1:]
+        tokens = tuple(tokenize(phrase if phrase is not None else word))
+        if tokens:
+            required, excluded = clauses[-1]
+            (excluded if sign or negate else required).append(tokens)
+        negate = False
+    return [clause for clause in clauses if clause[0]]
+
+
+def _in_sorted(values, sorted_array):
+    """Boolean mask of which values occur in a sorted array (a binary search each, no re-sorting)."""
+    if not len(sorted_array):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_array, values), len(sorted_array) - 1)
+    return sorted_array[positions] == values
+
+
+class SearchIndex:
+    """Thread-safe inverted index of transcription files, keyed by (session, filename).
+
+    Files can be added, replaced and removed at any time; a replaced or removed
+    file is only marked dead and dropped from the posting lists when the index
+    is compacted (after dead files outnumber live ones) or saved and reloaded.
+    When path is set and exists, the saved index is read on construction.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _reset(self):
+        self._terms = {}  # term -> term id
+        self._term_list = []  # term id -> term
+        self._postings = []  # term id -> array of file ids, ascending
+        self._counts = []  # term id -> array of occurrences, parallel to _postings
+        self._keys = []  # file id -> (session, filename)
+        self._ids = {}  # (session, filename) -> live file id
+        self._signatures = []  # file id -> (mtime_ns, size) of the file when it was indexed
+        self._tokens = []  # file id -> token ids as int32 bytes (b"" once dead)
+        self._lengths = array("i")
+        self._alive = bytearray()
+        self._live = 0
+        self._total_length = 0
+
+    def __len__(self):
+        return self._live
+
+    def add(self, session, filename, text, signature=(0, 0)):
+        """Index (or re-index) the transcript text of one file."""
+        words = tokenize(text)
+        with self._lock:
+            ids = np.fromiter((self._term_id(word) for word in words), dtype=np.int32, count=len(words))
+            self._remove((session, filename))
+            file_id = len(self._keys)
+            self._keys.append((session, filename))
+            self._ids[(session, filename)] = file_id
+            self._signatures.append(tuple(signature))
+            self._tokens.append(ids.tobytes())
+            self._lengths.append(len(ids))
+            self._alive.append(1)
+            self._live += 1
+            self._total_length += len(ids)
+            terms, counts = np.unique(ids, return_counts=True)
+            for term, count in zip(terms.tolist(), counts.tolist()):
+                self._postings[term].append(file_id)
+                self._counts[term].append(count)
+            self._compact_if_needed()
+
+    def add_file(self, path):
+        """Index a transcription file from disk; only the transcript before the analysis result is searched."""
+        path = os.path.normpath(path)
+        stat = os.stat(path)
+        with open(path, "r") as f:
+            transcript = f.read().partition(ANALYSIS_MARKER)[0]
+        self.add(os.path.basename(os.path.dirname(path)), os.path.basename(path), transcript,
+                 (stat.st_mtime_ns, stat.st_size))
+
+    def remove(self, session, filename=None):
+        """Drop one file, or every file of a session when filename is None."""
+        with self._lock:
+            if filename is not None:
+                self._remove((session, filename))
+            else:
+                for key in [key for key in self._ids if key[0] == session]:
+                    self._remove(key)
+            self._compact_if_needed()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def sync(self, sessions_dir):
+        """Index new or changed transcription files under sessions_dir and drop vanished ones.
+
+        Unchanged files (same mtime and size) cost one stat. Returns (indexed, removed).
+        """
+        seen, indexed = set(), 0
+        if os.path.isdir(sessions_dir):
+            for session in os.scandir(sessions_dir):
+                if not session.is_dir():
+                    continue
+                for entry in os.scandir(session.path):
+                    if not (entry.name.startswith("transcription") and entry.name.endswith(".txt")):
+                        continue
+                    key = (session.name, entry.name)
+                    seen.add(key)
+                    stat = entry.stat()
+                    with self._lock:
+                        file_id = self._ids.get(key)
+                        unchanged = file_id is not None and \
+                            self._signatures[file_id] == (stat.st_mtime_ns, stat.st_size)
+                    if unchanged:
+                        continue
+                    try:
+                        self.add_file(entry.path)
+                        indexed += 1
+                    except OSError as e:
+                        print(f"Error indexing {entry.path}: {e}")
+        with self._lock:
+            # A file written after its folder was scanned is not in seen, but still exists
+            vanished = [key for key in self._ids
+                        if key not in seen and not os.path.exists(os.path.join(sessions_dir, *key))]
+            for key in vanished:
+                self._remove(key)
+            self._compact_if_needed()
+        return indexed, len(vanished)
+
+    def search(self, query, limit=20):
+        """Return up to limit SearchHits for query, best BM25 score first (newest first on ties)."""
+        clauses = parse_query(query)
+        with self._lock:
+            if not clauses or not self._live:
+                return []
+            # Posting lists are sorted by file id, so AND and NOT are binary searches
+            results = []
+            for required, excluded in clauses:
+                files = self._match(required[0])
+                for phrase in required[1:]:
+                    files = files[_in_sorted(files, self._match(phrase))]
+                for phrase in excluded:
+                    files = files[~_in_sorted(files, self._match(phrase))]
+                results.append(files)
+            matched = results[0] if len(results) == 1 else np.unique(np.concatenate(results))
+            if not len(matched):
+                return []
+
+            terms = {self._terms.get(word) for required, _ in clauses for phrase in required for word in phrase}
+            terms.discard(None)
+            scores = self._bm25(matched, terms)
+            order = np.lexsort((-matched, -scores))[:limit]
+            return [
+                SearchHit(*self._keys[matched[i]], float(scores[i]), self._snippet(int(matched[i]), terms))
+                for i in order
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "files": self._live,
+                "dead_files": len(self._keys) - self._live,
+                "terms": len(self._term_list),
+                "tokens": self._total_length,
+            }
+
+    def save(self, path=None):
+        """Write the live files to path (default self.path) as .npz; returns the path or None."""
+        path = path or self.path
+        if not path:
+            return None
+        with self._lock:
+            live = [i for i in range(len(self._keys)) if self._alive[i]]
+            sessions = np.array([self._keys[i][0] for i in live], dtype=str)
+            filenames = np.array([self._keys[i][1] for i in live], dtype=str)
+            signatures = np.array([self._signatures[i] for i in live], dtype=np.int64).reshape(-1, 2)
+            lengths = np.array([self._lengths[i] for i in live], dtype=np.int64)
+            tokens = np.frombuffer(b"".join(self._tokens[i] for i in live), dtype=np.int32)
+            terms = np.array(self._term_list, dtype=str)
+        # Write to a temporary file first so a crash never leaves a truncated index
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, terms=terms, sessions=sessions, filenames=filenames, signatures=signatures,
+                     lengths=lengths, tokens=tokens)
+        os.replace(tmp_path, path)
+        return path
+
+    def _load(self, path):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                terms, sessions, filenames = data["terms"], data["sessions"], data["filenames"]
+                signatures, lengths, tokens = data["signatures"], data["lengths"], data["tokens"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading search index {path}: {e}")
+            return
+        with self._lock:
+            self._term_list = terms.tolist()
+            self._terms = {term: i for i, term in enumerate(self._term_list)}
+            self._keys = list(zip(sessions.tolist(), filenames.tolist()))
+            self._signatures = [tuple(signature) for signature in signatures.tolist()]
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            self._tokens = [tokens[start:end].tobytes() for start, end in zip(offsets[:-1], offsets[1:])]
+            self._rebuild()
+
+    def _term_id(self, term):
+        """Return the id of term, adding it to the vocabulary (caller holds the lock)."""
+        term_id = self._terms.get(term)
+        if term_id is None:
+            term_id = self._terms[term] = len(self._term_list)
+            self._term_list.append(term)
+            self._postings.append(array("i"))
+            self._counts.append(array("i"))
+        return term_id
+
+    def _remove(self, key):
+        """Mark a file dead (caller holds the lock)."""
+        file_id = self._ids.pop(key, None)
+        if file_id is None:
+            return
+        self._alive[file_id] = 0
+        self._live -= 1
+        self._total_length -= self._lengths[file_id]
+        self._tokens[file_id] = b""
+
+    def _compact_if_needed(self):
+        if len(self._keys) - self._live > max(self._live, 1000):
+            live = [i for i in range(len(self._keys)) if self._alive[i]]
+            self._keys = [self._keys[i] for i in live]
+            self._signatures = [self._signatures[i] for i in live]
+            self._tokens = [self._tokens[i] for i in live]
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recompute file ids, lengths and every posting list from the stored tokens (caller holds the lock)."""
+        count = len(self._keys)
+        self._ids = {key: i for i, key in enumerate(self._keys)}
+        lengths = np.array([len(tokens) // 4 for tokens in self._tokens], dtype=np.int64)
+        self._lengths = array("i", lengths.tolist())
+        self._alive = bytearray(b"\x01" * count)
+        self._live = count
+        self._total_length = int(lengths.sum())
+
+        # One sort of (term, file) pairs yields every posting list in file order
+        tokens = np.frombuffer(b"".join(self._tokens), dtype=np.int32).astype(np.int64)
+        files = np.repeat(np.arange(count, dtype=np.int64), lengths)
+        pairs, counts = np.unique(tokens * max(count, 1) + files, return_counts=True)
+        terms, files = np.divmod(pairs, max(count, 1))
+        bounds = np.searchsorted(terms, np.arange(len(self._term_list) + 1))
+        files, counts = files.astype(np.int32), counts.astype(np.int32)
+        self._postings, self._counts = [], []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            self._postings.append(array("i", files[start:end].tobytes()))
+            self._counts.append(array("i", counts[start:end].tobytes()))
+
+    def _match(self, phrase):
+        """Return the sorted ids of live files containing phrase (caller holds the lock)."""
+        ids = [self._terms.get(word) for word in phrase]
+        if None in ids:
+            return np.empty(0, dtype=np.int32)
+        # Start from the rarest word so the intersections stay small
+        files = None
+        for term in sorted(set(ids), key=lambda term: len(self._postings[term])):
+            postings = np.array(self._postings[term], dtype=np.int32)
+            files = postings if files is None else files[_in_sorted(files, postings)]
+        files = files[np.array(self._alive, dtype=bool)[files]]
+        if len(ids) > 1 and len(files):
+            files = self._with_phrase(files, ids)
+        return files
+
+    def _with_phrase(self, files, ids):
+        """Keep the files whose tokens contain ids consecutively (caller holds the lock)."""
+        # Check all candidates at once on their concatenated tokens, then drop matches that span two files
+        tokens = np.frombuffer(b"".join([self._tokens[i] for i in files.tolist()]), dtype=np.int32)
+        starts = np.concatenate(([0], np.cumsum(np.array(self._lengths, dtype=np.int64)[files])))
+        last = len(tokens) - len(ids) + 1
+        if last <= 0:
+            return files[:0]
+        found = tokens[:last] == ids[0]
+        for offset, term in enumerate(ids[1:], 1):
+            found &= tokens[offset:last + offset] == term
+        positions = np.flatnonzero(found)
+        owners = np.searchsorted(starts, positions, side="right") - 1
+        owners = owners[positions + len(ids) <= starts[owners + 1]]
+        return files[np.unique(owners)]
+
+    def _bm25(self, files, terms):
+        """Return the BM25 score of each matched file over the query terms (caller holds the lock)."""
+        alive = np.array(self._alive, dtype=bool)
+        lengths = np.array(self._lengths, dtype=np.float64)[files]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (self._total_length / self._live or 1))
+        scores = np.zeros(len(files))
+        for term in terms:
+            postings = np.array(self._postings[term], dtype=np.int32)
+            if not len(postings):
+                continue  # A term whose files were all removed before a save or compaction
+            counts = np.array(self._counts[term], dtype=np.float64)
+            frequency = int(alive[postings].sum())
+            idf = math.log(1 + (self._live - frequency + 0.5) / (frequency + 0.5))
+            position = np.minimum(np.searchsorted(postings, files), len(postings) - 1)
+            found = postings[position] == files
+            tf = np.where(found, counts[position], 0.0)
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def _snippet(self, file_id, terms):
+        """Return the words around the first query term in a file (caller holds the lock)."""
+        tokens = np.frombuffer(self._tokens[file_id], dtype=np.int32)
+        hits = np.flatnonzero(np.isin(tokens, list(terms)))
+        first = int(hits[0]) if len(hits) else 0
+        start = max(0, first - SNIPPET_WORDS // 3)
+        words = [self._term_list[i] for i in tokens[start:start + SNIPPET_WORDS].tolist()]
+        prefix = "... " if start else ""
+        suffix = " ..." if start + SNIPPET_WORDS < len(tokens) else ""
+        return prefix + " ".join(words) + suffix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search session transcripts.")
+    parser.add_argument("query", help='e.g. cough OR "chest pain" -fever')
+    parser.add_argument("--sessions-dir", default="./data/sessions/", help="Folder holding the session folders")
+    parser.add_argument("--index", default=SEARCH_INDEX_FILE, help="Saved index, updated before searching")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of results")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index)
+    indexed, removed = index.sync(args.sessions_dir)
+    if indexed or removed:
+        index.save()
+    start = time.perf_counter()
+    hits = index.search(args.query, args.limit)
+    elapsed = time.perf_counter() - start
+    for hit in hits:
+        print(f"{hit.score:6.2f}  {hit.session}/{hit.filename}  {hit.snippet}")
+    print(f"{len(hits)} results from {len(index)} transcripts in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+# service.py - Local HTTP inference service with asyncio micro-batching
+#
+# Run with: python service.py [--host 127.0.0.1] [--port 8765] [--max-batch-size 32] [--max-wait-ms 0]
+#
+# Endpoints (JSON responses):
+#   GET  /health      model status, queue depth and batching statistics
+#   POST /predict     {"transcription": "..."} -> {"predictions": [{"disease": ..., "probability": ...}]}
+#   POST /transcribe  raw 16 kHz mono WAV body -> {"transcription": "...", "predictions": [...]}
+#
+# Concurrent /predict requests are gathered into one model call. When the
+# queue of waiting requests is full the service answers 429 instead of
+# letting latency grow without bound.
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from audio_handler import MODEL_PATH as VOSK_MODEL_PATH, transcribe_audio
+from predictor import predict_disease_batch, warm_up
+
+MAX_HEADER_LINES = 100
+MAX_JSON_BYTES = 1024 * 1024
+MAX_WAV_BYTES = 50 * 1024 * 1024
+BODY_LIMITS = {"/predict": MAX_JSON_BYTES}  # Checked against Content-Length before the body is read
+
+
+class HttpError(Exception):
+    """An error answered with the given HTTP status."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """Collect concurrent scoring requests and run them through the model together.
+
+    Requests that arrive while a batch is being scored form the next batch, so
+    batches grow with load on their own. max_wait_ms optionally holds a batch
+    open a little longer to fill up, up to max_batch_size. At most max_queue
+    requests may wait; submit() raises asyncio.QueueFull beyond that.
+    """
+    def __init__(self, score_batch, max_batch_size=32, max_wait_ms=0.0, max_queue=256):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue(max_queue)
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scorer")
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, transcription):
+        """Queue one transcription and wait for its predictions."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((transcription, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        return await future
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "batches": self.batches,
+            "requests": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "rejected": self.rejected,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Take what is already queued (it piled up while the last batch ran), then wait briefly for more
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests whose client already went away are not worth scoring
+            batch = [(transcription, future) for transcription, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_batch, [t for t, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def score_transcriptions(transcriptions, k=2):
+    """Score a batch in one model call; returns JSON-ready predictions per transcription."""
+    return [
+        [{"disease": disease, "probability": float(probability)} for disease, probability in top]
+        for top in predict_disease_batch(transcriptions, k, batch_size=len(transcriptions))
+    ]
+
+
+class InferenceService:
+    """Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) in front of a MicroBatcher."""
+    def __init__(self, max_batch_size=32, max_wait_ms=0.0, max_queue=256, decode_workers=2,
+                 k=2, vosk_model_path=VOSK_MODEL_PATH):
+        self.batcher = MicroBatcher(
+            lambda transcriptions: score_transcriptions(transcriptions, k), max_batch_size, max_wait_ms, max_queue
+        )
+        self.decode_workers = decode_workers
+        self.vosk_model_path = vosk_model_path
+        self.decodes_in_flight = 0
+        self.model_loaded = False
+        self._decoder = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="decoder")
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Load the model, start batching and listen; returns the bound (host, port)."""
+        await asyncio.get_running_loop().run_in_executor(None, lambda: warm_up().join())
+        self.model_loaded = True
+        self.batcher.start()
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+        self._decoder.shutdown(wait=False)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    # The rest of the stream cannot be trusted after a bad request
+                    write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    print(f"Error handling {method} {path}: {e}")
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client disconnected mid-request
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        """Route one request; returns (status, JSON payload)."""
+        path = path.split("?", 1)[0]
+        if path == "/health" and method == "GET":
+            stats = self.batcher.stats()
+            stats.update(status="ok", model_loaded=self.model_loaded, decodes_in_flight=self.decodes_in_flight)
+            return HTTPStatus.OK, stats
+        if path == "/predict" and method == "POST":
+            return await self.predict(body)
+        if path == "/transcribe" and method == "POST":
+            return await self.transcribe(body)
+        if path in ("/health", "/predict", "/transcribe"):
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+        raise HttpError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+
+    async def predict(self, body):
+        if len(body) > MAX_JSON_BYTES:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        try:
+            transcription = json.loads(body)["transcription"]
+        except (ValueError, KeyError, TypeError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Expected a JSON body like {"transcription": "..."}')
+        if not isinstance(transcription, str):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "transcription must be a string")
+        return HTTPStatus.OK, {"predictions": await self.score(transcription)}
+
+    async def transcribe(self, body):
+        if not body.startswith(b"RIFF"):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Expected a WAV file as the request body")
+        # Decoding is far slower than scoring, so it has its own limit
+        if self.decodes_in_flight >= self.decode_workers * 2:
+            raise HttpError(HTTPStatus.TOO_MANY_REQUESTS, "Too many transcriptions in progress")
+        self.decodes_in_flight += 1
+        try:
+            transcription = await asyncio.get_running_loop().run_in_executor(
+                self._decoder, self._transcribe_bytes, body
+            )
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        finally:
+            self.decodes_in_flight -= 1
+        return HTTPStatus.OK, {"transcription": transcription, "predictions": await self.score(transcription)}
+
+    async def score(self, transcription):
+        try:
+            return await self.batcher.submit(transcription)
+        except asyncio.QueueFull:
+            raise HttpError(HTTPStatus.TOO_MANY_REQUESTS, "Scoring queue is full, retry later")
+
+    def _transcribe_bytes(self, data):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return transcribe_audio(path, self.vosk_model_path)
+        finally:
+            os.remove(path)
+
+
+async def read_request(reader):
+    """Read one request; returns (method, path, headers, body), or None at end of connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > BODY_LIMITS.get(path.split("?", 1)[0], MAX_WAV_BYTES):
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def run(args):
+    service = InferenceService(args.max_batch_size, args.max_wait_ms, args.max_queue, args.decode_workers, args.top_k,
+                               args.vosk_model)
+    start = time.perf_counter()
+    host, port = await service.start(args.host, args.port)
+    print(f"Model loaded in {time.perf_counter() - start:.1f}s; serving on http://{host}:{port}")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve disease predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (localhost only by default)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=32, help="Most requests scored in one model call")
+    parser.add_argument("--max-wait-ms", type=float, default=0.0,
+                        help="Extra time a batch waits to fill up (requests also pile up while a batch runs)")
+    parser.add_argument("--max-queue", type=int, default=256, help="Waiting requests before answering 429")
+    parser.add_argument("--decode-workers", type=int, default=2, help="Threads transcribing uploaded WAVs")
+    parser.add_argument("--top-k", type=int, default=2, help="Predictions per transcription")
+    parser.add_argument("--vosk-model", default=VOSK_MODEL_PATH, help="Vosk model directory")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
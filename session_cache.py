@@ -0,0 +1,112 @@
+# session_cache.py - In-memory LRU cache of parsed session folders, validated by mtimes
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+ANALYSIS_MARKER = "\n\nAnalysis Result:"  # Written by DiseasesEaseApp.analyze
+
+# files: list of (filename, content, transcript, analysis) in display order
+SessionContent = namedtuple("SessionContent", "files has_audio size")
+
+
+class SessionContentCache:
+    """Keep parsed session contents in memory, bounded by the UTF-8 size of the strings kept.
+
+    An entry is reused only while the folder's mtime and the mtime and size of
+    each transcription file are unchanged, so a revisit costs a few stat calls
+    instead of a listdir and re-reading every file.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # session path -> (directory mtime, file signature, content)
+        self._lock = threading.Lock()
+
+    def get(self, session_path):
+        """Return the SessionContent of a session folder, reading it only if it changed."""
+        directory_mtime = os.stat(session_path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(session_path)
+        if entry is not None and entry[0] == directory_mtime and _signature_matches(session_path, entry[1]):
+            with self._lock:
+                self.hits += 1
+                if session_path in self._entries:
+                    self._entries.move_to_end(session_path)
+            return entry[2]
+
+        signature, content = _read_session(session_path)
+        with self._lock:
+            self.misses += 1
+            self._discard(session_path)
+            if content.size <= self.max_bytes:
+                self._entries[session_path] = (directory_mtime, signature, content)
+                self.current_bytes += content.size
+                while self.current_bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted.size
+                    self.evictions += 1
+        return content
+
+    def invalidate(self, session_path):
+        """Drop a session, e.g. after its folder was deleted."""
+        with self._lock:
+            self._discard(session_path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+            }
+
+    def _discard(self, session_path):
+        entry = self._entries.pop(session_path, None)
+        if entry is not None:
+            self.current_bytes -= entry[2].size
+
+
+def _signature_matches(session_path, signature):
+    """Check the cached transcription files still have the same mtime and size."""
+    for filename, mtime, size in signature:
+        try:
+            stat = os.stat(os.path.join(session_path, filename))
+        except FileNotFoundError:
+            return False
+        if stat.st_mtime_ns != mtime or stat.st_size != size:
+            return False
+    return True
+
+
+def _read_session(session_path):
+    """List and read a session folder once; returns (file signature, SessionContent)."""
+    names = os.listdir(session_path)
+    transcription_files = sorted(f for f in names if f.startswith("transcription") and f.endswith(".txt"))
+    has_audio = any(f.startswith("output") and f.endswith((".wav", ".sea")) for f in names)
+
+    files, signature, size = [], [], 0
+    for filename in transcription_files:
+        path = os.path.join(session_path, filename)
+        stat = os.stat(path)
+        with open(path, "r") as f:
+            content = f.read()
+        transcript, _, analysis = content.partition(ANALYSIS_MARKER)
+        entry = (filename, content, transcript, analysis.strip())
+        files.append(entry)
+        signature.append((filename, stat.st_mtime_ns, stat.st_size))
+        size += sum(len(text.encode("utf-8")) for text in entry)  # Every string kept, not just the file text
+    return signature, SessionContent(files, has_audio, size)
@@ -0,0 +1,165 @@
+# session_store.py - SQLite-backed session metadata, replacing the rewrite-everything sessions.json
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+SESSIONS_DB = "./sessions.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions (created_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SessionStore:
+    """Session metadata in SQLite with O(1) id allocation, indexed lookups and atomic updates.
+
+    Rows are returned as dicts with the same keys sessions.json used
+    (name, path, created_at) plus the numeric id.
+    """
+    def __init__(self, path=SESSIONS_DB):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()  # One connection shared by the UI and background threads
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def create(self, sessions_dir):
+        """Allocate the next session id and name and record it; returns the new row."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'sessions'").fetchone()
+            session_id = (row["seq"] if row else 0) + 1
+            # Names of migrated sessions may not follow their ids; skip any that are taken
+            while self._conn.execute("SELECT 1 FROM sessions WHERE name = ?", (f"Session_{session_id}",)).fetchone():
+                session_id += 1
+            name = f"Session_{session_id}"
+            session = {
+                "id": session_id,
+                "name": name,
+                "path": os.path.join(sessions_dir, name),
+                "created_at": datetime.now().isoformat(),
+            }
+            self._conn.execute(
+                "INSERT INTO sessions (id, name, path, created_at) VALUES (:id, :name, :path, :created_at)", session
+            )
+        return session
+
+    def delete(self, name):
+        """Remove a session by name; returns True if it existed."""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM sessions WHERE name = ?", (name,)).rowcount > 0
+
+    def clear(self):
+        """Remove every session (ids keep counting up, so names are never reused)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions")
+
+    def get(self, name):
+        """Return the session with this name, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sessions WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, offset=0, limit=None, after_id=None):
+        """Return sessions in creation order, optionally one page at a time.
+
+        Paging with after_id (the last id of the previous page) costs the same
+        on every page, unlike a growing offset.
+        """
+        limit = -1 if limit is None else limit
+        with self._lock:
+            if after_id is None:
+                rows = self._conn.execute(
+                    "SELECT * FROM sessions ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM sessions WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def created_between(self, start, end):
+        """Return sessions created in [start, end), given as datetimes or ISO strings."""
+        start = start.isoformat() if isinstance(start, datetime) else start
+        end = end.isoformat() if isinstance(end, datetime) else end
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM sessions WHERE created_at >= ? AND created_at < ? ORDER BY created_at", (start, end)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def migrate_from_json(self, sessions_file, sessions_dir):
+        """Import sessions.json and any untracked data/sessions/ folders, once.
+
+        Returns the number of sessions imported; later calls are no-ops.
+        """
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_json'").fetchone():
+                return 0
+
+            sessions = []
+            if os.path.exists(sessions_file):
+                try:
+                    with open(sessions_file, "r") as f:
+                        sessions = json.load(f)
+                except json.JSONDecodeError:
+                    print(f"Error: Corrupted {sessions_file}. Importing session folders only.")
+
+            # Folders that exist on disk but were dropped from sessions.json
+            known = {session["name"] for session in sessions}
+            if os.path.isdir(sessions_dir):
+                for name in sorted(os.listdir(sessions_dir), key=_session_sort_key):
+                    path = os.path.join(sessions_dir, name)
+                    if name not in known and os.path.isdir(path):
+                        created_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+                        sessions.append({"name": name, "path": path, "created_at": created_at})
+
+            imported = 0
+            for session in sessions:
+                match = re.fullmatch(r"Session_(\d+)", session["name"])
+                taken = match and self._conn.execute(
+                    "SELECT 1 FROM sessions WHERE id = ?", (int(match.group(1)),)
+                ).fetchone()
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (id, name, path, created_at) VALUES (?, ?, ?, ?)",
+                    (
+                        int(match.group(1)) if match and not taken else None,
+                        session["name"],
+                        session.get("path", os.path.join(sessions_dir, session["name"])),
+                        session.get("created_at", datetime.now().isoformat()),
+                    ),
+                )
+                imported += cursor.rowcount
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)", (datetime.now().isoformat(),)
+            )
+        print(f"Imported {imported} sessions from {sessions_file} and {sessions_dir}")
+        return imported
+
+
+def _session_sort_key(name):
+    """Sort Session_2 before Session_10."""
+    match = re.fullmatch(r"Session_(\d+)", name)
+    return (0, int(match.group(1)), "") if match else (1, 0, name)
@@ -1,6 +1,13 @@
+import json
 import os
+import threading
+import time
+import wave
 import pytest
-from audio_handler import AudioRecorder, transcribe_audio
+from unittest.mock import MagicMock, patch
+from audio_handler import (
+    AudioRecorder, StreamingTranscriber, build_grammar, get_recognizer_pool, get_vosk_model, transcribe_audio
+)
 
 def test_start_stop_recording():
     """Test starting and stopping audio recording."""
@@ -20,3 +27,91 @@ def test_transcribe_audio_invalid_file():
     invalid_filename = "nonexistent_audio.wav"
     with pytest.raises(FileNotFoundError):
         transcribe_audio(invalid_filename)
+
+@patch("audio_handler.KaldiRecognizer")
+@patch("audio_handler.Model")
+def test_vosk_model_and_recognizers_are_reused(mock_model, mock_recognizer, tmp_path):
+    """Test that the model loads once per path and recognizers are pooled and reset."""
+    model_path = str(tmp_path)
+    assert get_vosk_model(model_path) is get_vosk_model(model_path)
+    mock_model.assert_called_once_with(model_path)
+
+    pool = get_recognizer_pool(model_path, 16000)
+    assert get_recognizer_pool(model_path, 16000) is pool
+    with pool.recognizer() as first:
+        pass
+    with pool.recognizer() as second:
+        pass
+    assert first is second
+    mock_recognizer.assert_called_once()
+    assert first.Reset.call_count == 2
+
+@patch("audio_handler.KaldiRecognizer")
+@patch("audio_handler.Model")
+def test_streaming_transcriber_collects_results(mock_model, mock_recognizer, tmp_path):
+    """Test that queued chunks are decoded together and joined like transcribe_audio."""
+    recognizer = mock_recognizer.return_value
+    recognizer.AcceptWaveform.return_value = True
+    recognizer.Result.return_value = '{"text": "i have a cough"}'
+    recognizer.FinalResult.return_value = '{"text": "and a fever"}'
+    results = []
+
+    transcriber = StreamingTranscriber(model_path=str(tmp_path), on_result=results.append)
+    transcriber.feed(b"\x00\x00" * 1024)
+    transcriber.feed(b"\x00\x00" * 1024)
+    transcriber.start()
+    assert transcriber.finish() == "i have a cough and a fever"
+    assert results == ["i have a cough", "and a fever"]
+    recognizer.AcceptWaveform.assert_called_once_with(b"\x00\x00" * 2048)
+
+def test_stream_to_disk_leaves_valid_wav_mid_recording(tmp_path):
+    """Test that chunks go straight to disk and the file is readable before it is closed."""
+    filename = str(tmp_path / "output1.wav")
+    recorder = AudioRecorder(filename=filename, stream_to_disk=True)
+    recorder.p = MagicMock()
+    recorder.p.get_sample_size.return_value = 2
+    recorder._open_writer()
+    for _ in range(3):
+        recorder._write_chunk(b"\x01\x00" * recorder.chunk)
+    assert recorder.frames == []
+
+    # Read the file while the writer is still open, as after a crash
+    with wave.open(filename, "rb") as wf:
+        assert wf.getframerate() == 16000
+        assert wf.getnframes() == 3 * recorder.chunk
+    recorder.writer.close()
+    recorder._output.close()
+
+def test_stop_recording_waits_for_the_last_chunk(tmp_path):
+    """Test that a chunk read while stopping is still fed to the transcriber before it finishes."""
+    recorder = AudioRecorder(filename=str(tmp_path / "output1.wav"), stream_to_disk=True)
+    recorder.p = MagicMock()
+    recorder.p.get_sample_size.return_value = 2
+    recorder._open_writer()
+    events = []
+    reading = threading.Event()
+
+    def slow_read(*args, **kwargs):
+        reading.set()
+        time.sleep(0.2)  # stop_recording arrives in the middle of this read
+        return b"\x00\x00" * recorder.chunk
+
+    recorder.stream = MagicMock()
+    recorder.stream.read.side_effect = slow_read
+    recorder.transcriber = MagicMock()
+    recorder.transcriber.feed.side_effect = lambda data: events.append("feed")
+    recorder.transcriber.finish.side_effect = lambda: events.append("finish") or ""
+    recorder.is_recording = True
+    thread = threading.Thread(target=recorder.record)
+    thread.start()
+    reading.wait()
+    recorder.stop_recording()
+    thread.join()
+    assert events == ["feed", "finish"]
+
+def test_build_grammar_limits_to_model_lexicon(tmp_path):
+    """Test that the grammar keeps known feature words and always adds the filler."""
+    (tmp_path / "graph").mkdir()
+    (tmp_path / "graph" / "words.txt").write_text("<eps> 0\ncough 1\nfever 2\nrash 3\n")
+    grammar = json.loads(build_grammar(["Fever", "cough", "xyzzyitis", "cough"], str(tmp_path)))
+    assert grammar == ["cough", "fever", "[unk]"]
@@ -0,0 +1,42 @@
+import json
+from batch_transcribe import load_completed, model_fingerprint, transcribe_archive, update_transcript_file
+
+
+def test_resume_skips_completed_files(tmp_path):
+    """Test that files recorded as ok by the same model are not transcribed again."""
+    model_path = tmp_path / "model"
+    model_path.mkdir()
+    (model_path / "final.mdl").write_bytes(b"v1")
+    model = model_fingerprint(str(model_path))
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        json.dumps({"path": "./data/sessions/Session_1/output1.wav", "status": "ok", "model": model}) + "\n"
+        + json.dumps({"path": "data/sessions/Session_2/output1.wav", "status": "error", "model": model}) + "\n"
+        + json.dumps({"path": "data/sessions/Session_4/output1.wav", "status": "ok", "model": "other"}) + "\n"
+        + '{"path": "data/sessions/Session_3/outp'  # Interrupted mid-write
+    )
+    assert load_completed(str(manifest), model) == {"data/sessions/Session_1/output1.wav"}
+
+    records = list(transcribe_archive(["data/sessions/Session_1/output1.wav"], workers=1,
+                                      model_path=str(model_path), manifest_path=str(manifest)))
+    assert records == []
+
+    # A changed model makes every file pending again
+    (model_path / "final.mdl").write_bytes(b"model v2")
+    assert model_fingerprint(str(model_path)) != model
+    assert load_completed(str(manifest), model_fingerprint(str(model_path))) == set()
+
+    # New records start on a fresh line instead of being glued to the truncated one
+    missing = str(tmp_path / "missing.wav")
+    records = list(transcribe_archive([missing], workers=1, model_path=str(model_path), manifest_path=str(manifest)))
+    assert [record["status"] for record in records] == ["error"]
+    last = manifest.read_text().splitlines()[-1]
+    assert json.loads(last)["path"] == missing
+
+
+def test_update_transcript_file_keeps_analysis(tmp_path):
+    """Test that a re-transcription replaces the text but keeps the appended analysis."""
+    (tmp_path / "transcription2.txt").write_text("old text\n\nAnalysis Result:\nDermatitis: 80.00%")
+    path = update_transcript_file(str(tmp_path / "output2.wav"), "new text")
+    with open(path) as f:
+        assert f.read() == "new text\n\nAnalysis Result:\nDermatitis: 80.00%"
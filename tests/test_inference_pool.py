@@ -0,0 +1,51 @@
+import pickle
+import numpy as np
+import pytest
+from inference_pool import InferencePool, attach_model, count_matrix, pack_model
+from numpy_engine import NumpyEngine
+from predictor import Featurizer, top_k_predictions
+
+FEATURES = ["cough", "fever", "rash", "itching", "wheezing", "nausea", "extraordinarily", "fever"]
+
+
+def small_engine():
+    rng = np.random.default_rng(0)
+    weights = [rng.standard_normal((len(FEATURES), 16)), rng.standard_normal((16, 7))]
+    biases = [rng.standard_normal(16), rng.standard_normal(7)]
+    return NumpyEngine(weights, biases, ["relu", "softmax"])
+
+
+def test_shared_vocabulary_matches_featurizer():
+    # Test the searchsorted lookup against the dict featurizer, including a repeated feature and long words
+    block, layout = pack_model(small_engine(), FEATURES)
+    try:
+        attached, engine, vocabulary, columns, size = attach_model(block.name, layout)
+        transcriptions = ["Fever and cough and fever", "", "extraordinarily extraordinarilyy rash itching", "unknown"]
+        expected = Featurizer(FEATURES).transform_many(transcriptions)
+        np.testing.assert_array_equal(count_matrix(transcriptions, vocabulary, columns, size), expected)
+        np.testing.assert_allclose(engine.predict(expected), small_engine().predict(expected), rtol=1e-6)
+        attached.close()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_pool_matches_in_process_predictions(tmp_path):
+    engine_path, features_path = str(tmp_path / "engine.npz"), str(tmp_path / "features.pkl")
+    small_engine().save(engine_path)
+    with open(features_path, "wb") as f:
+        pickle.dump(FEATURES, f)
+    rng = np.random.default_rng(1)
+    transcriptions = [" ".join(rng.choice(FEATURES + ["the", "and"], size=12)) for _ in range(50)]
+
+    featurizer, engine = Featurizer(FEATURES), small_engine()
+    expected = [top_k_predictions(row, 3) for row in engine.predict(featurizer.transform_many(transcriptions))]
+    with InferencePool(workers=2, batch_size=8, features_path=features_path, engine_path=engine_path,
+                       model_path=str(tmp_path / "missing.h5")) as pool:
+        name = pool._block.name
+        results = list(pool.predict(iter(transcriptions), k=3))
+    assert [[d for d, _ in r] for r in results] == [[d for d, _ in r] for r in expected]
+    np.testing.assert_allclose([[p for _, p in r] for r in results], [[p for _, p in r] for r in expected],
+                               rtol=1e-5)
+    with pytest.raises(FileNotFoundError):
+        attach_model(name, {"arrays": [], "activations": [], "features": 0})  # Freed on close
@@ -0,0 +1,62 @@
+import threading
+import time
+from jobs import JobExecutor
+
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks run only when the test pumps them."""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def pump_until(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            scheduled, self.scheduled = self.scheduled, []
+            for callback in scheduled:
+                callback()
+            time.sleep(0.01)
+        assert condition()
+
+
+def test_callbacks_run_on_the_polling_thread():
+    root = FakeRoot()
+    executor = JobExecutor(root, max_workers=1)
+    results, progress = [], []
+
+    def work(job, value):
+        job.report_progress(0.5, "Halfway")
+        return value * 2
+
+    executor.submit(
+        work, 21,
+        on_done=lambda job, result: results.append((threading.current_thread(), result)),
+        on_progress=lambda job, fraction, message: progress.append((fraction, message)),
+    )
+    root.pump_until(lambda: results)
+    assert results == [(threading.current_thread(), 42)]
+    assert progress == [(0.5, "Halfway")]
+    assert executor.jobs == {}
+    executor.shutdown()
+
+
+def test_errors_and_cancellation_reach_on_error():
+    root = FakeRoot()
+    executor = JobExecutor(root, max_workers=1)
+    errors = []
+    release = threading.Event()
+
+    def fail(job):
+        raise ValueError("boom")
+
+    executor.submit(fail, on_error=lambda job, error: errors.append(error))
+    executor.submit(lambda job: release.wait(5))
+    cancelled = executor.submit(lambda job: "never", on_error=lambda job, error: errors.append(error))
+    assert cancelled in executor.pending()
+    cancelled.cancel()
+    release.set()
+    root.pump_until(lambda: len(errors) == 2)
+    assert sorted(type(error).__name__ for error in errors) == ["JobCancelled", "ValueError"]
+    executor.shutdown()
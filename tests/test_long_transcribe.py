@@ -0,0 +1,35 @@
+import wave
+import numpy as np
+from long_transcribe import find_split_points, stitch
+
+
+def write_wav(path, samples):
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(samples.astype("<i2").tobytes())
+
+
+def test_split_points_land_in_the_nearest_pause(tmp_path):
+    rate = 16000
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(30 * rate) * 3000).astype(np.int16)  # 30 s of "speech"
+    audio[9 * rate:int(9.5 * rate)] = 0  # Pauses near the 10 s and 20 s targets
+    audio[int(21.2 * rate):int(21.6 * rate)] = 0
+    path = str(tmp_path / "long.wav")
+    write_wav(path, audio)
+
+    points = find_split_points(path, segment_seconds=10, search_seconds=3)
+    assert len(points) == 2
+    assert 9 * rate <= points[0] <= 9.5 * rate
+    assert 21.2 * rate <= points[1] <= 21.6 * rate
+
+
+def test_stitch_keeps_each_overlapping_word_once():
+    # Both segments decoded the audio around the 10 s boundary
+    segments = [
+        (0.0, 10.0, [("fever", 8.0, 8.4), ("and", 9.7, 9.9), ("cough", 9.95, 10.3)]),
+        (10.0, float("inf"), [("and", 9.72, 9.9), ("cough", 9.96, 10.28), ("rash", 11.0, 11.5)]),
+    ]
+    assert stitch(segments) == "fever and cough rash"
@@ -0,0 +1,56 @@
+import json
+import metrics
+
+
+def test_spans_are_recorded_only_when_enabled():
+    metrics.reset()
+
+    @metrics.timed("test.decorated")
+    def work(x):
+        return x + 1
+
+    with metrics.span("test.block"):
+        pass
+    assert work(1) == 2
+    assert metrics.snapshot() == {}
+
+    metrics.enable()
+    try:
+        with metrics.span("test.block"):
+            pass
+        work(1)
+        metrics.observe("test.block", 0.2)
+    finally:
+        metrics.enable(False)
+    stats = metrics.snapshot()
+    assert stats["test.block"]["count"] == 2
+    assert stats["test.decorated"]["count"] == 1
+    assert stats["test.block"]["max_s"] >= 0.2
+    assert stats["test.block"]["p99_s"] == 0.2
+    metrics.reset()
+
+
+def test_prometheus_and_json_export(tmp_path):
+    metrics.reset()
+    for seconds in (0.0002, 0.003, 0.003, 7.0):
+        metrics.observe("predictor.inference", seconds)
+
+    text = metrics.to_prometheus()
+    assert "# TYPE symptomsease_stage_seconds histogram" in text
+    assert 'symptomsease_stage_seconds_bucket{stage="predictor.inference",le="0.00025"} 1' in text
+    assert 'symptomsease_stage_seconds_bucket{stage="predictor.inference",le="0.005"} 3' in text
+    assert 'symptomsease_stage_seconds_bucket{stage="predictor.inference",le="+Inf"} 4' in text
+    assert 'symptomsease_stage_seconds_count{stage="predictor.inference"} 4' in text
+
+    prometheus_path = str(tmp_path / "stages.prom")
+    json_path = str(tmp_path / "stages.jsonl")
+    metrics.export(prometheus_path)
+    metrics.export(json_path)
+    metrics.export(json_path)
+    with open(prometheus_path) as f:
+        assert f.read() == text
+    with open(json_path) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 2
+    assert records[0]["stages"]["predictor.inference"]["count"] == 4
+    metrics.reset()
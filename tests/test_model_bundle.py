@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import predictor
+from model_bundle import ModelBundle, write_bundle
+
+FEATURES = ["cough", "fever", "rash", "nausea"]
+
+
+def write_small_bundle(path, source_digest="digest"):
+    rng = np.random.default_rng(0)
+    weights = [rng.standard_normal((4, 8)), rng.standard_normal((8, 7))]
+    biases = [rng.standard_normal(8), rng.standard_normal(7)]
+    scale, offset = np.array([0.5, 1.0, 2.0, 0.25]), np.array([0.1, 0.0, -0.2, 0.3])
+    write_bundle(path, FEATURES, scale, offset, weights, biases, ["relu", "softmax"], source_digest)
+    return weights, biases, scale, offset
+
+
+def test_bundle_round_trip_is_mapped_and_checksummed(tmp_path):
+    path = str(tmp_path / "model.bundle")
+    weights, biases, scale, offset = write_small_bundle(path)
+    bundle = ModelBundle.load(path)
+    assert bundle.features == FEATURES and bundle.source_digest == "digest"
+    assert not bundle.engine.weights[0].flags.owndata  # A view of the mapping, not a copy
+    assert not bundle.engine.weights[0].flags.writeable
+
+    counts = np.array([[1, 0, 2, 0], [0, 3, 0, 1]], dtype=np.float64)
+    hidden = np.maximum((counts * scale + offset) @ weights[0] + biases[0], 0) @ weights[1] + biases[1]
+    expected = np.exp(hidden - hidden.max(axis=1, keepdims=True))
+    np.testing.assert_allclose(bundle.predict(counts), expected / expected.sum(axis=1, keepdims=True), rtol=1e-5)
+
+    # Flip one byte of the last array
+    with open(path, "r+b") as f:
+        f.seek(-3, 2)
+        byte = f.read(1)
+        f.seek(-3, 2)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    with pytest.raises(ValueError, match="checksum"):
+        ModelBundle.load(path)
+
+
+def test_model_handle_prefers_bundle_and_falls_back(tmp_path):
+    bundle_path = str(tmp_path / "model.bundle")
+    write_small_bundle(bundle_path)
+    missing = str(tmp_path / "missing")
+    # Without the source files the bundle is used as it is
+    handle = predictor.ModelHandle(missing + ".h5", missing + ".pkl", missing + ".pkl", missing + ".npz",
+                                   bundle_path=bundle_path).load()
+    assert handle.backend == "bundle" and handle.features == FEATURES
+    assert handle.fingerprint == "digest"
+
+    # A bundle built from other model files is ignored in favour of the current files
+    write_small_bundle(bundle_path, source_digest="stale")
+    handle = predictor.ModelHandle(bundle_path=bundle_path)
+    assert handle._load_bundle() is None
+
+    # A bundle that cannot be opened is skipped too, unless the bundle backend was requested
+    unreadable = tmp_path / "unreadable.bundle"
+    unreadable.mkdir()
+    assert predictor.ModelHandle(bundle_path=str(unreadable))._load_bundle() is None
+    with pytest.raises(OSError):
+        predictor.ModelHandle(bundle_path=str(unreadable), backend="bundle")._load_bundle()
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import zipfile
+import numpy as np
+import pytest
+from numpy_engine import NumpyEngine, export_engine, fold_scaler
+from predictor import ModelHandle
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def engine_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("engine") / "numpy_engine.npz")
+    export_engine(out_path=path)
+    return path
+
+
+def test_fold_scaler_matches_scaling_first():
+    # Test that folding a MinMaxScaler into the first layer is exact
+    from sklearn.preprocessing import MinMaxScaler
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 5, size=(20, 6)).astype(float)
+    scaler = MinMaxScaler().fit(data)
+    weight, bias = rng.normal(size=(6, 3)), rng.normal(size=3)
+
+    folded_weight, folded_bias = fold_scaler(weight, bias, scaler)
+    expected = scaler.transform(data) @ weight + bias
+    assert np.allclose(data @ folded_weight + folded_bias, expected)
+
+
+def test_engine_parity_with_keras(engine_path):
+    # Test that the exported engine reproduces the Keras probabilities
+    keras_handle = ModelHandle(backend="keras").load()
+    engine = NumpyEngine.load(engine_path)
+    rng = np.random.default_rng(1)
+    counts = rng.poisson(0.05, size=(64, engine.input_size)).astype(float)
+
+    expected = keras_handle.predict_counts(counts)
+    actual = engine.predict(counts)
+    assert actual.shape == expected.shape
+    assert np.allclose(actual, expected, atol=1e-5)
+
+
+def test_predict_disease_without_tensorflow(engine_path):
+    # Test that serving from the engine never imports TensorFlow
+    code = (
+        "import sys, predictor\n"
+        f"predictor._handle = predictor.ModelHandle(engine_path={engine_path!r}, bundle_path='missing.bundle')\n"
+        "predictions = predictor.predict_disease('cough fever sore throat')\n"
+        "assert predictor._handle.backend == 'numpy'\n"
+        "assert len(predictions) == 2\n"
+        "assert 'tensorflow' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+
+
+def test_corrupt_engine_falls_back_unless_requested(tmp_path):
+    # Test that a damaged export is skipped in auto mode but reported when numpy was asked for
+    path = tmp_path / "numpy_engine.npz"
+    path.write_bytes(b"PK\x03\x04 cut short")
+    assert ModelHandle(engine_path=str(path))._load_engine() is None
+    with pytest.raises(zipfile.BadZipFile):
+        ModelHandle(engine_path=str(path), backend="numpy")._load_engine()
@@ -1,39 +1,30 @@
-import time
-from unittest.mock import patch
+import glob
+import pytest
+import predictor
+from benchmarks.suite import DEFAULT_FILES, compare, stage_predict, stage_transcribe
+from sea_audio import AUDIO_EXTENSIONS
 
-# Mocking the transcribe_audio function
-@patch('audio_handler.transcribe_audio')
-def test_transcription_performance(mock_transcribe_audio):
-    # Define the mock return value
-    mock_transcribe_audio.return_value = "This is a test transcription."
-    
-    # Measure transcription speed
-    start_time = time.time()
-    transcription = mock_transcribe_audio("sample_audio.wav")
-    end_time = time.time()
+def test_transcription_performance():
+    # Decode one stored recording with the real Vosk model
+    files = sorted(path for path in glob.glob(DEFAULT_FILES) if path.endswith(AUDIO_EXTENSIONS))[:1]
+    result = stage_transcribe(files)
+    if "skipped" in result:
+        pytest.skip(result["skipped"])
+    assert result["count"] == 1
+    assert result["rtf"] < 1.0  # Must decode faster than real time
 
-    # Assertions
-    assert len(transcription) > 0  # Transcription should not be empty
-    assert end_time - start_time < 5  # Must complete within 5 seconds
+def test_prediction_performance():
+    # Score real synthetic transcripts with the real classifier
+    cache = predictor._cache
+    result = stage_predict(count=50, length=200)
+    assert predictor._cache is cache  # The stage turns the cache off only while it runs
+    assert result["count"] == 50
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert result["p99_ms"] < 2000  # Each prediction must complete within 2 seconds
 
-# Mocking the predict_disease function
-@patch('predictor.predict_disease')
-def test_prediction_performance(mock_predict_disease):
-    # Define the mock return value
-    mock_predict_disease.return_value = ["Upper Respiratory Tract Infection", "Dermatitis"]
-
-    # Measure prediction speed
-    transcription = "cough fever"
-    start_time = time.time()
-    predictions = mock_predict_disease(transcription)
-    end_time = time.time()
-
-    # Assertions
-    assert len(predictions) > 0  # Ensure predictions are returned
-    assert end_time - start_time < 2  # Must complete within 2 seconds
-
-# Run the test cases
-if __name__ == "__main__":
-    test_transcription_performance()
-    test_prediction_performance()
-    print("All tests passed!")
+def test_compare_flags_regressions():
+    # Test that slower latency and lower throughput beyond the threshold are reported
+    baseline = {"stages": {"predict": {"p50_ms": 1.0, "p95_ms": 2.0, "throughput": 1000.0}}}
+    results = {"stages": {"predict": {"p50_ms": 1.1, "p95_ms": 3.0, "throughput": 700.0}}}
+    flagged = [(stage, metric) for stage, metric, *_ in compare(results, baseline, threshold=0.2)]
+    assert flagged == [("predict", "p95_ms"), ("predict", "throughput")]
@@ -0,0 +1,42 @@
+import os
+import wave
+from unittest.mock import patch
+from pipeline import expand_inputs, run_pipeline
+
+
+def write_wav(path, seconds=0.5):
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b"\0\0" * int(16000 * seconds))
+
+
+def test_expand_inputs_accepts_directories_globs_and_files(tmp_path):
+    os.makedirs(tmp_path / "Session_1")
+    for name in ("a.wav", "Session_1/b.wav", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    paths = expand_inputs([str(tmp_path), str(tmp_path / "*.wav")])
+    assert paths == sorted([os.path.normpath(tmp_path / "a.wav"), os.path.normpath(tmp_path / "Session_1/b.wav")])
+
+
+def test_pipeline_scores_every_file_and_reports_failures(tmp_path):
+    paths = []
+    for i in range(5):
+        paths.append(str(tmp_path / f"output{i}.wav"))
+        write_wav(paths[-1])
+    paths.append(str(tmp_path / "missing.wav"))
+
+    def fake_batch(transcriptions, k, batch_size):
+        return [[("Anemia", 0.9), ("Migraine", 0.1)] for _ in transcriptions]
+
+    with patch("pipeline.transcribe_audio", side_effect=lambda path, *a, **kw: os.path.basename(path)), \
+            patch("pipeline.predict_disease_batch", side_effect=fake_batch):
+        records = list(run_pipeline(paths, workers=2, queue_size=2, batch_size=4))
+
+    assert sorted(record["path"] for record in records) == sorted(paths)
+    by_path = {record["path"]: record for record in records}
+    assert by_path[paths[0]]["transcription"] == "output0.wav"
+    assert by_path[paths[0]]["predictions"][0] == {"disease": "Anemia", "probability": 0.9}
+    assert by_path[paths[0]]["audio_seconds"] == 0.5
+    assert by_path[paths[-1]]["status"] == "error"
@@ -0,0 +1,36 @@
+import numpy as np
+from prediction_cache import PredictionCache
+
+
+def test_lru_eviction_and_stats():
+    cache = PredictionCache(max_entries=2)
+    cache.use_fingerprint("model-a")
+    keys = [PredictionCache.key([i], [1]) for i in range(3)]
+    cache.put(keys[0], [0.1, 0.9])
+    cache.put(keys[1], [0.2, 0.8])
+    assert cache.get(keys[0]) is not None  # keys[0] is now the most recently used
+    cache.put(keys[2], [0.3, 0.7])
+    assert cache.get(keys[1]) is None
+    np.testing.assert_allclose(cache.get(keys[0]), [0.1, 0.9])
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1, 2)
+    assert PredictionCache.key([1, 5], [2, 1]) != PredictionCache.key([1, 5], [1, 2])
+
+
+def test_persisted_cache_is_dropped_when_the_model_changes(tmp_path):
+    path = str(tmp_path / "predictions.npz")
+    cache = PredictionCache(path=path)
+    cache.use_fingerprint("model-a")
+    key = PredictionCache.key([3], [2])
+    cache.put(key, [0.25, 0.75])
+    cache.save()
+
+    reloaded = PredictionCache(path=path)
+    reloaded.use_fingerprint("model-a")
+    np.testing.assert_allclose(reloaded.get(key), [0.25, 0.75])
+
+    reloaded.use_fingerprint("model-b")
+    assert reloaded.get(key) is None
+    fresh = PredictionCache(path=path)
+    fresh.use_fingerprint("model-b")
+    assert fresh.stats()["entries"] == 0
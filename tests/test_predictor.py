@@ -1,5 +1,10 @@
+import os
+import subprocess
+import sys
+import numpy as np
 import pytest
-from predictor import predict_disease
+import predictor
+from predictor import Featurizer, predict_disease, predict_disease_batch, top_k_predictions
 
 def test_predict_disease_valid():
     # Test disease prediction with valid transcription
@@ -35,3 +40,93 @@ def test_predict_disease_empty():
             'Pneumonia'
         ]  # Validate the disease is one of the known diseases
         assert 0 <= probability <= 1  # Ensure probabilities are within the valid range
+
+def test_featurizer_matches_list_scan():
+    # Test the indexed featurizer against the original list-scan count vector
+    featurizer = Featurizer(["cough", "fever", "rash"])
+    transcription = "Fever and cough, then more FEVER fever rash unknown"
+    expected = np.array([0, 3, 1])  # "cough," keeps its comma so it is not counted
+    assert np.array_equal(featurizer.transform(transcription), expected)
+
+    indices, counts = featurizer.transform_sparse(transcription)
+    assert indices.tolist() == [1, 2]
+    assert counts.tolist() == [3, 1]
+
+    matrix = featurizer.transform_many([transcription, "", "rash rash"])
+    assert matrix.shape == (3, 3)
+    assert np.array_equal(matrix[0], expected)
+    assert np.array_equal(matrix[2], [0, 0, 2])
+
+def test_predict_disease_batch_matches_single():
+    # Test that batched scoring returns the same top-k as one call per transcript
+    transcriptions = ["cough fever sore throat", "", "itchy rash on skin", "stomach pain nausea"]
+    batched = list(predict_disease_batch(iter(transcriptions), k=2, batch_size=3))
+    assert len(batched) == len(transcriptions)
+    for transcription, predictions in zip(transcriptions, batched):
+        expected = predict_disease(transcription)
+        assert [disease for disease, _ in predictions] == [disease for disease, _ in expected]
+        for (_, probability), (_, expected_probability) in zip(predictions, expected):
+            assert probability == pytest.approx(expected_probability, abs=1e-5)
+
+    top3 = next(predict_disease_batch(["cough"], k=3))
+    assert len(top3) == 3
+    assert top3[0][1] >= top3[1][1] >= top3[2][1]
+
+def test_top_k_predictions_edge_cases():
+    # Test that k is clamped to the number of classes and that k < 1 is rejected
+    probabilities = np.array([0.1, 0.6, 0.3])
+    assert [p for _, p in top_k_predictions(probabilities, 1)] == [0.6]
+    assert [p for _, p in top_k_predictions(probabilities, 10)] == [0.6, 0.3, 0.1]
+    for k in (0, -1):
+        with pytest.raises(ValueError):
+            top_k_predictions(probabilities, k)
+
+
+def test_same_counts_are_served_from_cache():
+    # Test that transcripts with the same count vector reuse one model result
+    cache = predictor.configure_cache(max_entries=16)
+    try:
+        first = predict_disease("fever cough cough")
+        again = predict_disease("Cough fever unknownword cough")  # Same counts in another order
+        stats = predictor.cache_stats()
+        assert again == first
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["fingerprint"] == predictor._handle.fingerprint
+        assert cache.get(cache.key(*predictor.featurizer.transform_sparse("fever cough cough"))) is not None
+    finally:
+        predictor.configure_cache()
+
+def test_import_does_not_load_model():
+    # Test that importing predictor defers TensorFlow and model loading to first use
+    code = (
+        "import sys, predictor\n"
+        "assert 'tensorflow' not in sys.modules\n"
+        "assert not predictor._handle.loaded\n"
+    )
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], cwd=repo_root, check=True)
+
+def test_incremental_predictor_matches_full_prediction():
+    # Test the running counts against featurizing the whole transcript, and the re-score throttle
+    utterances = ["i have a cough", "and some fever since monday", "um", "the cough is worse at night"]
+    live = predictor.IncrementalPredictor(k=2, min_interval=3600)
+    assert live.update(utterances[0]) is not None  # The first change is scored straight away
+    for utterance in utterances[1:]:
+        assert live.update(utterance) is None  # Throttled
+    transcript = " ".join(utterances)
+    assert np.array_equal(live.counts, predictor.featurizer.transform(transcript))
+    assert not live.due() and live.due(force=True)
+    predictions = live.refresh(force=True)
+    assert [disease for disease, _ in predictions] == [disease for disease, _ in predict_disease(transcript)]
+    assert live.version == 2
+    assert not live.due(force=True) and live.refresh(force=True) is None  # Nothing new to score
+
+
+def test_incremental_predictor_does_not_load_the_model_in_add_text(monkeypatch):
+    # Test that utterances added before the model is loaded are queued, then folded in by refresh()
+    monkeypatch.setattr(predictor, "_handle", predictor.ModelHandle())
+    live = predictor.IncrementalPredictor(k=2)
+    live.add_text("i have a cough")
+    assert not predictor._handle.loaded and live.counts is None and live.due()
+    assert live.refresh() is not None
+    assert np.array_equal(live.counts, predictor._handle.featurizer.transform("i have a cough"))
@@ -0,0 +1,56 @@
+import wave
+import numpy as np
+from sea_audio import SeaReader, SeaWriter, convert, same_audio
+
+
+def speech_like(seconds, rate=16000):
+    # A wandering tone plus noise, including full-scale samples that wrap in the delta step
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    samples = 8000 * np.sin(2 * np.pi * 220 * t) + rng.standard_normal(len(t)) * 500
+    samples = np.clip(samples, -32768, 32767).astype(np.int16)
+    samples[:2] = (32767, -32768)
+    return samples
+
+
+def test_wav_round_trip_and_seek(tmp_path):
+    wav_path, sea_path, back_path = (str(tmp_path / name) for name in ("a.wav", "a.sea", "b.wav"))
+    samples = speech_like(2.5)
+    with wave.open(wav_path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(samples.tobytes())
+
+    convert(wav_path, sea_path)
+    convert(sea_path, back_path)
+    assert same_audio(wav_path, sea_path)
+    with open(wav_path, "rb") as a, open(back_path, "rb") as b:
+        assert a.read() == b.read()
+
+    with SeaReader(sea_path) as reader:
+        assert reader.getnframes() == len(samples)
+        reader.setpos(20000)  # Inside the second chunk
+        assert reader.readframes(100) == samples[20000:20100].tobytes()
+        assert reader.tell() == 20100
+
+
+def test_interrupted_recording_keeps_complete_chunks(tmp_path):
+    path = str(tmp_path / "rec.sea")
+    samples = speech_like(2.5)
+    f = open(path, "wb")
+    writer = SeaWriter(f, chunk_frames=16000)
+    writer.setnchannels(1)
+    writer.setsampwidth(2)
+    writer.setframerate(16000)
+    for start in range(0, len(samples), 1000):
+        writer.writeframes(samples[start:start + 1000].tobytes())
+    writer.close()
+    f.close()
+
+    # Cut the last chunk in half, as a crash while writing it would
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 10)
+    with SeaReader(path) as reader:
+        assert reader.getnframes() == 32000
+        assert reader.readframes(40000) == samples[:32000].tobytes()
@@ -0,0 +1,62 @@
+from search_index import SearchIndex, parse_query
+
+
+def test_boolean_phrase_and_ranked_queries():
+    index = SearchIndex()
+    index.add("Session_1", "transcription1.txt", "I have a bad cough and chest pain since monday")
+    index.add("Session_2", "transcription1.txt", "My chest feels tight but there is no pain")
+    index.add("Session_3", "transcription1.txt", "Cough cough cough all night with a fever")
+    index.add("Session_4", "transcription1.txt", "The rash on my arm is itchy")
+
+    def sessions(query):
+        return [hit.session for hit in index.search(query)]
+
+    assert parse_query('Chest -fever OR "chest pain"') == [([("chest",)], [("fever",)]), ([("chest", "pain")], [])]
+    assert sorted(sessions("chest pain")) == ["Session_1", "Session_2"]
+    assert sessions('"chest pain"') == ["Session_1"]
+    assert sessions("cough") == ["Session_3", "Session_1"]  # More occurrences rank higher
+    assert sessions("cough -fever") == ["Session_1"]
+    assert sessions("cough NOT fever") == ["Session_1"]
+    assert sorted(sessions("rash OR fever")) == ["Session_3", "Session_4"]
+    assert sessions("headache") == [] and sessions("-cough") == []
+    assert "chest pain" in index.search('"chest pain"')[0].snippet
+
+
+def test_incremental_updates_sync_and_reload(tmp_path):
+    sessions_dir = tmp_path / "sessions"
+    (sessions_dir / "Session_1").mkdir(parents=True)
+    (sessions_dir / "Session_2").mkdir()
+    (sessions_dir / "Session_1" / "transcription1.txt").write_text("sore throat and a headache")
+    (sessions_dir / "Session_2" / "transcription1.txt").write_text("a headache every morning")
+
+    index = SearchIndex(str(tmp_path / "index.npz"))
+    assert index.sync(str(sessions_dir)) == (2, 0)
+    assert index.sync(str(sessions_dir)) == (0, 0)  # Nothing changed
+
+    # The analysis result appended by the app is not searchable
+    path = sessions_dir / "Session_1" / "transcription1.txt"
+    path.write_text("sore throat and a cough\n\nAnalysis Result:\nCommon Cold: 80.00%")
+    index.add_file(str(path))
+    assert [hit.session for hit in index.search("headache")] == ["Session_2"]
+    assert index.search("common cold") == []
+
+    index.remove("Session_2")
+    assert index.search("headache") == []
+    index.save()
+    reloaded = SearchIndex(str(tmp_path / "index.npz"))
+    assert len(reloaded) == 1
+    assert [(hit.session, hit.filename) for hit in reloaded.search('"a cough"')] == [("Session_1", "transcription1.txt")]
+    assert reloaded.sync(str(sessions_dir)) == (1, 0)  # Session_2 is still on disk, so it comes back
+
+
+def test_or_query_with_term_of_removed_files(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.npz"))
+    index.add("Session_1", "transcription1.txt", "a dry cough")
+    index.add("Session_2", "transcription1.txt", "bitten by a zebra")
+    index.remove("Session_2")
+    index.save()
+
+    # "zebra" is still in the reloaded vocabulary, but its posting list is empty
+    reloaded = SearchIndex(str(tmp_path / "index.npz"))
+    assert [hit.session for hit in reloaded.search("cough OR zebra")] == ["Session_1"]
+    assert reloaded.search("zebra") == []
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from unittest.mock import patch
+import pytest
+from service import InferenceService, MicroBatcher
+
+
+def test_batcher_groups_concurrent_requests_and_rejects_when_full():
+    calls = []
+
+    def score(transcriptions):
+        calls.append(list(transcriptions))
+        return [text.upper() for text in transcriptions]
+
+    async def scenario():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=20, max_queue=10)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(f"t{i}") for i in range(10)))
+        await batcher.stop()
+
+        # Nothing drains a stopped batcher, so the eleventh waiting request is turned away
+        waiting = [asyncio.ensure_future(batcher.submit(f"w{i}")) for i in range(10)]
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.QueueFull):
+            await batcher.submit("overflow")
+        for task in waiting:
+            task.cancel()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == [f"T{i}" for i in range(10)]
+    assert [len(batch) for batch in calls] == [8, 2]
+    assert stats["rejected"] == 1
+
+
+def test_predict_endpoint_over_http():
+    async def request(port, raw):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            headers[name.lower()] = value.strip()
+        body = json.loads(await reader.readexactly(int(headers["content-length"])))
+        writer.close()
+        return status, body
+
+    async def scenario():
+        service = InferenceService(max_batch_size=4, max_wait_ms=1)
+        _, port = await service.start("127.0.0.1", 0)
+        body = json.dumps({"transcription": "fever and cough"}).encode()
+        ok = await request(port, b"POST /predict HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        bad = await request(port, b"POST /predict HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+        missing = await request(port, b"GET /nowhere HTTP/1.1\r\n\r\n")
+        negative = await request(port, b"POST /predict HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+        garbled = await request(port, b"POST /predict HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+        # Refused from the header alone, without sending (or reading) the body
+        too_large = await request(port, b"POST /predict HTTP/1.1\r\nContent-Length: 2000000\r\n\r\n")
+        await service.stop()
+        return ok, bad, missing, negative, garbled, too_large
+
+    fake_scores = lambda transcriptions, k: [[{"disease": "Anemia", "probability": 0.5}] for _ in transcriptions]
+    with patch("service.warm_up"), patch("service.score_transcriptions", side_effect=fake_scores):
+        ok, bad, missing, negative, garbled, too_large = asyncio.run(scenario())
+    assert ok == (200, {"predictions": [{"disease": "Anemia", "probability": 0.5}]})
+    assert bad[0] == 400
+    assert missing[0] == 404
+    assert negative[0] == 400 and garbled[0] == 400
+    assert too_large[0] == 413
@@ -0,0 +1,51 @@
+import os
+from session_cache import SessionContentCache
+
+
+def write(path, text, mtime_offset=0):
+    with open(path, "w") as f:
+        f.write(text)
+    # Push the mtime forward so the change is visible on coarse-grained filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+
+def test_revisit_hits_and_changes_miss(tmp_path):
+    """Test that unchanged sessions are served from memory and edits are picked up."""
+    session = str(tmp_path)
+    write(os.path.join(session, "transcription1.txt"), "i have a cough")
+    cache = SessionContentCache()
+
+    first = cache.get(session)
+    assert [f[0] for f in first.files] == ["transcription1.txt"]
+    assert first.has_audio is False
+    assert cache.get(session) is first
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    # Appending an analysis changes the file but not the folder
+    write(os.path.join(session, "transcription1.txt"),
+          "i have a cough\n\nAnalysis Result:\nPneumonia: 60.00%", mtime_offset=10**9)
+    updated = cache.get(session)
+    assert updated.files[0][2:] == ("i have a cough", "Pneumonia: 60.00%")
+    assert cache.stats()["misses"] == 2
+
+
+def test_byte_limit_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays under its size limit by dropping the oldest entry."""
+    sessions = []
+    for i in range(3):
+        session = tmp_path / f"Session_{i}"
+        session.mkdir()
+        write(str(session / "transcription1.txt"), "x" * 100)
+        sessions.append(str(session))
+
+    # Each entry keeps the file text and its transcript part: 200 bytes plus the file name
+    cache = SessionContentCache(max_bytes=500)
+    assert cache.get(sessions[0]).size == 200 + len("transcription1.txt")
+    cache.get(sessions[1])
+    cache.get(sessions[0])  # Session_0 becomes the most recently used
+    cache.get(sessions[2])
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 500 and stats["evictions"] == 1
+    cache.get(sessions[0])
+    assert cache.stats()["hits"] == 2
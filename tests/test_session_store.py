@@ -0,0 +1,44 @@
+import json
+import os
+from session_store import SessionStore
+
+
+def test_create_never_reuses_names(tmp_path):
+    """Test that ids keep counting up across deletes and a full clear."""
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    first = store.create("./data/sessions/")
+    second = store.create("./data/sessions/")
+    assert (first["name"], second["name"]) == ("Session_1", "Session_2")
+
+    store.delete("Session_2")
+    assert store.create("./data/sessions/")["name"] == "Session_3"
+    store.clear()
+    assert store.count() == 0
+    assert store.create("./data/sessions/")["name"] == "Session_4"
+
+    # Deleting one session leaves the others' metadata untouched
+    assert store.get("Session_4")["created_at"]
+    assert store.delete("missing") is False
+
+
+def test_migrate_from_json_and_folders(tmp_path):
+    """Test the one-time import of sessions.json plus untracked session folders."""
+    sessions_dir = tmp_path / "sessions"
+    for name in ("Session_1", "Session_3", "Session_10"):
+        (sessions_dir / name).mkdir(parents=True)
+    sessions_file = tmp_path / "sessions.json"
+    sessions_file.write_text(json.dumps([
+        {"name": "Session_1", "path": str(sessions_dir / "Session_1"), "created_at": "2024-11-28T20:20:13"},
+        {"name": "Session_3", "path": str(sessions_dir / "Session_3"), "created_at": "2024-11-30T11:01:21"},
+    ]))
+
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    assert store.migrate_from_json(str(sessions_file), str(sessions_dir)) == 3
+    assert store.migrate_from_json(str(sessions_file), str(sessions_dir)) == 0
+    assert [s["name"] for s in store.list()] == ["Session_1", "Session_3", "Session_10"]
+    assert store.get("Session_1")["created_at"] == "2024-11-28T20:20:13"
+    assert [s["name"] for s in store.created_between("2024-11-29", "2024-12-01")] == ["Session_3"]
+    assert [s["name"] for s in store.list(offset=1, limit=1)] == ["Session_3"]
+    assert [s["name"] for s in store.list(limit=5, after_id=store.get("Session_1")["id"])] == ["Session_3", "Session_10"]
+    assert store.create(str(sessions_dir))["name"] == "Session_11"
+    assert os.path.exists(store.path)
@@ -30,3 +30,22 @@ def test_toggle_recording(mock_get_path):
     app.toggle_recording()
     assert app.is_recording is False  # Verify recording is stopped
     root.destroy()
+
+
+@patch("ui_main.SESSION_PAGE_SIZE", 2)
+def test_session_list_loads_in_pages():
+    # Test that startup only fills the sidebar with the first page of sessions
+    root = Tk()
+    app = DiseasesEaseApp(root, warm_up=False)
+    for _ in range(3):
+        app.create_new_session()
+    root.destroy()
+
+    root = Tk()
+    app = DiseasesEaseApp(root, warm_up=False)
+    total = app.store.count()
+    assert app.sessions_list.size() == 2
+    while not app.all_sessions_loaded:
+        app.load_next_session_page()
+    assert app.sessions_list.size() == total
+    root.destroy()
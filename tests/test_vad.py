@@ -0,0 +1,37 @@
+import numpy as np
+from vad import EnergyVAD
+
+RATE = 16000
+
+
+def make_audio():
+    """Two seconds of near-silence around half a second of a loud tone."""
+    rng = np.random.default_rng(0)
+    silence = rng.normal(0, 30, RATE * 2)  # About -60 dBFS
+    t = np.arange(RATE // 2) / RATE
+    tone = 8000 * np.sin(2 * np.pi * 220 * t)
+    return np.concatenate([silence, tone, silence]).astype("<i2").tobytes()
+
+
+def test_vad_drops_silence_and_keeps_speech():
+    """Test that long pauses are cut down while the loud segment survives intact."""
+    audio = make_audio()
+    vad = EnergyVAD(hangover_ms=200, max_silence_ms=100, pre_roll_ms=100)
+    kept = vad.filter(audio)
+
+    tone = audio[2 * RATE * 2:2 * RATE * 2 + RATE]  # The half second of tone, in bytes
+    assert tone in kept
+    # Tone plus at most pre-roll, hangover and pause allowance
+    assert len(kept) <= len(tone) + 2 * int(0.4 * RATE)
+    assert vad.kept_ratio < 0.3
+
+
+def test_vad_streaming_matches_one_shot():
+    """Test that feeding odd-sized chunks gives the same output as one call."""
+    audio = make_audio()
+    expected = EnergyVAD().filter(audio)
+
+    vad = EnergyVAD()
+    streamed = b"".join(vad.process(audio[i:i + 3001 * 2]) for i in range(0, len(audio), 3001 * 2))
+    streamed += vad.flush()
+    assert streamed == expected
@@ -1,19 +1,38 @@
+import argparse
 import ctypes
 import os
+import queue
+import re
 import threading
 import tkinter as tk
-import json
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
 from PIL import Image, ImageTk
-from datetime import datetime
-from datetime import datetime
-from audio_handler import AudioRecorder, transcribe_audio
-from predictor import predict_disease
+from audio_handler import AudioRecorder
+from jobs import JobExecutor
+import metrics
+from predictor import IncrementalPredictor, predict_disease, warm_up as warm_up_predictor
+from session_cache import SessionContentCache
+from search_index import SEARCH_INDEX_FILE, SearchIndex
+from session_store import SESSIONS_DB, SessionStore
 from ui.styles.colors import COLORS
+from vad import EnergyVAD
 
 SESSIONS_DIR = "./data/sessions/"
-SESSIONS_FILE = "./sessions.json"
+SESSIONS_FILE = "./sessions.json"  # Legacy metadata, imported into SESSIONS_DB once
+SESSION_PAGE_SIZE = 200  # Sessions added to the sidebar per page
+RECORDING_EXTENSION = ".sea"  # Lossless compressed audio (sea_audio.py); ".wav" for plain PCM
+SEARCH_RESULT_LIMIT = 500  # Transcripts listed per sidebar search
+LIVE_PREDICTION_INTERVAL = 2.0  # Minimum seconds between live re-scores while recording
+
+def next_recording_index(session_path):
+    """Return the next free n for output{n}.sea / transcription{n}.txt in a session folder."""
+    indices = [
+        int(match.group(1)) for match in
+        (re.fullmatch(r"(?:output|transcription)(\d+)\.(?:wav|sea|txt)", f) for f in os.listdir(session_path))
+        if match
+    ]
+    return max(indices, default=0) + 1
 
 class ChatSession:
     """Class to manage individual chat sessions"""
@@ -22,7 +41,7 @@ class ChatSession:
         self.messages = []
 
 class DiseasesEaseApp:
-    def __init__(self, root):
+    def __init__(self, root, warm_up=True):
         # Initialize main window
         self.root = root
         self.root.title("DiseasesEaseAI")
@@ -35,11 +54,23 @@ class DiseasesEaseApp:
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("DiseasesEaseAI")
 
         # Initialize sessions and recorder
+        self.store = SessionStore(SESSIONS_DB)
+        self.store.migrate_from_json(SESSIONS_FILE, SESSIONS_DIR)
         self.sessions = {}
+        self.session_cache = SessionContentCache()  # Parsed session folders, revalidated by mtime
+        self.search_index = SearchIndex(SEARCH_INDEX_FILE)  # Full-text index of every transcript
         self.current_session = None
-        self.recorder = AudioRecorder()
+        self.recorder = self.create_recorder()
         self.is_recording = False  # Track recording status
 
+        # Transcription and analysis run on worker threads so the window never freezes
+        self.jobs = JobExecutor(self.root, max_workers=2)
+        self.transcription_jobs = {}  # Latest transcription job per session
+        self.queued_analyses = set()  # Sessions to analyze once their transcription finishes
+        self.live_predictor = None  # Running predictions for the recording in progress
+        self.live_version = 0  # live_predictor.version last shown
+        self.live_refresh_job = None  # Background re-score of the live predictions, if one is queued
+
         # Load microphone icon
         self.microphone_icon = self.load_icon("./ui/assets/mic-icon.png", (30, 30))
 
@@ -50,33 +81,99 @@ class DiseasesEaseApp:
         # Restore sessions from metadata, but do not create any default session
         self.restore_sessions()
 
-    def restore_sessions(self):
-        """Restore sessions from sessions.json on startup."""
-        sessions = self.load_sessions()
-        if not sessions:
-            return  # Do not create any session automatically
+        # Pick up transcripts written or deleted since the index was last saved
+        self.jobs.submit(self.sync_search_index, name="Indexing transcripts", on_error=self.on_job_error)
 
-        for session in sessions:
-            session_name = session["name"]
-            session_path = session["path"]
+        # Load the prediction model in the background once the window has been drawn
+        if warm_up:
+            self.root.after_idle(warm_up_predictor)
 
-            # Restore session metadata and messages
-            if not os.path.exists(session_path):
-                continue  # Skip sessions with missing folders
+    @metrics.timed("ui.restore_sessions")
+    def restore_sessions(self):
+        """Show the first page of sessions on startup; the rest load as the list is scrolled."""
+        self.last_loaded_id = None  # Store id of the last session in the sidebar
+        self.all_sessions_loaded = False
+        self.missing_sessions = set()
+        self.load_next_session_page()
 
-            self.sessions[session_name] = ChatSession(session_name)
-            transcription_path = os.path.join(session_path, "transcription1.txt")
-            if os.path.exists(transcription_path):
-                with open(transcription_path, "r") as f:
-                    transcription = f.read()
-                self.sessions[session_name].messages.append(f"{transcription}\n")
-            self.sessions_list.insert(tk.END, session_name)
+        # Validate session folders in the background instead of before the window appears
+        self.scan_results = queue.Queue()
+        threading.Thread(target=self.scan_session_folders, daemon=True).start()
+        self.root.after(200, self.apply_scan_results)
 
         # Disable buttons for the first session with data, if it exists
         if self.sessions_list.size() > 0:
             self.sessions_list.selection_set(0)
             self.on_session_select(None)
 
+    def load_next_session_page(self):
+        """Append the next page of session metadata to the sidebar."""
+        if self.all_sessions_loaded:
+            return
+        page = self.store.list(limit=SESSION_PAGE_SIZE, after_id=self.last_loaded_id)
+        for session in page:
+            session_name = session["name"]
+            if session_name in self.sessions:
+                continue  # Created in this run before its page was reached
+            # Transcripts are read only when the session is opened
+            self.sessions[session_name] = ChatSession(session_name)
+            self.sessions_list.insert(tk.END, session_name)
+            if session_name in self.missing_sessions:
+                self.sessions_list.itemconfig(tk.END, fg=COLORS['text_secondary'])
+        if page:
+            self.last_loaded_id = page[-1]["id"]
+        self.all_sessions_loaded = len(page) < SESSION_PAGE_SIZE
+
+    def on_sessions_scroll(self, first, last):
+        """Keep the scrollbar in sync and load more sessions near the end of the list."""
+        self.sidebar_scrollbar.set(first, last)
+        if float(last) > 0.9 and not self.all_sessions_loaded:
+            self.root.after_idle(self.load_next_session_page)
+
+    def scan_session_folders(self):
+        """Check every session folder exists (runs on a background thread)."""
+        last_id = None
+        while True:
+            page = self.store.list(limit=1000, after_id=last_id)
+            if not page:
+                break
+            for session in page:
+                if not os.path.isdir(session["path"]):
+                    self.scan_results.put(session["name"])
+            last_id = page[-1]["id"]
+        self.scan_results.put(None)  # Scan finished
+
+    def apply_scan_results(self):
+        """Grey out sessions whose folder is missing, as the background scan finds them."""
+        missing = []
+        finished = False
+        while not self.scan_results.empty():
+            name = self.scan_results.get_nowait()
+            if name is None:
+                finished = True
+            else:
+                missing.append(name)
+        if missing:
+            self.missing_sessions.update(missing)
+            loaded = self.sessions_list.get(0, tk.END)
+            for index, name in enumerate(loaded):
+                if name in self.missing_sessions:
+                    self.sessions_list.itemconfig(index, fg=COLORS['text_secondary'])
+        if not finished:
+            self.root.after(200, self.apply_scan_results)
+
+    def sync_search_index(self, job):
+        """Bring the search index up to date with the session folders (runs on a worker thread)."""
+        indexed, removed = self.search_index.sync(SESSIONS_DIR)
+        if indexed or removed:
+            self.search_index.save()
+
+    def create_recorder(self):
+        """Create the recorder for one recording; earlier ones may still be finishing in the background."""
+        recorder = AudioRecorder(stream_transcription=True, stream_to_disk=True)
+        recorder.vad = EnergyVAD()  # Skip decoding the pauses between turns
+        return recorder
+
     def load_icon(self, path, size):
         """Load and resize an icon"""
         image = Image.open(path)
@@ -182,7 +279,7 @@ class DiseasesEaseApp:
         self.sessions_list_frame, orient=tk.VERTICAL, command=self.sessions_list.yview
         )
         self.sidebar_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.sessions_list.config(yscrollcommand=self.sidebar_scrollbar.set)
+        self.sessions_list.config(yscrollcommand=self.on_sessions_scroll)
 
         # Delete Session button
         self.delete_button = tk.Button(
@@ -218,6 +315,13 @@ class DiseasesEaseApp:
         )
         self.notification_label.pack(fill=tk.X, pady=(0, 10))  # Positioned at the top of the chat area
 
+        # Live top predictions, updated while recording
+        self.live_predictions_label = tk.Label(
+        chat_frame, text="", font=('Segoe UI', 11, 'bold'),
+        bg=COLORS['background'], fg=COLORS['primary'], anchor="w"
+        )
+        self.live_predictions_label.pack(fill=tk.X, pady=(0, 10))
+
         # Chat Display Area
         self.chat_display = ScrolledText(
         chat_frame, wrap=tk.WORD, font=('Segoe UI', 11),
@@ -273,30 +377,19 @@ class DiseasesEaseApp:
         button.pack(fill=tk.BOTH, expand=True)
         return canvas
 
+    @metrics.timed("ui.create_new_session")
     def create_new_session(self):
         """Create a new session folder and add it to the session list."""
         try:
             if not os.path.exists(SESSIONS_DIR):
                 os.makedirs(SESSIONS_DIR)
 
-            # Load existing sessions
-            sessions = self.load_sessions() if isinstance(self.load_sessions(), list) else []
-
-            # Determine the next session index
-            new_index = len(sessions) + 1
-            session_name = f"Session_{new_index}"
-            session_path = os.path.join(SESSIONS_DIR, session_name)
+            # Allocate the next session id and name and record it atomically
+            session = self.store.create(SESSIONS_DIR)
+            session_name = session["name"]
 
             # Create the session folder
-            os.makedirs(session_path, exist_ok=True)
-
-            # Add session metadata
-            sessions.append({
-                "name": session_name,
-                "path": session_path,
-                "created_at": datetime.now().isoformat()
-            })
-            self.save_sessions(sessions)
+            os.makedirs(session["path"], exist_ok=True)
 
             # Update the UI
             self.sessions[session_name] = ChatSession(session_name)
@@ -313,6 +406,7 @@ class DiseasesEaseApp:
             self.notification_label.config(text=f"Error creating session: {e}", fg="red")
             print(f"Error during create_new_session: {e}")
 
+    @metrics.timed("ui.on_session_select")
     def on_session_select(self, event):
         """Handle session selection."""
         try:
@@ -331,26 +425,21 @@ class DiseasesEaseApp:
 
                 # Clear chat display
                 self.clear_chat_display()
+                if not self.is_recording:
+                    self.live_predictor = None  # Live predictions belong to the last recording
+                    self.live_predictions_label.config(text="")
 
-                # Load all transcription and analysis files
-                transcription_files = [
-                    f for f in os.listdir(session_path) if f.startswith("transcription") and f.endswith(".txt")
-                ]
-                transcription_files.sort()  # Ensure files are loaded in order
+                # Load all transcription and analysis files (cached until they change on disk)
+                with metrics.span("ui.session_read"):
+                    content = self.session_cache.get(session_path)
 
                 # Display content in the chat
-                for transcription_file in transcription_files:
-                    transcription_path = os.path.join(session_path, transcription_file)
-                    with open(transcription_path, "r") as f:
-                        content = f.read()
-                    self.chat_display.insert(tk.END, f"Content of {transcription_file}:\n{content}\n")
+                for transcription_file, file_content, _, _ in content.files:
+                    self.chat_display.insert(tk.END, f"Content of {transcription_file}:\n{file_content}\n")
                     self.chat_display.insert(tk.END, "-" * 50 + "\n")
 
                 # Check if the session is already analyzed
-                existing_audio = [
-                    f for f in os.listdir(session_path) if f.startswith("output") and f.endswith(".wav")
-                ]
-                if transcription_files or existing_audio:
+                if content.files or content.has_audio:
                     # Disable Record and Analyze buttons
                     self.record_button.config(state=tk.DISABLED)
                     self.analyze_button.config(state=tk.DISABLED)
@@ -369,20 +458,8 @@ class DiseasesEaseApp:
             print(f"Error during on_session_select: {e}")
 
     def load_sessions(self):
-        """Load session metadata from sessions.json."""
-        if os.path.exists(SESSIONS_FILE): 
-            try:
-                with open(SESSIONS_FILE, "r") as f: # write to json
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print("Error: Corrupted sessions.json. Recreating.")
-                return []
-        return []
-
-    def save_sessions(self, sessions):
-        """Save session metadata to sessions.json."""
-        with open(SESSIONS_FILE, "w") as f: # Read from json
-            json.dump(sessions, f, indent=4)
+        """Load session metadata from the session store."""
+        return self.store.list()
 
     def load_session_messages(self, session_name):
         """Load messages for the selected session."""
@@ -408,6 +485,7 @@ class DiseasesEaseApp:
             self.notification_label.config(text=f"Error: {e}", fg="red")
             print(f"Error during toggle_recording: {e}")
 
+    @metrics.timed("ui.start_recording")
     def start_recording(self):
         """Start audio recording."""
         try:
@@ -415,54 +493,124 @@ class DiseasesEaseApp:
             if not os.path.exists(session_path):
                 os.makedirs(session_path)
 
-            # Determine filenames for the new recording
-            existing_transcripts = [
-                f for f in os.listdir(session_path) if f.startswith("transcription") and f.endswith(".txt")
-            ]
-            new_file_index = len(existing_transcripts) + 1
+            # Determine filenames for the new recording (the previous one may still be transcribing)
+            new_file_index = next_recording_index(session_path)
 
             # Set filenames for the new recording
-            self.recorder.filename = os.path.join(session_path, f"output{new_file_index}.wav")
+            self.recorder = self.create_recorder()
+            self.recorder.filename = os.path.join(session_path, f"output{new_file_index}{RECORDING_EXTENSION}")
             self.transcription_file = os.path.join(session_path, f"transcription{new_file_index}.txt")
 
+            # Score the finalized utterances as they arrive instead of waiting for Analyze. The decoder
+            # thread only adds their counts; show_live_predictions scores them in a background job
+            self.live_predictor = IncrementalPredictor(k=2, min_interval=LIVE_PREDICTION_INTERVAL)
+            self.live_version = 0
+            self.live_predictions_label.config(text="")
+            self.recorder.on_result = self.live_predictor.add_text
+
             self.recorder.start_recording()
             self.is_recording = True
             threading.Thread(target=self.recorder.record, daemon=True).start()
             self.notification_label.config(text="Recording started...", fg="#00FF00")
+            self.poll_live_transcription()
         except Exception as e:
             self.notification_label.config(text=f"Error: {e}", fg="red")
             print(f"Error during start_recording: {e}")
 
+    @metrics.timed("ui.stop_recording")
     def stop_recording(self):
-        """Stop audio recording and save transcription."""
+        """Stop audio recording; the transcription is finished and saved in the background."""
         try:
             if not self.current_session:
                 self.notification_label.config(text="No active session. Cannot stop recording.", fg="red")
                 return
 
-            self.recorder.stop_recording()
+            recorder = self.recorder
+            recorder.stop_recording(finish_transcription=False)
             self.is_recording = False
 
-            # Transcribe the audio
-            transcription = transcribe_audio(self.recorder.filename)
-            session_path = self.get_current_session_path()
-
-            # Save transcription
-            transcription_files = [
-                f for f in os.listdir(session_path) if f.startswith("transcription") and f.endswith(".txt")
-            ]
-            new_file_index = len(transcription_files) + 1
-            transcription_path = os.path.join(session_path, f"transcription{new_file_index}.txt")
-            with open(transcription_path, "w") as f:
-                f.write(transcription)
-
-            # Display the transcription in the chat
-            self.chat_display.insert(tk.END, f"Transcription:\n{transcription}\n")
-            self.notification_label.config(text="Recording stopped. Transcription saved.", fg="#00FF00")
+            job = self.jobs.submit(
+                self.transcribe_recording, recorder, self.transcription_file,
+                name=f"Transcribing {os.path.basename(recorder.filename)}",
+                on_done=self.on_transcription_done, on_error=self.on_job_error, on_progress=self.on_job_progress
+            )
+            job.session_name = self.current_session
+            self.transcription_jobs[self.current_session] = job
+            self.notification_label.config(text="Recording stopped. Transcribing in the background...", fg="#00FF00")
         except Exception as e:
             self.notification_label.config(text=f"Error: {e}", fg="red")
             print(f"Error stopping recording: {e}")
 
+    @metrics.timed("ui.transcribe_recording")
+    def transcribe_recording(self, job, recorder, transcription_path):
+        """Finish transcribing a stopped recording and save it (runs on a worker thread)."""
+        # The recorder streams to the decoder, so most of the audio was decoded while it was being recorded
+        transcription = recorder.finish_transcription()
+        with metrics.span("ui.file_io"), open(transcription_path, "w") as f:
+            f.write(transcription)
+        self.search_index.add_file(transcription_path)
+        return transcription
+
+    def on_transcription_done(self, job, transcription):
+        """Show a finished transcription and start any analysis that was waiting for it."""
+        if self.current_session == job.session_name:
+            # Display the transcription in the chat
+            self.chat_display.insert(tk.END, f"Transcription:\n{transcription}\n")
+            if not self.is_recording:
+                self.show_live_predictions(force=True)  # Include the last utterances of the recording
+        self.notification_label.config(text=f"{job.session_name}: transcription saved.", fg="#00FF00")
+        if job.session_name in self.queued_analyses:
+            self.queued_analyses.discard(job.session_name)
+            self.start_analysis(job.session_name)
+
+    def on_job_progress(self, job, fraction, message=None):
+        """Report background progress in the notification bar."""
+        waiting = len(self.jobs.pending())
+        suffix = f" ({waiting} more queued)" if waiting else ""
+        self.notification_label.config(text=f"{message or job.name}: {fraction:.0%}{suffix}", fg="#00FF00")
+
+    def on_job_error(self, job, error):
+        """Report a failed or cancelled background job."""
+        self.queued_analyses.discard(getattr(job, "session_name", None))
+        self.notification_label.config(text=f"Error: {job.name}: {error}", fg="red")
+        print(f"Error in {job.name}: {error}")
+
+    def poll_live_transcription(self):
+        """Show the in-progress transcription in the notification bar while recording."""
+        if not self.is_recording:
+            return
+        transcriber = self.recorder.transcriber
+        if transcriber is not None:
+            text = " ".join(transcriber.results + [transcriber.partial]).strip()
+            if text:
+                self.notification_label.config(text=f"Listening: ...{text[-80:]}", fg="#00FF00")
+        self.show_live_predictions()
+        self.root.after(250, self.poll_live_transcription)
+
+    def show_live_predictions(self, force=False):
+        """Show the live top predictions when they changed since the last poll."""
+        live = self.live_predictor
+        if live is None:
+            return
+        # Utterances counted by the decoder thread are scored on a worker once the interval has passed
+        if self.live_refresh_job is None and live.due(force):
+            self.live_refresh_job = self.jobs.submit(
+                lambda job: live.refresh(force), name="Updating live predictions",
+                on_done=self.on_live_refresh_done, on_error=self.on_live_refresh_done
+            )
+        if live.version != self.live_version:
+            self.live_version = live.version
+            ranked = "   ".join(f"{disease}: {probability:.0%}" for disease, probability in live.predictions)
+            self.live_predictions_label.config(text=f"Live: {ranked}")
+
+    def on_live_refresh_done(self, job, result):
+        """Show the predictions of a finished background re-score (or just forget a failed one)."""
+        self.live_refresh_job = None
+        if isinstance(result, Exception):
+            print(f"Error updating live predictions: {result}")
+        # Once recording has stopped nothing polls any more, so score whatever arrived meanwhile now
+        self.show_live_predictions(force=not self.is_recording)
+
     def get_current_session_path(self):
         """Get the folder path of the current session."""
         if not self.current_session:
@@ -475,52 +623,77 @@ class DiseasesEaseApp:
             self.notification_label.config(text=f"Recreated session folder: {self.current_session}", fg="#00FF00")
         return session_path
 
+    @metrics.timed("ui.analyze")
     def analyze(self):
-        """Analyze the transcription and predict diseases."""
+        """Analyze the transcription and predict diseases in the background."""
         try:
             # Check if a session is active
             if not self.current_session:
                 self.notification_label.config(text="No active session for analysis.", fg="red")
                 return
 
-            # Check if the transcription file exists
-            session_path = self.get_current_session_path()
-            transcription_files = [
-                f for f in os.listdir(session_path) if f.startswith("transcription") and f.endswith(".txt")
-            ]
-            if not transcription_files:
-                self.notification_label.config(text="No transcription file found for analysis.", fg="red")
+            # Analyze the recording that was just stopped, not the one before it
+            transcription_job = self.transcription_jobs.get(self.current_session)
+            if transcription_job is not None and not transcription_job.future.done():
+                self.queued_analyses.add(self.current_session)
+                self.notification_label.config(text="Analysis will start when transcription finishes.", fg="#00FF00")
                 return
+            self.start_analysis(self.current_session)
+        except Exception as e:
+            self.notification_label.config(text=f"Error: {e}", fg="red")
+            print(f"Error during analysis: {e}")
 
-            # Use the latest transcription file
-            transcription_file = os.path.join(session_path, sorted(transcription_files)[-1])
-            with open(transcription_file, "r") as f:
-                transcription = f.read().strip()
-
-            if not transcription:
-                self.notification_label.config(text="Transcription is empty. Cannot analyze.", fg="red")
-                return
-
-            # Perform analysis
-            predictions = predict_disease(transcription)
-            result = "\n".join([f"{disease}: {prob:.2%}" for disease, prob in predictions])
-        
-            # Append the analysis result to the transcription file
-            with open(transcription_file, "a") as f:
-                f.write(f"\n\nAnalysis Result:\n{result}")
-
+    def start_analysis(self, session_name):
+        """Queue the analysis job for a session."""
+        session_path = os.path.join(SESSIONS_DIR, session_name)
+        job = self.jobs.submit(
+            self.run_analysis, session_path, name=f"Analyzing {session_name}",
+            on_done=self.on_analysis_done, on_error=self.on_job_error
+        )
+        job.session_name = session_name
+        self.notification_label.config(text=f"Analyzing {session_name} in the background...", fg="#00FF00")
+
+    @metrics.timed("ui.run_analysis")
+    def run_analysis(self, job, session_path):
+        """Predict diseases from the latest transcription and save the result (runs on a worker thread)."""
+        # Check if a numbered transcription file exists
+        transcription_files = {
+            int(match.group(1)): match.group(0) for match in
+            (re.fullmatch(r"transcription(\d+)\.txt", f) for f in os.listdir(session_path)) if match
+        }
+        if not transcription_files:
+            raise ValueError("No transcription file found for analysis.")
+
+        # Use the latest transcription file
+        transcription_file = os.path.join(session_path, transcription_files[max(transcription_files)])
+        with metrics.span("ui.file_io"), open(transcription_file, "r") as f:
+            transcription = f.read().strip()
+
+        if not transcription:
+            raise ValueError("Transcription is empty. Cannot analyze.")
+
+        # Perform analysis
+        job.report_progress(0.5, "Predicting")
+        predictions = predict_disease(transcription)
+        result = "\n".join([f"{disease}: {prob:.2%}" for disease, prob in predictions])
+
+        # Append the analysis result to the transcription file
+        with metrics.span("ui.file_io"), open(transcription_file, "a") as f:
+            f.write(f"\n\nAnalysis Result:\n{result}")
+        self.search_index.add_file(transcription_file)  # Keeps the stored signature in step with the file
+        return result
+
+    def on_analysis_done(self, job, result):
+        """Show the analysis result if its session is still open."""
+        self.notification_label.config(text="Analysis successful.", fg="#00FF00")
+        if self.current_session == job.session_name:
             # Display the transcription and analysis in the chat
             self.chat_display.insert(tk.END, f"\nAnalysis Result:\n{result}\n")
-            self.notification_label.config(text="Analysis successful.", fg="#00FF00")
 
             # Disable recording and analyzing for this session
             self.record_button.config(state=tk.DISABLED)
             self.analyze_button.config(state=tk.DISABLED)
 
-        except Exception as e:
-            self.notification_label.config(text=f"Error: {e}", fg="red")
-            print(f"Error during analysis: {e}")
-
     def create_sidebar(self):
         """Create sidebar with session management."""
         sidebar = ttk.Frame(self.main_frame, style='Sidebar.TFrame')
@@ -536,6 +709,15 @@ class DiseasesEaseApp:
         # New Session button
         self.create_rounded_button(sidebar, text="New Session", command=self.create_new_session).pack(fill=tk.X, pady=(0, 10))
 
+        # Transcript search: Enter lists the matching sessions, an empty search lists all of them again
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(
+        sidebar, textvariable=self.search_var, bg=COLORS['header_bg'], fg=COLORS['text'],
+        insertbackground=COLORS['text'], font=('Segoe UI', 11), relief=tk.FLAT
+        )
+        self.search_entry.pack(fill=tk.X, pady=(0, 10))
+        self.search_entry.bind('<Return>', self.search_sessions)
+
         # Sessions list
         self.sessions_list_frame = ttk.Frame(sidebar)
         self.sessions_list_frame.pack(fill=tk.BOTH, expand=True)
@@ -553,7 +735,7 @@ class DiseasesEaseApp:
         self.sessions_list_frame, orient=tk.VERTICAL, command=self.sessions_list.yview
         )
         self.sidebar_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.sessions_list.config(yscrollcommand=self.sidebar_scrollbar.set)
+        self.sessions_list.config(yscrollcommand=self.on_sessions_scroll)
 
         # Delete Session button
         self.delete_button = tk.Button(
@@ -569,6 +751,34 @@ class DiseasesEaseApp:
         )
         self.clear_all_button.pack(fill=tk.X, pady=(10, 0))
 
+    @metrics.timed("ui.search_sessions")
+    def search_sessions(self, event=None):
+        """List only the sessions whose transcripts match the search box, best match first."""
+        query = self.search_var.get().strip()
+        self.sessions_list.delete(0, tk.END)
+        self.sessions.clear()
+        if not query:
+            # Back to the full, paged session list
+            self.last_loaded_id = None
+            self.all_sessions_loaded = False
+            self.load_next_session_page()
+            self.notification_label.config(text="Showing all sessions.", fg="#00FF00")
+            return
+
+        hits = self.search_index.search(query, limit=SEARCH_RESULT_LIMIT)
+        for hit in hits:
+            if hit.session not in self.sessions:
+                self.sessions[hit.session] = ChatSession(hit.session)
+                self.sessions_list.insert(tk.END, hit.session)
+        self.all_sessions_loaded = True  # No paging while search results are shown
+        if hits:
+            self.notification_label.config(
+                text=f"{len(self.sessions)} sessions match. Best: {hits[0].session}: {hits[0].snippet}", fg="#00FF00"
+            )
+        else:
+            self.notification_label.config(text=f"No transcripts match {query}.", fg="orange")
+
+    @metrics.timed("ui.delete_selected_session")
     def delete_selected_session(self):
         """Delete the currently selected session and its data."""
         selection = self.sessions_list.curselection()
@@ -580,6 +790,8 @@ class DiseasesEaseApp:
             if os.path.exists(session_path):
                 import shutil
                 shutil.rmtree(session_path)
+            self.session_cache.invalidate(session_path)
+            self.search_index.remove(session_name)
 
             # Remove session from memory and UI
             del self.sessions[session_name]
@@ -591,14 +803,12 @@ class DiseasesEaseApp:
                 self.clear_chat_display()
                 self.notification_label.config(text=f"Session {session_name} deleted.", fg="#FF4500")
 
-            # Update the sessions.json file
-            self.save_sessions([
-                {"name": name, "path": os.path.join(SESSIONS_DIR, name)}
-                for name in self.sessions
-            ])
+            # Remove only this session's metadata; the others keep theirs
+            self.store.delete(session_name)
         else:
             self.notification_label.config(text="No session selected to delete.", fg="red")
 
+    @metrics.timed("ui.clear_all_sessions")
     def clear_all_sessions(self):
         """Clear all sessions from UI and filesystem."""
         import shutil
@@ -606,19 +816,43 @@ class DiseasesEaseApp:
             shutil.rmtree(SESSIONS_DIR)
         os.makedirs(SESSIONS_DIR)
         self.sessions.clear()
+        self.session_cache.clear()
+        self.search_index.clear()
         self.sessions_list.delete(0, tk.END)
-        self.save_sessions([])
+        self.store.clear()
         self.notification_label.config(text="All sessions cleared.", fg="#FF4500")
 
     def clear_chat_display(self):
         """Clear the chat display area."""
         self.chat_display.delete('1.0', tk.END)
 
+def export_metrics_periodically(root, path, interval_ms=60000):
+    """Rewrite the metrics file every interval_ms while the app runs."""
+    try:
+        metrics.export(path)
+    except OSError as e:
+        print(f"Error exporting metrics to {path}: {e}")
+    root.after(interval_ms, export_metrics_periodically, root, path, interval_ms)
+
 def main():
     """Initialize and run the application"""
+    parser = argparse.ArgumentParser(description="DiseasesEaseAI")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Record per-stage latencies and export them to FILE (.json/.jsonl for JSON Lines, "
+                             "anything else for Prometheus text)")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+
     root = tk.Tk()
     app = DiseasesEaseApp(root)
+    if args.metrics:
+        root.after(60000, export_metrics_periodically, root, args.metrics)
     root.mainloop()
+    app.jobs.shutdown(cancel_pending=False)  # Let queued transcriptions finish saving
+    app.search_index.save()
+    if args.metrics:
+        metrics.export(args.metrics)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+# vad.py - Energy / zero-crossing voice-activity detection in front of the recognizer
+#
+# The detector works on 16-bit mono PCM and is streaming: process() can be fed
+# chunks of any size and returns only the audio worth decoding. Silent gaps are
+# compressed rather than removed, so the recognizer still sees utterance breaks.
+
+import numpy as np
+
+
+class EnergyVAD:
+    """Drop or shorten non-speech stretches of 16-bit mono PCM before decoding.
+
+    A frame counts as speech when its energy is above energy_threshold_db (dBFS),
+    or within 10 dB of it with a zero-crossing rate above zcr_threshold, which
+    catches quiet unvoiced consonants. After speech, hangover_ms of audio is
+    always kept plus up to max_silence_ms of each pause; pre_roll_ms before each
+    speech onset is restored so word beginnings are not clipped.
+    """
+    def __init__(self, rate=16000, frame_ms=20, energy_threshold_db=-45.0, zcr_threshold=0.25,
+                 hangover_ms=300, max_silence_ms=200, pre_roll_ms=100):
+        self.rate = rate
+        self.frame_length = rate * frame_ms // 1000
+        self.energy_threshold_db = energy_threshold_db
+        self.zcr_threshold = zcr_threshold
+        self.keep_frames = (hangover_ms + max_silence_ms) // frame_ms
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.reset()
+
+    def reset(self):
+        """Forget all state before starting on a new recording."""
+        self._remainder = b''
+        self._held = []  # Trailing dropped frames, restored if speech starts soon after
+        self._silence_run = self.keep_frames + 1  # Start as if in a long pause
+        self.frames_seen = 0
+        self.frames_kept = 0
+
+    @property
+    def kept_ratio(self):
+        """Share of frames passed on to the recognizer so far."""
+        return self.frames_kept / self.frames_seen if self.frames_seen else 1.0
+
+    def is_speech(self, frames):
+        """Classify each row of an (n, frame_length) int16 array as speech or not."""
+        x = frames.astype(np.float32) / 32768.0
+        energy_db = 10.0 * np.log10(np.mean(x * x, axis=1) + 1e-10)
+        zcr = np.mean(np.signbit(x[:, 1:]) != np.signbit(x[:, :-1]), axis=1)
+        voiced = energy_db >= self.energy_threshold_db
+        unvoiced = (energy_db >= self.energy_threshold_db - 10.0) & (zcr >= self.zcr_threshold)
+        return voiced | unvoiced
+
+    def process(self, data):
+        """Return the part of this PCM chunk that should be decoded."""
+        data = self._remainder + data
+        frame_bytes = 2 * self.frame_length
+        n = len(data) // frame_bytes
+        self._remainder = data[n * frame_bytes:]
+        if n == 0:
+            return b''
+        frames = np.frombuffer(data[:n * frame_bytes], dtype='<i2').reshape(n, self.frame_length)
+        speech = self.is_speech(frames)
+        index = np.arange(n)
+
+        # Length of the silent run at each frame, continuing the run from the previous chunk
+        last_speech = np.maximum.accumulate(np.where(speech, index, -1 - self._silence_run))
+        silence_run = index - last_speech
+        keep = silence_run <= self.keep_frames
+
+        # Pre-roll: frames shortly before a speech onset in this chunk...
+        next_speech = np.minimum.accumulate(np.where(speech, index, n + self.pre_roll_frames)[::-1])[::-1]
+        keep |= (next_speech - index) <= self.pre_roll_frames
+        # ...and held-back frames from the end of the previous chunk
+        restored = []
+        if speech.any() and self._held:
+            missing = self.pre_roll_frames - int(np.argmax(speech))
+            if missing > 0:
+                restored = self._held[-missing:]
+
+        kept = np.flatnonzero(keep)
+        tail = [frames[i].tobytes() for i in range(kept[-1] + 1 if len(kept) else 0, n)]
+        held = tail if len(kept) else self._held + tail
+        self._held = held[-self.pre_roll_frames:] if self.pre_roll_frames else []
+        self._silence_run = int(silence_run[-1])
+        self.frames_seen += n
+        self.frames_kept += len(kept) + len(restored)
+        return b''.join(restored) + frames[keep].tobytes()
+
+    def flush(self):
+        """Return any buffered partial frame if the stream ended during speech."""
+        remainder, self._remainder = self._remainder, b''
+        return remainder if self._silence_run <= self.keep_frames else b''
+
+    def filter(self, data):
+        """Run a whole recording through the detector in one call."""
+        self.reset()
+        return self.process(data) + self.flush()